@@ -0,0 +1,142 @@
+"""
+Recall-vs-latency benchmark for the ANN index options of the vector storages.
+
+Loads the entity and chunk vectors of a working directory (``vdb_entities.json`` /
+``vdb_chunks.json`` written by NanoVectorDBStorage), uses perturbed stored vectors
+as queries, takes exact inner-product search as ground truth and reports, for each
+index configuration, build time, recall@k and mean / p95 query latency. Without a
+working directory (or with ``--synthetic N``) clustered random vectors are used.
+
+Usage:
+    python benchmarks/ann_recall.py --working_dir ./workspace/amazon_15 --k 20
+    python benchmarks/ann_recall.py --synthetic 100000 --dim 1024
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coldrag.kg.ann_index import AnnConfig, build_index, search_params  # noqa: E402
+
+NAMESPACES = ("entities", "chunks")
+
+
+def load_namespace(working_dir: str, namespace: str) -> np.ndarray | None:
+    path = os.path.join(working_dir, f"vdb_{namespace}.json")
+    if not os.path.exists(path):
+        return None
+    from nano_vectordb import NanoVectorDB
+
+    with open(path, encoding="utf-8") as f:
+        dim = json.load(f)["embedding_dim"]
+    storage = getattr(NanoVectorDB(dim, storage_file=path), "_NanoVectorDB__storage")
+    return np.ascontiguousarray(storage["matrix"], dtype=np.float32)
+
+
+def synthetic_vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    # Clustered data, closer to real embeddings than uniform noise
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(n // 500, 8), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)]
+    vectors += 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), n)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def configs(args, n: int) -> list[tuple[str, AnnConfig]]:
+    nlist = args.nlist or max(1, min(4096, int(np.sqrt(n)), n // 39))
+    result = [("flat", AnnConfig())]
+    for ef in args.ef_search:
+        result.append(
+            (f"hnsw ef={ef}", AnnConfig(index_type="hnsw", hnsw_ef_search=ef))
+        )
+    for nprobe in args.nprobe:
+        if nprobe > nlist:
+            continue
+        result.append(
+            (
+                f"ivf_flat nlist={nlist} nprobe={nprobe}",
+                AnnConfig(index_type="ivf_flat", ivf_nlist=nlist, ivf_nprobe=nprobe),
+            )
+        )
+        result.append(
+            (
+                f"ivf_pq nlist={nlist} nprobe={nprobe}",
+                AnnConfig(index_type="ivf_pq", ivf_nlist=nlist, ivf_nprobe=nprobe),
+            )
+        )
+    return result
+
+
+def run(name: str, vectors: np.ndarray, args) -> None:
+    queries = make_queries(vectors, args.queries, args.seed)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+
+    print(f"\n== {name}: {len(vectors)} vectors, dim {vectors.shape[1]} ==")
+    print(
+        f"{'index':<32}{'build s':>10}{f'recall@{args.k}':>12}{'mean ms':>10}{'p95 ms':>10}"
+    )
+    for label, config in configs(args, len(vectors)):
+        if config.needs_training and len(vectors) < config.min_train_size():
+            print(f"{label:<32}  skipped: needs {config.min_train_size()} vectors")
+            continue
+        start = time.perf_counter()
+        index = build_index(config, vectors)
+        build_s = time.perf_counter() - start
+        params = search_params(config, index)
+
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            _, rows = index.search(query.reshape(1, -1), args.k, params=params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(set(rows[0].tolist()) & set(expected.tolist()))
+        recall = hits / truth.size
+        print(
+            f"{label:<32}{build_s:>10.2f}{recall:>12.4f}"
+            f"{np.mean(latencies):>10.3f}{np.percentile(latencies, 95):>10.3f}"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser("ColdRAG ANN recall/latency benchmark")
+    ap.add_argument("--working_dir", default=None, help="Directory with vdb_*.json")
+    ap.add_argument("--synthetic", type=int, default=None, help="Random vectors")
+    ap.add_argument("--dim", type=int, default=1024, help="Synthetic dimension")
+    ap.add_argument("--k", type=int, default=20)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--ef_search", type=int, nargs="+", default=[16, 64, 256])
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    ap.add_argument("--nlist", type=int, default=None, help="Default: sqrt(n)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    datasets = []
+    if args.working_dir:
+        for namespace in NAMESPACES:
+            vectors = load_namespace(args.working_dir, namespace)
+            if vectors is not None and len(vectors):
+                datasets.append((namespace, vectors))
+    if args.synthetic or not datasets:
+        n = args.synthetic or 50000
+        datasets.append(("synthetic", synthetic_vectors(n, args.dim, args.seed)))
+
+    for name, vectors in datasets:
+        run(name, vectors, args)
+
+
+if __name__ == "__main__":
+    main()
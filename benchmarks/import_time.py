@@ -0,0 +1,110 @@
+"""
+Cold-start import benchmark for the coldrag package.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters, reports the
+median cumulative import time and the slowest modules, and fails (exit code 1) when
+the median exceeds the budget or when a module that should only load on first use
+(vLLM client, HTTP stacks, tokenizer, numpy, pydantic, storage backends) is pulled
+in at import time.
+
+Usage:
+    python benchmarks/import_time.py --runs 7 --budget_ms 150
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of `import coldrag`; they are resolved on first use
+DEFERRED_MODULES = [
+    "vllm_preset",
+    "aiohttp",
+    "httpx",
+    "tiktoken",
+    "json_repair",
+    "numpy",
+    "pydantic",
+    "networkx",
+    "nano_vectordb",
+    "coldrag.llm",
+    "coldrag.kg.json_kv_impl",
+    "coldrag.kg.networkx_impl",
+    "coldrag.kg.nano_vector_db_impl",
+]
+
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    """Return {module: (self_us, cumulative_us)} for one cold interpreter."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    ap = argparse.ArgumentParser("ColdRAG import-time benchmark")
+    ap.add_argument("--module", default="coldrag")
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument(
+        "--budget_ms",
+        type=float,
+        default=float(os.environ.get("COLDRAG_IMPORT_BUDGET_MS", 150)),
+        help="Fail if the median cumulative import time exceeds this",
+    )
+    ap.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = ap.parse_args()
+
+    # Warm-up run so bytecode caches exist and every measured run is comparable
+    measure(args.module)
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+    median_run = runs[totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])]
+
+    print(
+        f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+        f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f}, budget {args.budget_ms:.0f})"
+    )
+    print(f"\n{'module':<48}{'self ms':>10}{'cumulative ms':>16}")
+    slowest = sorted(median_run.items(), key=lambda kv: kv[1][0], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[: args.top]:
+        print(f"{name:<48}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+
+    failed = False
+    eager = sorted(
+        name
+        for name in median_run
+        if any(name == m or name.startswith(m + ".") for m in DEFERRED_MODULES)
+    )
+    if eager:
+        failed = True
+        print(f"\nFAIL: modules loaded eagerly at import time: {', '.join(eager)}")
+    if median_ms > args.budget_ms:
+        failed = True
+        print(
+            f"\nFAIL: median import time {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Shared-prefix ratio benchmark for ColdRAG edge-scoring and final-ranking prompts.
+
+Simulates vLLM automatic prefix caching (hash-chained KV blocks) over a synthetic
+workload and reports the fraction of prompt tokens that could be served from cache,
+for the legacy prompt layouts and for the current ones. Ranking prompts are measured
+as the system message (with the retrieved context) followed by the user query.
+
+Usage:
+    python benchmarks/prompt_prefix_ratio.py --users 20 --batches 10 --block_size 16
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coldrag.prompt import PROMPTS, render_prompt_layout  # noqa: E402
+
+
+def get_encoder():
+    try:
+        import tiktoken
+
+        enc = tiktoken.get_encoding("cl100k_base")
+        return enc.encode
+    except Exception:
+        return lambda text: text.split(" ")
+
+
+def legacy_edge_prompt(history: str, edges: str) -> str:
+    return (
+        f"You are helping with multi-hop reasoning over a knowledge graph.\n"
+        f"The following is the user's past interaction history (items they engaged with):\n\"{history}\"\n\n"
+        f"Below are edges from the current reasoning frontier, each connecting two entities.\n"
+        f"For each edge, assess how strongly it relates to the user's past interests.\n"
+        f"Score each edge from 0 (completely irrelevant) to 10 (highly relevant) **based on semantic similarity to the user's interaction history**.\n"
+        f"Only consider the user's past interactions for scoring.\n\n"
+        f"Format your output exactly as:\n1. (src -> tgt): score\n2. (src -> tgt): score\n...\n\n"
+        f"Here are the edges:\n{edges}"
+    )
+
+
+def ranking_user_query(history: str, instructions: str, candidates: list) -> str:
+    insertion = PROMPTS["coldrag_ranking_candidates"].format(
+        num_candidates=len(candidates), candidates=candidates
+    )
+    return history + "\n\n" + insertion + instructions
+
+
+def context_system_prompt(context: str) -> str:
+    return PROMPTS["rag_response"].format(
+        response_type="Multiple Paragraphs", user_prompt="n/a", context_data=context
+    )
+
+
+class PrefixCacheSimulator:
+    """Counts prompt tokens that hit a hash-chained block cache (like vLLM APC)."""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.cached_blocks = set()
+        self.total_tokens = 0
+        self.cached_tokens = 0
+
+    def submit(self, tokens: list) -> None:
+        self.total_tokens += len(tokens)
+        parent = None
+        hit = True
+        for start in range(0, len(tokens) - self.block_size + 1, self.block_size):
+            key = hash((parent, tuple(tokens[start : start + self.block_size])))
+            if hit and key in self.cached_blocks:
+                self.cached_tokens += self.block_size
+            else:
+                hit = False
+                self.cached_blocks.add(key)
+            parent = key
+
+    @property
+    def ratio(self) -> float:
+        return self.cached_tokens / self.total_tokens if self.total_tokens else 0.0
+
+
+def make_workload(users: int, batches: int, edges_per_batch: int, seed: int):
+    rng = random.Random(seed)
+    words = ["Legend", "Dark", "Souls", "Kart", "Racing", "Quest", "Edition", "Deluxe", "Zero",
+             "Saga", "Chronicles", "Arena", "Tactics", "Online", "Remastered", "Origins"]
+    platforms = ["PlayStation 4", "Xbox One", "Nintendo Switch", "PC"]
+
+    def title():
+        return " ".join(rng.sample(words, 3)) + " - " + rng.choice(platforms)
+
+    workload = []
+    for _ in range(users):
+        history = [title() for _ in range(20)]
+        edge_batches = []
+        for _ in range(batches):
+            lines = []
+            for i in range(edges_per_batch):
+                src, tgt = title(), rng.choice(words)
+                lines.append(
+                    f"{i+1}. Edge from {src} to {tgt}: {src} features {tgt.lower()} gameplay.\nKeywords: {tgt.lower()}"
+                )
+            edge_batches.append("\n".join(lines))
+        candidates = [title() for _ in range(100)]
+        context = "\n".join(
+            f"{i + 1}. {title()}: {rng.choice(words).lower()} gameplay"
+            for i in range(40)
+        )
+        workload.append((history, edge_batches, candidates, context))
+    return workload
+
+
+def main():
+    ap = argparse.ArgumentParser("ColdRAG shared-prefix ratio benchmark")
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--batches", type=int, default=10, help="Edge-scoring batches per user")
+    ap.add_argument("--edges", type=int, default=10, help="Edges per scoring batch")
+    ap.add_argument("--retries", type=int, default=2, help="Final-ranking calls per user (retries)")
+    ap.add_argument("--block_size", type=int, default=16)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    encode = get_encoder()
+    workload = make_workload(args.users, args.batches, args.edges, args.seed)
+    instructions = (
+        "Please carefully recommend top-10 products among the candidate products by how likely I am to purchase them next, "
+        "based on my past purchasing history.\nThink step by step, but only output the final ranking in the following format:\n\n"
+        "1. <product name>\n2. <product name>\n...\n\n"
+        "Only include items from the given candidate list. Do not add explanations or any other text."
+    )
+
+    sims = {name: PrefixCacheSimulator(args.block_size) for name in
+            ("edge/legacy", "edge/shared-prefix", "ranking/legacy", "ranking/shared-prefix")}
+    for history, edge_batches, candidates, context in workload:
+        history_titles = ", ".join(history)
+        history_block = f"I've purchased the following products in the past in order:\n{history}"
+        for edges in edge_batches:
+            sims["edge/legacy"].submit(encode(legacy_edge_prompt(history_titles, edges)))
+            sims["edge/shared-prefix"].submit(encode(render_prompt_layout(
+                "coldrag_edge_scoring", history=history_titles, edges=edges)))
+        system = context_system_prompt(context)
+        user_query = ranking_user_query(history_block, instructions, candidates)
+        for _ in range(args.retries):
+            sims["ranking/legacy"].submit(encode(system + user_query))
+            sims["ranking/shared-prefix"].submit(
+                encode(PROMPTS["coldrag_ranking_system"] + system + user_query)
+            )
+
+    print(f"{'layout':<24}{'prompt tokens':>15}{'cached tokens':>15}{'shared-prefix ratio':>22}")
+    for name, sim in sims.items():
+        print(f"{name:<24}{sim.total_tokens:>15}{sim.cached_tokens:>15}{sim.ratio:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Memory / recall / latency benchmark for the int8 mode of NanoVectorDBStorage.
+
+Loads the entity and chunk vectors of a working directory (``vdb_entities.json`` /
+``vdb_chunks.json``), uses perturbed stored vectors as queries and takes exact
+float32 search as ground truth. For the float32 client and the int8 client at
+several re-rank factors it reports the in-memory size of the vectors, recall@k and
+mean / p95 query latency. The float32 size includes the float16 copies that
+records carry for ``get_vectors_by_ids``; the int8 size covers the codes and
+scales (full-precision vectors for re-ranking are memory-mapped from disk).
+Without a working directory (or with ``--synthetic N``) clustered random vectors
+are used.
+
+Usage:
+    python benchmarks/quantization_recall.py --working_dir ./workspace/amazon_15 --k 20
+    python benchmarks/quantization_recall.py --synthetic 100000 --dim 1024
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nano_vectordb import NanoVectorDB  # noqa: E402
+
+from coldrag.kg.vector_quantization import QuantizedNanoVectorDB  # noqa: E402
+
+NAMESPACES = ("entities", "chunks")
+
+
+def load_namespace(working_dir: str, namespace: str) -> np.ndarray | None:
+    path = os.path.join(working_dir, f"vdb_{namespace}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        dim = json.load(f)["embedding_dim"]
+    storage = getattr(NanoVectorDB(dim, storage_file=path), "_NanoVectorDB__storage")
+    return np.ascontiguousarray(storage["matrix"], dtype=np.float32)
+
+
+def synthetic_vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    # Clustered data, closer to real embeddings than uniform noise
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(n // 500, 8), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)]
+    vectors += 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), n)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def float16_copies_nbytes(vectors: np.ndarray) -> int:
+    """Size of the per-record float16 copies NanoVectorDBStorage keeps in float32 mode"""
+    return sum(
+        len(base64.b64encode(zlib.compress(v.astype(np.float16).tobytes())))
+        for v in vectors
+    )
+
+
+def measure(client: NanoVectorDB, queries: np.ndarray, truth: np.ndarray, k: int):
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = client.query(query, top_k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({int(r["__id__"]) for r in results} & set(expected.tolist()))
+    return hits / truth.size, np.mean(latencies), np.percentile(latencies, 95)
+
+
+def run(name: str, vectors: np.ndarray, args) -> None:
+    queries = make_queries(vectors, args.queries, args.seed)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+    dim = vectors.shape[1]
+
+    print(f"\n== {name}: {len(vectors)} vectors, dim {dim} ==")
+    print(
+        f"{'mode':<24}{'memory MB':>12}{f'recall@{args.k}':>12}{'mean ms':>10}{'p95 ms':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage_file = os.path.join(tmp_dir, f"vdb_{name}.json")
+        client = NanoVectorDB(dim, storage_file=storage_file)
+        client.upsert(
+            [{"__id__": str(i), "__vector__": v} for i, v in enumerate(vectors)]
+        )
+        client.save()
+        memory = vectors.nbytes + float16_copies_nbytes(vectors)
+        recall, mean_ms, p95_ms = measure(client, queries, truth, args.k)
+        print(
+            f"{'float32':<24}{memory / 2**20:>12.1f}{recall:>12.4f}"
+            f"{mean_ms:>10.3f}{p95_ms:>10.3f}"
+        )
+        del client
+
+        for factor in args.rerank_factor:
+            client = QuantizedNanoVectorDB(
+                dim, storage_file=storage_file, rerank_factor=factor
+            )
+            recall, mean_ms, p95_ms = measure(client, queries, truth, args.k)
+            label = f"int8 rerank x{factor}" if factor else "int8 no rerank"
+            print(
+                f"{label:<24}{client.nbytes / 2**20:>12.1f}{recall:>12.4f}"
+                f"{mean_ms:>10.3f}{p95_ms:>10.3f}"
+            )
+
+
+def main():
+    ap = argparse.ArgumentParser("ColdRAG int8 vector storage benchmark")
+    ap.add_argument("--working_dir", default=None, help="Directory with vdb_*.json")
+    ap.add_argument("--synthetic", type=int, default=None, help="Random vectors")
+    ap.add_argument("--dim", type=int, default=1024, help="Synthetic dimension")
+    ap.add_argument("--k", type=int, default=20)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--rerank_factor", type=int, nargs="+", default=[0, 2, 4, 8])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    datasets = []
+    if args.working_dir:
+        for namespace in NAMESPACES:
+            vectors = load_namespace(args.working_dir, namespace)
+            if vectors is not None and len(vectors):
+                datasets.append((namespace, vectors))
+    if args.synthetic or not datasets:
+        n = args.synthetic or 50000
+        datasets.append(("synthetic", synthetic_vectors(n, args.dim, args.seed)))
+
+    for name, vectors in datasets:
+        run(name, vectors, args)
+
+
+if __name__ == "__main__":
+    main()
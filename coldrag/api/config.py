@@ -307,6 +307,20 @@ def parse_args() -> argparse.Namespace:
     # Get MAX_GRAPH_NODES from environment
     args.max_graph_nodes = get_env_value("MAX_GRAPH_NODES", 1000, int)
 
+    # Number of serialised /graphs responses kept per server process (0 disables)
+    args.graph_response_cache_size = get_env_value("GRAPH_RESPONSE_CACHE_SIZE", 32, int)
+
+    # Users scored concurrently by /recommend/batch, shared by all batch jobs
+    args.recommend_max_concurrency = get_env_value("RECOMMEND_MAX_CONCURRENCY", 16, int)
+    # Idle batch jobs kept in memory; evicted jobs are reloaded from their job file
+    args.recommend_max_jobs = get_env_value("RECOMMEND_MAX_JOBS", 64, int)
+
+    # Admission control of the query routes: maximum estimated LLM queue wait in
+    # seconds (0 disables) and what to do above it ("degrade" or "reject")
+    args.query_wait_slo = get_env_value("QUERY_WAIT_SLO", 60.0, float)
+    args.query_data_wait_slo = get_env_value("QUERY_DATA_WAIT_SLO", 60.0, float)
+    args.query_overload_action = get_env_value("QUERY_OVERLOAD_ACTION", "degrade")
+
     # Handle openai-ollama special case
     if args.llm_binding == "openai-ollama":
         args.llm_binding = "openai"
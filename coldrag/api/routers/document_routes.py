@@ -2117,6 +2117,7 @@ def create_document_routes(
                 rag.full_relations,
                 rag.entity_chunks,
                 rag.relation_chunks,
+                rag.chunk_graph_index,
                 rag.entities_vdb,
                 rag.relationships_vdb,
                 rag.chunks_vdb,
@@ -2,17 +2,57 @@
 This module contains all graph-related routes for the LightRAG API.
 """
 
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 import traceback
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
 from lightrag.utils import logger
+from ..config import global_args
 from ..utils_api import get_combined_auth_dependency
 
 router = APIRouter(tags=["graph"])
 
 
+class GraphResponseCache:
+    """LRU of serialised ``/graphs`` responses keyed on (label, depth, max_nodes, version)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if self.max_size <= 0:
+            return
+        # Entries of older graph versions can never be hit again
+        version = key[-1]
+        for stale_key in [k for k in self._entries if k[-1] != version]:
+            del self._entries[stale_key]
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
 class EntityUpdateRequest(BaseModel):
     entity_name: str
     updated_data: Dict[str, Any]
@@ -88,6 +128,7 @@ class RelationCreateRequest(BaseModel):
 
 def create_graph_routes(rag, api_key: Optional[str] = None):
     combined_auth = get_combined_auth_dependency(api_key)
+    graph_cache = GraphResponseCache(global_args.graph_response_cache_size)
 
     @router.get("/graph/label/list", dependencies=[Depends(combined_auth)])
     async def get_graph_labels():
@@ -158,6 +199,7 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
 
     @router.get("/graphs", dependencies=[Depends(combined_auth)])
     async def get_knowledge_graph(
+        request: Request,
         label: str = Query(..., description="Label to get knowledge graph for"),
         max_depth: int = Query(3, description="Maximum depth of graph", ge=1),
         max_nodes: int = Query(1000, description="Maximum nodes to return", ge=1),
@@ -173,6 +215,10 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
             max_depth (int, optional): Maximum depth of the subgraph,Defaults to 3
             max_nodes: Maxiumu nodes to return
 
+        Responses carry an ETag derived from the graph version; a request whose
+        If-None-Match still matches gets 304 Not Modified. Serialised responses are
+        cached per (label, max_depth, max_nodes) until the graph changes.
+
         Returns:
             Dict[str, List[str]]: Knowledge graph for label
         """
@@ -182,10 +228,37 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
                 f"get_knowledge_graph called with label: '{label}' (length: {len(label)}, repr: {repr(label)})"
             )
 
-            return await rag.get_knowledge_graph(
-                node_label=label,
-                max_depth=max_depth,
-                max_nodes=max_nodes,
+            graph_storage = rag.chunk_entity_relation_graph
+            version = await graph_storage.get_graph_version()
+            if version is None:
+                # Storage does not track versions: no caching
+                return await rag.get_knowledge_graph(
+                    node_label=label,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                )
+
+            headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+            if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+
+            cache_key = (label, max_depth, max_nodes, version)
+            body = graph_cache.get(cache_key)
+            if body is None:
+                knowledge_graph = await rag.get_knowledge_graph(
+                    node_label=label,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                )
+                body = knowledge_graph.model_dump_json().encode("utf-8")
+                # Only cache if the graph did not change while the subgraph was built
+                if await graph_storage.get_graph_version() == version:
+                    graph_cache.put(cache_key, body)
+                else:
+                    headers.pop("ETag")
+
+            return Response(
+                content=body, media_type="application/json", headers=headers
             )
         except Exception as e:
             logger.error(f"Error getting knowledge graph for label '{label}': {str(e)}")
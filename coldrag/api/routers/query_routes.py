@@ -6,9 +6,11 @@ import json
 import logging
 from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from lightrag.base import QueryParam
-from lightrag.api.utils_api import get_combined_auth_dependency
+from lightrag.utils import QueueFullError
+from lightrag.api.utils_api import admit_query, get_combined_auth_dependency
+from lightrag.api.config import global_args
 from pydantic import BaseModel, Field, field_validator
 
 from ascii_colors import trace_exception
@@ -22,9 +24,11 @@ class QueryRequest(BaseModel):
         description="The query text",
     )
 
-    mode: Literal["local", "global", "hybrid", "naive", "mix", "bypass"] = Field(
-        default="mix",
-        description="Query mode",
+    mode: Literal["local", "global", "hybrid", "naive", "mix", "bypass", "coldrag"] = (
+        Field(
+            default="mix",
+            description="Query mode",
+        )
     )
 
     only_need_context: Optional[bool] = Field(
@@ -277,7 +281,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             },
         },
     )
-    async def query_text(request: QueryRequest):
+    async def query_text(request: QueryRequest, response: Response):
         """
         Comprehensive RAG query endpoint with non-streaming response. Parameter "stream" is ignored.
 
@@ -354,6 +358,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         Raises:
             HTTPException:
                 - 400: Invalid input parameters (e.g., query too short)
+                - 429: LLM queue overloaded, retry after the Retry-After header
                 - 500: Internal processing error (e.g., LLM service unavailable)
         """
         try:
@@ -363,6 +368,10 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             # Force stream=False for /query endpoint regardless of include_references setting
             param.stream = False
 
+            degraded = admit_query(rag, param, global_args.query_wait_slo, True)
+            if degraded:
+                response.headers["X-Query-Degraded"] = degraded
+
             # Unified approach: always use aquery_llm for both cases
             result = await rag.aquery_llm(request.query, param=param)
 
@@ -380,6 +389,10 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
                 return QueryResponse(response=response_content, references=references)
             else:
                 return QueryResponse(response=response_content, references=None)
+        except HTTPException:
+            raise
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
             trace_exception(e)
             raise HTTPException(status_code=500, detail=str(e))
@@ -579,6 +592,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         Raises:
             HTTPException:
                 - 400: Invalid input parameters (e.g., query too short, invalid mode)
+                - 429: LLM queue overloaded, retry after the Retry-After header
                 - 500: Internal processing error (e.g., LLM service unavailable)
 
         Note:
@@ -589,6 +603,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             # Use the stream parameter from the request, defaulting to True if not specified
             stream_mode = request.stream if request.stream is not None else True
             param = request.to_query_params(stream_mode)
+            degraded = admit_query(rag, param, global_args.query_wait_slo, True)
 
             from fastapi.responses import StreamingResponse
 
@@ -635,8 +650,13 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
                     "Connection": "keep-alive",
                     "Content-Type": "application/x-ndjson",
                     "X-Accel-Buffering": "no",  # Ensure proper handling of streaming response when proxied by Nginx
+                    **({"X-Query-Degraded": degraded} if degraded else {}),
                 },
             )
+        except HTTPException:
+            raise
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
             trace_exception(e)
             raise HTTPException(status_code=500, detail=str(e))
@@ -937,7 +957,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             },
         },
     )
-    async def query_data(request: QueryRequest):
+    async def query_data(request: QueryRequest, response: Response):
         """
         Advanced data retrieval endpoint for structured RAG analysis.
 
@@ -1034,6 +1054,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         Raises:
             HTTPException:
                 - 400: Invalid input parameters (e.g., query too short, invalid mode)
+                - 429: LLM queue overloaded, retry after the Retry-After header
                 - 500: Internal processing error (e.g., knowledge graph unavailable)
 
         Note:
@@ -1042,11 +1063,14 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         """
         try:
             param = request.to_query_params(False)  # No streaming for data endpoint
-            response = await rag.aquery_data(request.query, param=param)
+            degraded = admit_query(rag, param, global_args.query_data_wait_slo, False)
+            if degraded:
+                response.headers["X-Query-Degraded"] = degraded
+            result = await rag.aquery_data(request.query, param=param)
 
             # aquery_data returns the new format with status, message, data, and metadata
-            if isinstance(response, dict):
-                return QueryDataResponse(**response)
+            if isinstance(result, dict):
+                return QueryDataResponse(**result)
             else:
                 # Handle unexpected response format
                 return QueryDataResponse(
@@ -1054,6 +1078,10 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
                     message="Invalid response type",
                     data={},
                 )
+        except HTTPException:
+            raise
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
             trace_exception(e)
             raise HTTPException(status_code=500, detail=str(e))
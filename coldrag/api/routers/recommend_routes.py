@@ -0,0 +1,310 @@
+"""
+This module contains the batch recommendation route of the ColdRAG API.
+"""
+
+import asyncio
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+
+from lightrag.base import QueryParam
+from lightrag.prompt import parse_ranked_items, render_recommend_query
+from lightrag.utils import compute_args_hash, generate_track_id, logger
+from lightrag.api.utils_api import get_combined_auth_dependency
+from ..config import global_args
+
+router = APIRouter(tags=["recommend"])
+
+_JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class RecommendUser(BaseModel):
+    user_id: str = Field(
+        min_length=1, description="User identifier, echoed in the result"
+    )
+    history: List[str] = Field(
+        min_length=1, description="Purchased items in chronological order"
+    )
+    candidates: Optional[List[str]] = Field(
+        default=None,
+        description="Candidate items. Listed in the query for non-coldrag modes; in coldrag mode they restrict reasoning when restrict_to_candidates is set.",
+    )
+
+
+class RecommendBatchRequest(BaseModel):
+    users: List[RecommendUser] = Field(min_length=1, description="Users to score")
+    k: int = Field(default=20, ge=1, description="Number of recommended items per user")
+    mode: Literal["coldrag", "local", "global", "hybrid", "naive", "mix"] = Field(
+        default="coldrag", description="Query mode"
+    )
+    history_window: int = Field(
+        default=20,
+        ge=1,
+        description="Only the most recent items of each history are used",
+    )
+    restrict_to_candidates: bool = Field(
+        default=False,
+        description="coldrag mode: only expand graph paths that reach the user's candidates",
+    )
+    use_item_index: bool = Field(
+        default=False, description="coldrag mode: seed reasoning from the item index"
+    )
+    pipelined_reasoning: bool = Field(
+        default=False, description="coldrag mode: pipelined hop expansion"
+    )
+    max_retry: int = Field(
+        default=3,
+        ge=1,
+        description="Attempts per user until the response contains k ranked items",
+    )
+    job_id: Optional[str] = Field(
+        default=None,
+        description="Resume (or name) a job. Users already finished in the job are replayed instead of recomputed.",
+    )
+
+    @field_validator("users", mode="after")
+    @classmethod
+    def unique_user_ids(cls, users: List[RecommendUser]) -> List[RecommendUser]:
+        if len({u.user_id for u in users}) != len(users):
+            raise ValueError("user_id values must be unique within a batch")
+        return users
+
+    @field_validator("job_id", mode="after")
+    @classmethod
+    def job_id_check(cls, job_id: Optional[str]) -> Optional[str]:
+        if job_id is not None and not _JOB_ID_PATTERN.match(job_id):
+            raise ValueError(
+                "job_id may only contain letters, digits, '_', '.' and '-'"
+            )
+        return job_id
+
+
+class RecommendJob:
+    """Results of one batch job, appended to ``<job_id>.ndjson`` as users finish.
+
+    Scoring tasks belong to the job, not to the HTTP response: a client that
+    disconnects can resume with the same job id and receives the finished users
+    immediately, then the remaining ones as they complete. Only successful results
+    are persisted; failed users are scored again on resume.
+    """
+
+    def __init__(self, job_id: str, path: str):
+        self.job_id = job_id
+        self.path = path
+        self.lines: Dict[str, str] = {}
+        self.failed: set[str] = set()
+        self.order: List[str] = []
+        self.running: set[str] = set()
+        self.tasks: set[asyncio.Task] = set()
+        self.runs: Dict[str, asyncio.Task] = {}
+        self.changed = asyncio.Condition()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.lines[record["user_id"]] = line.rstrip("\n") + "\n"
+                        self.order.append(record["user_id"])
+
+    @property
+    def idle(self) -> bool:
+        return not self.running and not self.tasks
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "completed": len(self.lines) - len(self.failed),
+            "failed": len(self.failed),
+            "running": len(self.running),
+        }
+
+    async def add(self, record: Dict[str, Any]) -> None:
+        user_id = record["user_id"]
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        if record["status"] == "failure":
+            self.failed.add(user_id)
+        else:
+            self.failed.discard(user_id)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        async with self.changed:
+            self.lines[user_id] = line
+            self.order.append(user_id)
+            self.running.discard(user_id)
+            self.changed.notify_all()
+
+    async def stream(self, user_ids: List[str]):
+        """Yield the result line of every user in ``user_ids`` in completion order."""
+        wanted = set(user_ids)
+        sent: set[str] = set()
+        cursor = 0
+        while len(sent) < len(wanted):
+            async with self.changed:
+                while cursor == len(self.order):
+                    await self.changed.wait()
+                ready = self.order[cursor:]
+                cursor = len(self.order)
+            for user_id in ready:
+                # A user being retried has no line until its new result arrives
+                if user_id in wanted and user_id not in sent and user_id in self.lines:
+                    sent.add(user_id)
+                    yield self.lines[user_id]
+
+
+def create_recommend_routes(rag, api_key: Optional[str] = None):
+    combined_auth = get_combined_auth_dependency(api_key)
+    jobs_dir = os.path.join(rag.working_dir, "recommend_jobs")
+    # LRU of jobs; idle ones beyond RECOMMEND_MAX_JOBS are dropped (their results
+    # stay in the job file and are reloaded on resume)
+    jobs: OrderedDict[str, RecommendJob] = OrderedDict()
+    # Shared by all jobs of this server process
+    semaphore = asyncio.Semaphore(global_args.recommend_max_concurrency)
+
+    def get_job(job_id: Optional[str]) -> RecommendJob:
+        job_id = job_id or generate_track_id("recommend")
+        if job_id not in jobs:
+            os.makedirs(jobs_dir, exist_ok=True)
+            jobs[job_id] = RecommendJob(
+                job_id, os.path.join(jobs_dir, f"{job_id}.ndjson")
+            )
+        jobs.move_to_end(job_id)
+        idle = [jid for jid, j in jobs.items() if jid != job_id and j.idle]
+        for jid in idle[: max(0, len(jobs) - global_args.recommend_max_jobs)]:
+            del jobs[jid]
+        return jobs[job_id]
+
+    async def recommend(query: str, param: QueryParam, request: RecommendBatchRequest):
+        async with semaphore:
+            items: List[str] = []
+            for _ in range(request.max_retry):
+                response = await rag.aquery(query, param=param)
+                items = parse_ranked_items(response, request.k)
+                if len(items) >= request.k:
+                    break
+            return items
+
+    async def score_user(
+        job: RecommendJob, user: RecommendUser, request: RecommendBatchRequest
+    ) -> None:
+        history = user.history[-request.history_window :]
+        listed = None if request.mode == "coldrag" else (user.candidates or [])
+        query = render_recommend_query(history, request.k, listed)
+        restrict = request.restrict_to_candidates and request.mode == "coldrag"
+        param = QueryParam(
+            mode=request.mode,
+            stream=False,
+            enable_rerank=False,
+            candidate_items=user.candidates if restrict and user.candidates else None,
+            use_item_index=request.use_item_index,
+            pipelined_reasoning=request.pipelined_reasoning,
+        )
+        # Users with the same query and settings share one run while it is in flight
+        key = compute_args_hash(
+            query,
+            param.mode,
+            param.candidate_items,
+            param.use_item_index,
+            param.pipelined_reasoning,
+            request.max_retry,
+        )
+        run = job.runs.get(key)
+        if run is None:
+            run = asyncio.create_task(recommend(query, param, request))
+            job.runs[key] = run
+            run.add_done_callback(
+                lambda t: job.runs.pop(key, None) if job.runs.get(key) is t else None
+            )
+        try:
+            items = await run
+            record = {
+                "user_id": user.user_id,
+                "status": "success" if len(items) >= request.k else "partial",
+                "items": items,
+            }
+        except Exception as e:
+            logger.error(f"Recommendation failed for user {user.user_id}: {e}")
+            record = {"user_id": user.user_id, "status": "failure", "error": str(e)}
+        await job.add(record)
+
+    @router.post("/recommend/batch", dependencies=[Depends(combined_auth)])
+    async def recommend_batch(request: RecommendBatchRequest):
+        """
+        Score many users in one request and stream their recommendations as NDJSON.
+
+        Users are scheduled on the server with bounded concurrency
+        (RECOMMEND_MAX_CONCURRENCY, shared by all jobs) and every line is sent as soon
+        as its user completes, in completion order:
+
+        - first line: `{"job_id": ..., "total": n, "completed": m}`
+        - then one line per user:
+          `{"user_id": ..., "status": "success" | "partial", "items": [...]}` or
+          `{"user_id": ..., "status": "failure", "error": ...}`
+
+        Pass the returned `job_id` again to resume after a disconnect: finished users
+        are replayed from the job file and users still running are not restarted.
+        Identical concurrent queries share one run (see QueryParam.coalesce_identical)
+        and the LLM response cache is shared by the whole batch.
+        """
+        try:
+            job = get_job(request.job_id)
+            user_ids = [u.user_id for u in request.users]
+            for user in request.users:
+                done = user.user_id in job.lines and user.user_id not in job.failed
+                if done or user.user_id in job.running:
+                    continue
+                job.running.add(user.user_id)
+                job.lines.pop(user.user_id, None)
+                job.failed.discard(user.user_id)
+                task = asyncio.create_task(score_user(job, user, request))
+                job.tasks.add(task)
+                task.add_done_callback(job.tasks.discard)
+            completed = sum(
+                1 for u in user_ids if u in job.lines and u not in job.failed
+            )
+            logger.info(
+                f"Recommend job {job.job_id}: {len(user_ids)} users, {completed} already completed"
+            )
+
+            async def stream_generator():
+                header = {
+                    "job_id": job.job_id,
+                    "total": len(user_ids),
+                    "completed": completed,
+                }
+                yield f"{json.dumps(header)}\n"
+                async for line in job.stream(user_ids):
+                    yield line
+
+            return StreamingResponse(
+                stream_generator(),
+                media_type="application/x-ndjson",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "Content-Type": "application/x-ndjson",
+                    "X-Accel-Buffering": "no",
+                    "X-Job-Id": job.job_id,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Failed to start recommend job: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.get("/recommend/batch/{job_id}", dependencies=[Depends(combined_auth)])
+    async def recommend_batch_status(job_id: str):
+        """Progress of a batch job: completed, failed and running users."""
+        if not _JOB_ID_PATTERN.match(job_id):
+            raise HTTPException(status_code=400, detail="Invalid job_id")
+        if job_id not in jobs and not os.path.exists(
+            os.path.join(jobs_dir, f"{job_id}.ndjson")
+        ):
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return get_job(job_id).status()
+
+    return router
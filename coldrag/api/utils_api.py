@@ -4,6 +4,8 @@ Utility functions for the LightRAG API.
 
 import os
 import argparse
+import math
+from dataclasses import replace
 from typing import Optional, List, Tuple
 import sys
 from ascii_colors import ASCIIColors
@@ -13,6 +15,8 @@ from lightrag.constants import (
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
 )
 from fastapi import HTTPException, Security, Request, status
+from lightrag.base import QueryParam
+from lightrag.utils import logger
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from starlette.status import HTTP_403_FORBIDDEN
 from .auth import auth_handler
@@ -166,6 +170,80 @@ def get_combined_auth_dependency(api_key: Optional[str] = None):
     return combined_dependency
 
 
+def _estimated_query_wait(rag, param: QueryParam) -> float:
+    """Expected LLM queue wait of a query, 0.0 if the scheduler is not available"""
+    estimate_wait = getattr(rag.llm_model_func, "estimate_wait", None)
+    if estimate_wait is None or param.model_func is not None:
+        return 0.0
+    # coldrag edge scoring runs at priority 6, everything else a query calls at 5
+    return estimate_wait(6 if param.mode == "coldrag" else 5)
+
+
+def _needs_llm_for_context(param: QueryParam) -> bool:
+    if param.mode == "naive":
+        return False
+    if param.mode in ("local", "global", "hybrid", "mix"):
+        return not (param.hl_keywords or param.ll_keywords)
+    return True
+
+
+def admit_query(rag, param: QueryParam, slo: float, allow_context_only: bool) -> str:
+    """
+    Admission control for query routes, based on the live LLM queue.
+
+    Compares the estimated queue wait with the route's SLO before any retrieval
+    work is done. When the query would miss it and QUERY_OVERLOAD_ACTION is
+    "degrade", ``param`` is downgraded in place to a cheaper plan that meets the SLO:
+    coldrag -> hybrid, then (``allow_context_only``) ``only_need_context`` when the
+    context can be built without any LLM call. Otherwise the request is rejected.
+
+    Args:
+        rag: LightRAG instance serving the query
+        param: Query parameters of the request, modified when degraded
+        slo: Maximum acceptable queue wait in seconds (0 disables admission control)
+        allow_context_only: Whether the route may answer with the context only
+
+    Returns:
+        str: Description of the applied downgrade, "" if the query runs as requested
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when the query is shed
+    """
+    if slo <= 0:
+        return ""
+    wait = _estimated_query_wait(rag, param)
+    if wait <= slo:
+        return ""
+
+    if global_args.query_overload_action == "degrade":
+        if param.mode == "coldrag":
+            if _estimated_query_wait(rag, replace(param, mode="hybrid")) <= slo:
+                param.mode = "hybrid"
+                logger.info(
+                    f"Query degraded to hybrid mode (estimated wait {wait:.1f}s)"
+                )
+                return "mode=hybrid"
+        if (
+            allow_context_only
+            and not param.only_need_context
+            and not _needs_llm_for_context(param)
+        ):
+            param.only_need_context = True
+            param.stream = False
+            logger.info(f"Query degraded to context only (estimated wait {wait:.1f}s)")
+            return "only_need_context"
+
+    retry_after = max(1, math.ceil(wait - slo))
+    logger.warning(
+        f"Query rejected: estimated LLM queue wait {wait:.1f}s exceeds SLO {slo:.1f}s"
+    )
+    raise HTTPException(
+        status_code=429,
+        detail=f"LLM queue overloaded, estimated wait {wait:.1f}s exceeds {slo:.1f}s",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
 def display_splash_screen(args: argparse.Namespace) -> None:
     """
     Display a colorful splash screen showing LightRAG server configuration
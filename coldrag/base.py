@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from enum import Enum
 import os
@@ -15,9 +16,9 @@ from typing import (
     Dict,
     List,
     AsyncIterator,
+    TYPE_CHECKING,
 )
 from .utils import EmbeddingFunc
-from .types import KnowledgeGraph
 from .constants import (
     GRAPH_FIELD_SEP,
     DEFAULT_TOP_K,
@@ -33,6 +34,10 @@ from .constants import (
     DEFAULT_OLLAMA_DIGEST,
 )
 
+if TYPE_CHECKING:
+    from .snapshot import WorkspaceSnapshot
+    from .types import KnowledgeGraph
+
 # use the .env that is inside the current folder
 # allows to use different .env file for each lightrag instance
 # the OS environment variables take precedence over the .env file
@@ -169,6 +174,40 @@ class QueryParam:
     containing citation information for the retrieved content.
     """
 
+    candidate_items: list[str] | None = None
+    """Optional candidate item titles for 'coldrag' mode.
+    When provided, multi-hop expansion and edge scoring are restricted to paths that can
+    reach at least one candidate within the reasoning hop budget, and only candidate items
+    are collected as recommendation targets. None or an empty list disables the restriction.
+    """
+
+    use_item_index: bool = False
+    """If True, 'coldrag' mode seeds its candidate items and frontier from the precomputed
+    item neighbourhood index (see LightRAG.abuild_item_index) instead of rediscovering
+    item-attribute-item paths hop by hop. Ignored when no index has been built.
+    """
+
+    item_index_seed_ratio: float = 0.5
+    """Fraction of the coldrag item budget that ``use_item_index`` may fill from the index.
+    The rest is left to LLM-scored hops; seeded items are ranked by the LLM score of the
+    edge to their connecting attribute.
+    """
+
+    pipelined_reasoning: bool = False
+    """If True, 'coldrag' mode scores frontier edges through a global priority queue without
+    waiting for every batch of a hop: each finished batch immediately expands its selected
+    edges. With unlimited budgets the result closely follows the hop-synchronous mode.
+    """
+
+    max_inflight_batches: int = 8
+    """Maximum number of concurrent edge-scoring LLM batches in pipelined coldrag reasoning."""
+
+    coalesce_identical: bool = True
+    """If True, a query identical (same text, system prompt and parameters) to one that is
+    still in flight waits for and shares its result instead of running again. Streaming
+    responses are replayed to every caller. Set False to always run the query separately.
+    """
+
 
 @dataclass
 class StorageNameSpace(ABC):
@@ -188,6 +227,15 @@ class StorageNameSpace(ABC):
     async def index_done_callback(self) -> None:
         """Commit the storage operations after indexing"""
 
+    async def export_snapshot(self, snapshot: WorkspaceSnapshot) -> bool:
+        """Add the (already persisted) storage data to a warm-start snapshot
+
+        Returns:
+            bool: True if an entry was written, False if the storage does not support
+            snapshots (e.g. database backends) or has nothing on disk yet
+        """
+        return False
+
     @abstractmethod
     async def drop(self) -> dict[str, str]:
         """Drop all data from storage and clean up resources
@@ -314,6 +362,18 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def get_index_version(self) -> str | None:
+        """Get an opaque token that changes whenever the stored vectors change
+
+        Callers use it to cache results derived from the vectors (see
+        ``coldrag.derived_cache``). Storages that do not track changes return
+        None, which disables such caching.
+
+        Returns:
+            Version token, or None if not supported
+        """
+        return None
+
 
 @dataclass
 class BaseKVStorage(StorageNameSpace, ABC):
@@ -364,6 +424,22 @@ class BaseKVStorage(StorageNameSpace, ABC):
         """
 
 
+@dataclass
+class FrontierExpansion:
+    """One hop of graph expansion returned by ``BaseGraphStorage.expand_frontier``.
+
+    Attributes:
+        edges: (frontier node, neighbor) -> edge properties. Every undirected edge
+            appears once, even when both endpoints are in the frontier.
+        nodes: Properties of the neighbors that were not excluded
+        degrees: Degrees of the neighbors in ``nodes``
+    """
+
+    edges: dict[tuple[str, str], dict] = field(default_factory=dict)
+    nodes: dict[str, dict] = field(default_factory=dict)
+    degrees: dict[str, int] = field(default_factory=dict)
+
+
 @dataclass
 class BaseGraphStorage(StorageNameSpace, ABC):
     """All operations related to edges in graph should be undirected."""
@@ -528,6 +604,80 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             result[node_id] = edges if edges is not None else []
         return result
 
+    async def expand_frontier(
+        self,
+        nodes: list[str],
+        exclude: set[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_fields: list[str] | None = None,
+        limit: int | None = None,
+    ) -> FrontierExpansion:
+        """Get the next hop of ``nodes``: incident edges and neighbor nodes in one call
+
+        Edges to excluded neighbors are still returned, but their node data and
+        degree are not fetched (the caller already has them).
+
+        Default implementation combines the batch methods above. Graph database
+        backends override it with a single query so a hop costs one round-trip.
+
+        Args:
+            nodes: Frontier node IDs
+            exclude: Neighbors whose node data and degree are not needed
+            edge_fields: Edge properties to return, None for all
+            node_fields: Node properties to return, None for all
+            limit: Maximum number of edges per frontier node, None for all
+
+        Returns:
+            FrontierExpansion with the edges, neighbor nodes and neighbor degrees
+        """
+        exclude = exclude or set()
+        expansion = FrontierExpansion()
+        edges_by_node = await self.get_nodes_edges_batch(nodes)
+        seen: set[tuple[str, str]] = set()
+        for node in nodes:
+            count = 0
+            for src, tgt in edges_by_node.get(node) or []:
+                if limit is not None and count >= limit:
+                    break
+                neighbor = tgt if src == node else src
+                key = tuple(sorted((node, neighbor)))
+                if key in seen:
+                    continue
+                seen.add(key)
+                expansion.edges[(node, neighbor)] = {}
+                count += 1
+        if not expansion.edges:
+            return expansion
+
+        edge_data = await self.get_edges_batch(
+            [{"src": src, "tgt": tgt} for src, tgt in expansion.edges]
+        )
+        for src, tgt in list(expansion.edges):
+            data = edge_data.get((src, tgt)) or edge_data.get((tgt, src))
+            if data is None:
+                del expansion.edges[(src, tgt)]
+                continue
+            if edge_fields is not None:
+                data = {k: data[k] for k in edge_fields if k in data}
+            expansion.edges[(src, tgt)] = dict(data)
+
+        neighbors = list(
+            dict.fromkeys(tgt for _, tgt in expansion.edges if tgt not in exclude)
+        )
+        if neighbors:
+            node_data, degrees = await asyncio.gather(
+                self.get_nodes_batch(neighbors), self.node_degrees_batch(neighbors)
+            )
+            for name in neighbors:
+                data = node_data.get(name)
+                if data is None:
+                    continue
+                if node_fields is not None:
+                    data = {k: data[k] for k in node_fields if k in data}
+                expansion.nodes[name] = dict(data)
+                expansion.degrees[name] = degrees.get(name, 0)
+        return expansion
+
     @abstractmethod
     async def get_nodes_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
         """Get all nodes that are associated with the given chunk_ids.
@@ -714,6 +864,18 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             List of matching labels sorted by relevance
         """
 
+    async def get_graph_version(self) -> str | None:
+        """Get an opaque token that changes whenever the graph content changes
+
+        Callers use it to cache results derived from the graph (e.g. ``/graphs``
+        responses). Storages that do not track changes return None, which disables
+        such caching.
+
+        Returns:
+            Version token, or None if not supported
+        """
+        return None
+
 
 class DocStatus(str, Enum):
     """Document processing status"""
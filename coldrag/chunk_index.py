@@ -0,0 +1,211 @@
+"""Inverted chunk -> entity / relation index.
+
+``entity_chunks`` and ``relation_chunks`` map an entity name or relation key to the
+chunk ids it was extracted from. ``ChunkGraphIndex`` keeps the reverse mapping in its
+own KV namespace (``chunk_graph_index``), one record per chunk id::
+
+    {"entity_names": [...], "relation_keys": [...]}
+
+so deleting or rebuilding a set of chunks touches only the records that reference
+them instead of scanning every node and edge.
+
+The index is kept in step by ``ChunkTrackedKVStorage``, a thin proxy that LightRAG
+puts in front of ``entity_chunks`` / ``relation_chunks``: every ``upsert`` and
+``delete`` on the tracking store diffs the old and new chunk lists and applies the
+delta to the index, so all existing merge, rebuild and delete paths update it
+without knowing about it.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from coldrag.base import BaseKVStorage
+from coldrag.constants import GRAPH_FIELD_SEP
+from coldrag.kg.shared_storage import get_storage_keyed_lock
+from coldrag.utils import logger, make_relation_chunk_key
+
+ENTITY_FIELD = "entity_names"
+RELATION_FIELD = "relation_keys"
+
+
+def _chunk_list(record: dict | None) -> list[str]:
+    if not record or not isinstance(record, dict):
+        return []
+    return [chunk_id for chunk_id in record.get("chunk_ids", []) if chunk_id]
+
+
+class ChunkGraphIndex:
+    """Reverse index from chunk id to the entity names and relation keys it supports."""
+
+    def __init__(self, storage: BaseKVStorage):
+        self.storage = storage
+        workspace = getattr(storage, "workspace", "") or ""
+        self._lock_namespace = (
+            f"{workspace}:ChunkGraphIndex" if workspace else "ChunkGraphIndex"
+        )
+
+    async def apply(
+        self, field: str, changes: dict[str, tuple[Iterable[str], Iterable[str]]]
+    ) -> None:
+        """Apply ``{key: (old_chunk_ids, new_chunk_ids)}`` deltas for one field."""
+        added: dict[str, set[str]] = {}
+        removed: dict[str, set[str]] = {}
+        for key, (old, new) in changes.items():
+            old_set, new_set = set(old), set(new)
+            for chunk_id in new_set - old_set:
+                added.setdefault(chunk_id, set()).add(key)
+            for chunk_id in old_set - new_set:
+                removed.setdefault(chunk_id, set()).add(key)
+
+        chunk_ids = sorted(set(added) | set(removed))
+        if not chunk_ids:
+            return
+
+        async with get_storage_keyed_lock(
+            chunk_ids, namespace=self._lock_namespace, enable_logging=False
+        ):
+            records = await self.storage.get_by_ids(chunk_ids)
+            upserts: dict[str, dict[str, Any]] = {}
+            deletes: list[str] = []
+            for chunk_id, record in zip(chunk_ids, records):
+                record = record or {}
+                entry = {
+                    ENTITY_FIELD: list(record.get(ENTITY_FIELD, [])),
+                    RELATION_FIELD: list(record.get(RELATION_FIELD, [])),
+                }
+                keys = set(entry[field])
+                keys |= added.get(chunk_id, set())
+                keys -= removed.get(chunk_id, set())
+                entry[field] = sorted(keys)
+                if entry[ENTITY_FIELD] or entry[RELATION_FIELD]:
+                    upserts[chunk_id] = entry
+                else:
+                    deletes.append(chunk_id)
+            if deletes:
+                await self.storage.delete(deletes)
+            if upserts:
+                await self.storage.upsert(upserts)
+
+    async def lookup(self, chunk_ids: Iterable[str]) -> tuple[set[str], set[str]]:
+        """Entity names and relation keys referenced by any of ``chunk_ids``."""
+        chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id]
+        entity_names: set[str] = set()
+        relation_keys: set[str] = set()
+        if not chunk_ids:
+            return entity_names, relation_keys
+        for record in await self.storage.get_by_ids(chunk_ids):
+            if record:
+                entity_names.update(record.get(ENTITY_FIELD, []))
+                relation_keys.update(record.get(RELATION_FIELD, []))
+        return entity_names, relation_keys
+
+    async def is_empty(self) -> bool:
+        return await self.storage.is_empty()
+
+
+class ChunkTrackedKVStorage:
+    """Proxy for ``entity_chunks`` / ``relation_chunks`` that mirrors writes into a ``ChunkGraphIndex``.
+
+    ``index_done_callback`` also persists the index; everything else is delegated
+    unchanged to the wrapped storage.
+    """
+
+    def __init__(self, inner: BaseKVStorage, index: ChunkGraphIndex, field: str):
+        self._inner = inner
+        self._index = index
+        self._field = field
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        if not data:
+            return
+        keys = list(data)
+        old_records = await self._inner.get_by_ids(keys)
+        await self._inner.upsert(data)
+        await self._apply(
+            {
+                key: (_chunk_list(old), _chunk_list(data[key]))
+                for key, old in zip(keys, old_records)
+            }
+        )
+
+    async def delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        ids = list(ids)
+        old_records = await self._inner.get_by_ids(ids)
+        await self._inner.delete(ids)
+        await self._apply(
+            {key: (_chunk_list(old), []) for key, old in zip(ids, old_records)}
+        )
+
+    async def index_done_callback(self) -> None:
+        await self._inner.index_done_callback()
+        await self._index.storage.index_done_callback()
+
+    async def _apply(self, changes) -> None:
+        try:
+            await self._index.apply(self._field, changes)
+        except Exception as e:
+            # The index only accelerates lookups; callers fall back to full_entities/full_relations
+            logger.warning(f"Failed to update chunk graph index: {e}")
+
+
+async def build_chunk_graph_index(
+    index: ChunkGraphIndex,
+    graph,
+    entity_chunks: BaseKVStorage,
+    relation_chunks: BaseKVStorage,
+    batch_size: int = 500,
+) -> tuple[int, int]:
+    """Seed ``index`` from the graph and the chunk tracking stores.
+
+    Full chunk lists are read from ``entity_chunks`` / ``relation_chunks``; the
+    (possibly truncated) ``source_id`` of the graph element is the fallback.
+    """
+    nodes = await graph.get_all_nodes()
+    entity_count = 0
+    for start in range(0, len(nodes), batch_size):
+        batch = nodes[start : start + batch_size]
+        names = [n.get("entity_id") or n.get("id") for n in batch]
+        stored = await entity_chunks.get_by_ids([name for name in names if name])
+        stored_iter = iter(stored)
+        changes = {}
+        for node, name in zip(batch, names):
+            if not name:
+                continue
+            chunk_ids = _chunk_list(next(stored_iter)) or [
+                c for c in (node.get("source_id") or "").split(GRAPH_FIELD_SEP) if c
+            ]
+            if chunk_ids:
+                changes[name] = ((), chunk_ids)
+        await index.apply(ENTITY_FIELD, changes)
+        entity_count += len(changes)
+
+    edges = await graph.get_all_edges()
+    relation_count = 0
+    for start in range(0, len(edges), batch_size):
+        batch = edges[start : start + batch_size]
+        keys = []
+        for edge in batch:
+            src = edge.get("source") or edge.get("src_id") or edge.get("src")
+            tgt = edge.get("target") or edge.get("tgt_id") or edge.get("tgt")
+            keys.append(make_relation_chunk_key(src, tgt) if src and tgt else None)
+        stored = await relation_chunks.get_by_ids([key for key in keys if key])
+        stored_iter = iter(stored)
+        changes = {}
+        for edge, key in zip(batch, keys):
+            if not key:
+                continue
+            chunk_ids = _chunk_list(next(stored_iter)) or [
+                c for c in (edge.get("source_id") or "").split(GRAPH_FIELD_SEP) if c
+            ]
+            if chunk_ids:
+                changes[key] = ((), chunk_ids)
+        await index.apply(RELATION_FIELD, changes)
+        relation_count += len(changes)
+
+    return entity_count, relation_count
@@ -13,6 +13,10 @@ DEFAULT_MAX_GRAPH_NODES = 1000
 # Default values for extraction settings
 DEFAULT_SUMMARY_LANGUAGE = "English"  # Default language for document processing
 DEFAULT_MAX_GLEANING = 1
+# Gleaning policy: "always" runs the gleaning pass, "adaptive" skips it when the first pass looks complete
+DEFAULT_GLEANING_POLICY = "always"
+# Adaptive gleaning: first pass must yield at least one record per this many chunk tokens
+DEFAULT_GLEANING_TOKENS_PER_RECORD = 40
 DEFAULT_ENTITY_NAME_MAX_LENGTH = 256
 
 # Number of description fragments to trigger LLM summary
@@ -23,6 +27,10 @@ DEFAULT_SUMMARY_MAX_TOKENS = 1200
 DEFAULT_SUMMARY_LENGTH_RECOMMENDED = 600
 # Maximum token size sent to LLM for summary
 DEFAULT_SUMMARY_CONTEXT_SIZE = 12000
+# Max entities/relations summarised per LLM call in the merge phase (1 = one call per name)
+DEFAULT_SUMMARY_BATCH_SIZE = 1
+# Seconds a summary request waits for others to share its batched LLM call
+DEFAULT_SUMMARY_BATCH_WAIT = 0.05
 # Default entities to extract if ENTITY_TYPES is not specified in .env
 DEFAULT_ENTITY_TYPES = [
     "Person",
@@ -91,6 +99,10 @@ DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
 
+# Derived query artifact cache defaults (see coldrag.derived_cache)
+DEFAULT_DERIVED_CACHE_MAX_BYTES = 67108864  # In-process LRU, default 64MB
+DEFAULT_DERIVED_CACHE_TTL = 86400  # Shared cache tier expiry, default 1 day
+
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
 
@@ -0,0 +1,336 @@
+"""Two-level cache for artifacts derived at query time.
+
+Query embeddings, keyword extractions and edge-relevance judgements are cheap to
+reuse but expensive to recompute, and without a shared store every worker process
+recomputes them. ``DerivedCache`` keeps them in a size-bounded in-process LRU (L1)
+in front of an optional ``BaseCacheTier`` (L2) shared by all workers, such as
+``coldrag.kg.redis_impl.RedisCacheTier``. L2 failures only cost a recomputation.
+
+Every artifact kind lists the versions it depends on (``ARTIFACT_DEPENDENCIES``)
+and those versions are part of its keys, so entries derived from an older graph
+or vector index are never looked up again and age out of the LRU and the L2 TTL:
+
+- ``embedding``: query text -> vector, versioned by the embedding model
+- ``keywords`` / ``reasoning``: keyword extraction and edge scoring LLM responses,
+  whose cache keys already hash the full prompt
+- ``coldrag``: coldrag reasoning results, versioned by the graph, the entity
+  vector index and the item neighbourhood index (kinds whose storages report no
+  version are not cached)
+
+Values are stored compactly: vectors as raw little-endian float32, strings as
+UTF-8, anything else as JSON.
+
+LightRAG puts ``DerivedCacheKVStorage`` in front of ``llm_response_cache`` so the
+existing ``handle_cache`` / ``save_to_cache`` calls for the query-time cache types
+go through both levels without knowing about them.
+"""
+
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from coldrag.base import BaseKVStorage
+from coldrag.utils import compute_args_hash, logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Versions each artifact kind is derived from
+ARTIFACT_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "embedding": ("embedding_model",),
+    "keywords": (),
+    "reasoning": (),
+    "coldrag": ("graph", "entities", "item_index"),
+}
+
+# llm_response_cache types served through the cache (query time only)
+TIERED_LLM_CACHE_TYPES = ("keywords", "reasoning")
+
+_VECTOR = b"v"
+_TEXT = b"s"
+_JSON = b"j"
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode a cache value; vectors become raw little-endian float32."""
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        return _VECTOR + np.ascontiguousarray(value, dtype="<f4").tobytes()
+    if isinstance(value, str):
+        return _TEXT + value.encode("utf-8")
+    return _JSON + json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def decode_value(data: bytes) -> Any:
+    tag, body = data[:1], data[1:]
+    if tag == _VECTOR:
+        import numpy as np
+
+        return np.frombuffer(body, dtype="<f4").copy()
+    if tag == _TEXT:
+        return body.decode("utf-8")
+    return json.loads(body)
+
+
+class LRUCache:
+    """In-process LRU of encoded values, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        cost = len(key) + len(data)
+        if cost > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(key) + len(old)
+        self._entries[key] = data
+        self.size += cost
+        while self.size > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self.size -= len(old_key) + len(old)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+@dataclass
+class BaseCacheTier(ABC):
+    """Store shared by all workers for encoded artifacts (the L2 of ``DerivedCache``)."""
+
+    namespace: str
+    workspace: str
+    global_config: dict[str, Any]
+
+    async def initialize(self):
+        """Initialize the tier"""
+        pass
+
+    async def finalize(self):
+        """Finalize the tier"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """Values of ``keys`` in order, None for missing keys"""
+
+    @abstractmethod
+    async def set_many(self, items: dict[str, bytes], ttl: int | None = None) -> None:
+        """Store ``items``, expiring after ``ttl`` seconds when given"""
+
+    @abstractmethod
+    async def drop(self) -> dict[str, str]:
+        """Remove every entry of this namespace
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+
+
+VersionSource = Callable[[], Awaitable[str | None]]
+
+
+class DerivedCache:
+    """L1 LRU plus optional shared L2 for derived artifacts, keyed by kind and version."""
+
+    def __init__(
+        self,
+        tier: BaseCacheTier | None,
+        versions: dict[str, VersionSource],
+        l1_max_bytes: int,
+        ttl: int | None = None,
+    ):
+        self.tier = tier
+        self.l1 = LRUCache(l1_max_bytes)
+        self.ttl = ttl
+        self._versions = versions
+        self.hits = {"l1": 0, "l2": 0}
+        self.misses = 0
+
+    async def _prefix(self, kind: str) -> str | None:
+        """Key prefix of ``kind`` at the current versions, None if not cacheable"""
+        parts = [kind]
+        for name in ARTIFACT_DEPENDENCIES[kind]:
+            source = self._versions.get(name)
+            version = await source() if source is not None else None
+            if version is None:
+                return None
+            parts.append(f"{name}={version}")
+        return ":".join(parts)
+
+    async def get_many(self, kind: str, keys: list[str]) -> dict[str, Any]:
+        """Cached values of ``keys``; missing keys are left out"""
+        if not keys:
+            return {}
+        prefix = await self._prefix(kind)
+        if prefix is None:
+            return {}
+
+        found: dict[str, bytes] = {}
+        remote = []
+        for key in keys:
+            data = self.l1.get(f"{prefix}:{key}")
+            if data is None:
+                remote.append(key)
+            else:
+                found[key] = data
+        self.hits["l1"] += len(found)
+
+        if remote and self.tier is not None:
+            try:
+                values = await self.tier.get_many([f"{prefix}:{k}" for k in remote])
+            except Exception as e:
+                logger.warning(f"Cache tier read failed: {e}")
+                values = []
+            for key, data in zip(remote, values):
+                if data is not None:
+                    self.l1.put(f"{prefix}:{key}", data)
+                    found[key] = data
+                    self.hits["l2"] += 1
+
+        self.misses += len(keys) - len(found)
+        return {key: decode_value(data) for key, data in found.items()}
+
+    async def set_many(self, kind: str, values: dict[str, Any]) -> None:
+        if not values:
+            return
+        prefix = await self._prefix(kind)
+        if prefix is None:
+            return
+        encoded = {f"{prefix}:{key}": encode_value(v) for key, v in values.items()}
+        for key, data in encoded.items():
+            self.l1.put(key, data)
+        if self.tier is not None:
+            try:
+                await self.tier.set_many(encoded, self.ttl)
+            except Exception as e:
+                logger.warning(f"Cache tier write failed: {e}")
+
+    async def get(self, kind: str, key: str) -> Any | None:
+        return (await self.get_many(kind, [key])).get(key)
+
+    async def set(self, kind: str, key: str, value: Any) -> None:
+        await self.set_many(kind, {key: value})
+
+    async def clear(self) -> None:
+        self.l1.clear()
+        if self.tier is not None:
+            try:
+                await self.tier.drop()
+            except Exception as e:
+                logger.warning(f"Cache tier drop failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.size,
+            "l1_hits": self.hits["l1"],
+            "l2_hits": self.hits["l2"],
+            "misses": self.misses,
+        }
+
+
+async def cached_embeddings(
+    cache: DerivedCache | None, embedding_func, texts: list[str]
+) -> np.ndarray:
+    """Embed ``texts`` at query priority, reusing cached vectors.
+
+    Texts not found in the cache are embedded together in a single call.
+    """
+    if cache is None or not texts:
+        return await embedding_func(texts, _priority=5)
+
+    keys = [compute_args_hash(text) for text in texts]
+    found = await cache.get_many("embedding", keys)
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    if missing:
+        text_of = dict(zip(keys, texts))
+        vectors = await embedding_func([text_of[k] for k in missing], _priority=5)
+        computed = dict(zip(missing, vectors))
+        await cache.set_many("embedding", computed)
+        found.update(computed)
+    import numpy as np
+
+    return np.array([found[key] for key in keys])
+
+
+def _tiered_cache_type(key: str) -> str | None:
+    # llm_response_cache keys are "{mode}:{cache_type}:{hash}"; mode "default" is extraction
+    parts = key.split(":")
+    if len(parts) == 3 and parts[0] != "default" and parts[1] in TIERED_LLM_CACHE_TYPES:
+        return parts[1]
+    return None
+
+
+class DerivedCacheKVStorage:
+    """Proxy for ``llm_response_cache`` that serves query-time cache types through a ``DerivedCache``.
+
+    Only the fields ``handle_cache`` reads are kept in the cache; the wrapped
+    storage still receives every write and answers every other call.
+    """
+
+    def __init__(self, inner: BaseKVStorage, cache: DerivedCache):
+        self._inner = inner
+        self.derived_cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        kind = _tiered_cache_type(id)
+        if kind is None:
+            return await self._inner.get_by_id(id)
+        record = await self.derived_cache.get(kind, id)
+        if record is not None:
+            return record
+        record = await self._inner.get_by_id(id)
+        if record is not None:
+            await self.derived_cache.set(kind, id, _cached_fields(record))
+        return record
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        await self._inner.upsert(data)
+        by_kind: dict[str, dict[str, Any]] = {}
+        for key, record in data.items():
+            kind = _tiered_cache_type(key)
+            if kind is not None:
+                by_kind.setdefault(kind, {})[key] = _cached_fields(record)
+        for kind, records in by_kind.items():
+            await self.derived_cache.set_many(kind, records)
+
+    async def delete(self, ids: list[str]) -> None:
+        await self._inner.delete(ids)
+        if any(_tiered_cache_type(id) for id in ids):
+            await self.derived_cache.clear()
+
+    async def drop(self) -> dict[str, str]:
+        result = await self._inner.drop()
+        await self.derived_cache.clear()
+        return result
+
+
+def _cached_fields(record: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "return": record.get("return"),
+        "create_time": record.get("create_time", 0),
+    }
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-import httpx
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    import httpx
 
 
 class APIStatusError(Exception):
@@ -0,0 +1,550 @@
+"""Streaming export of the knowledge graph and its vector stores.
+
+Entities are paged through ``get_all_labels`` + ``get_nodes_batch``, relations through
+``get_nodes_edges_batch`` + ``get_edges_batch`` (each undirected edge is emitted once,
+from its lexicographically smaller endpoint), and vector records, including the
+relationships section, through the vector stores' ``get_by_ids`` /
+``get_vectors_by_ids`` for those pages. Every page is handed to a writer as
+soon as it is fetched, so memory stays bounded by ``batch_size`` for all formats.
+
+Text formats (csv, excel, md, txt) keep the column layout of the original exporter.
+The columnar formats (parquet, arrow) write one file per section next to
+``output_path`` with typed columns, and with ``include_vector_data`` a
+``fixed_size_list<float32>`` ``vector`` column that loads zero-copy into Arrow,
+Polars, DuckDB or pandas.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator
+
+from coldrag.utils import compute_mdhash_id, logger
+
+EXPORT_FORMATS = ("csv", "excel", "md", "txt", "parquet", "arrow")
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+
+# (section key, csv/txt title, markdown/excel title, singular used in "no data" notes)
+_SECTIONS = (
+    ("entities", "ENTITIES", "Entities", "entity"),
+    ("relations", "RELATIONS", "Relations", "relation"),
+    ("relationships", "RELATIONSHIPS", "Relationships", "relationship"),
+)
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _relation_vdb_ids(src: str, tgt: str) -> tuple[str, str]:
+    return (
+        compute_mdhash_id(src + tgt, prefix="rel-"),
+        compute_mdhash_id(tgt + src, prefix="rel-"),
+    )
+
+
+async def _iter_entities(
+    graph, entities_vdb, include_vector_data: bool, want_vectors: bool, batch_size: int
+) -> AsyncIterator[list[dict]]:
+    labels = await graph.get_all_labels()
+    for page in _chunks(labels, batch_size):
+        nodes = await graph.get_nodes_batch(page)
+        vdb_ids = [compute_mdhash_id(name, prefix="ent-") for name in page]
+        records: list = [None] * len(page)
+        vectors: dict = {}
+        if include_vector_data:
+            if want_vectors:
+                vectors = await entities_vdb.get_vectors_by_ids(vdb_ids)
+            else:
+                records = await entities_vdb.get_by_ids(vdb_ids)
+        yield [
+            {
+                "entity_name": name,
+                "graph_data": nodes.get(name),
+                "vector_record": records[i],
+                "vector": vectors.get(vdb_ids[i]),
+            }
+            for i, name in enumerate(page)
+        ]
+
+
+async def _iter_edge_pairs(
+    graph, batch_size: int
+) -> AsyncIterator[list[tuple[str, str]]]:
+    """Pages of undirected edges, each emitted once from its smaller endpoint"""
+    labels = await graph.get_all_labels()
+    pending: list[tuple[str, str]] = []
+    for page in _chunks(labels, batch_size):
+        node_edges = await graph.get_nodes_edges_batch(page)
+        for node in page:
+            for src, tgt in node_edges.get(node) or []:
+                other = tgt if src == node else src
+                if node < other:
+                    pending.append((node, other))
+        while len(pending) >= batch_size:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            yield batch
+    if pending:
+        yield pending
+
+
+async def _get_relation_records(
+    relationships_vdb, pairs: list[tuple[str, str]]
+) -> list[dict | None]:
+    """Vector records of ``pairs``, stored under either endpoint order"""
+    ids = [_relation_vdb_ids(s, t) for s, t in pairs]
+    records = await relationships_vdb.get_by_ids([f for f, _ in ids])
+    missing = [k for k, rec in enumerate(records) if rec is None]
+    if missing:
+        rev = await relationships_vdb.get_by_ids([ids[k][1] for k in missing])
+        for k, rec in zip(missing, rev):
+            records[k] = rec
+    return records
+
+
+async def _iter_relations(
+    graph,
+    relationships_vdb,
+    include_vector_data: bool,
+    want_vectors: bool,
+    batch_size: int,
+) -> AsyncIterator[list[dict]]:
+    async for pairs in _iter_edge_pairs(graph, batch_size):
+        edges = await graph.get_edges_batch([{"src": s, "tgt": t} for s, t in pairs])
+        records: dict[tuple[str, str], Any] = {}
+        vectors: dict[tuple[str, str], Any] = {}
+        if include_vector_data:
+            if want_vectors:
+                ids = [_relation_vdb_ids(s, t) for s, t in pairs]
+                found = await relationships_vdb.get_vectors_by_ids(
+                    [i for pair_ids in ids for i in pair_ids]
+                )
+                for pair, (fwd, rev) in zip(pairs, ids):
+                    vectors[pair] = found.get(fwd) or found.get(rev)
+            else:
+                records = dict(
+                    zip(pairs, await _get_relation_records(relationships_vdb, pairs))
+                )
+        yield [
+            {
+                "src_entity": s,
+                "tgt_entity": t,
+                "graph_data": edges.get((s, t)),
+                "vector_record": records.get((s, t)),
+                "vector": vectors.get((s, t)),
+            }
+            for s, t in pairs
+        ]
+
+
+async def _iter_relationships(
+    graph, relationships_vdb, batch_size: int
+) -> AsyncIterator[list[dict]]:
+    # Paged by graph edge through get_by_ids, so no backend loads its whole store
+    async for pairs in _iter_edge_pairs(graph, batch_size):
+        records = await _get_relation_records(relationships_vdb, pairs)
+        page = [{"record": rec} for rec in records if rec is not None]
+        if page:
+            yield page
+
+
+# --- Row shapes ----------------------------------------------------------------
+
+
+def _text_row(section: str, item: dict, include_vector_data: bool) -> dict:
+    """Row layout of the original in-memory exporter."""
+    if section == "relationships":
+        rec = item["record"]
+        return {"relationship_id": rec.get("__id__", rec.get("id")), "data": str(rec)}
+    graph_data = item["graph_data"]
+    row = (
+        {"entity_name": item["entity_name"]}
+        if section == "entities"
+        else {"src_entity": item["src_entity"], "tgt_entity": item["tgt_entity"]}
+    )
+    row["source_id"] = graph_data.get("source_id") if graph_data else None
+    row["graph_data"] = str(graph_data)
+    if include_vector_data:
+        row["vector_data"] = str(item["vector_record"])
+    return row
+
+
+def _int_or_none(value) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _float_or_none(value) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _columnar_row(section: str, item: dict) -> dict:
+    if section == "relationships":
+        rec = item["record"]
+        return {
+            "relationship_id": rec.get("__id__", rec.get("id")),
+            "src_id": rec.get("src_id"),
+            "tgt_id": rec.get("tgt_id"),
+            "data": json.dumps(
+                {k: v for k, v in rec.items() if k not in ("vector", "__vector__")},
+                ensure_ascii=False,
+                default=str,
+            ),
+        }
+    g = item["graph_data"] or {}
+    row = (
+        {"entity_name": item["entity_name"], "entity_type": g.get("entity_type")}
+        if section == "entities"
+        else {
+            "src_entity": item["src_entity"],
+            "tgt_entity": item["tgt_entity"],
+            "weight": _float_or_none(g.get("weight")),
+            "keywords": g.get("keywords"),
+        }
+    )
+    row.update(
+        description=g.get("description"),
+        source_id=g.get("source_id"),
+        file_path=g.get("file_path"),
+        created_at=_int_or_none(g.get("created_at")),
+        graph_data=json.dumps(g, ensure_ascii=False, default=str)
+        if item["graph_data"]
+        else None,
+        vector=item.get("vector"),
+    )
+    return row
+
+
+# --- Writers -------------------------------------------------------------------
+
+
+class _CsvWriter:
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", newline="", encoding="utf-8")
+        self._writer = None
+        self._had_rows = False
+
+    def begin(self, section, title, heading, singular):
+        if self._had_rows:
+            self._file.write("\n\n")
+        self._title, self._writer, self._had_rows = title, None, False
+
+    def rows(self, rows: list[dict]):
+        if not rows:
+            return
+        if self._writer is None:
+            self._file.write(f"# {self._title}\n")
+            self._writer = csv.DictWriter(self._file, fieldnames=rows[0].keys())
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._had_rows = True
+
+    def end(self, last: bool):
+        pass
+
+    def close(self):
+        self._file.close()
+
+
+class _MarkdownWriter:
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("# LightRAG Data Export\n\n")
+
+    def begin(self, section, title, heading, singular):
+        self._file.write(f"## {heading}\n\n")
+        self._singular, self._had_rows = singular, False
+
+    def rows(self, rows: list[dict]):
+        if not rows:
+            return
+        if not self._had_rows:
+            keys = rows[0].keys()
+            self._file.write("| " + " | ".join(keys) + " |\n")
+            self._file.write("| " + " | ".join(["---"] * len(keys)) + " |\n")
+        for row in rows:
+            self._file.write("| " + " | ".join(str(v) for v in row.values()) + " |\n")
+        self._had_rows = True
+
+    def end(self, last: bool):
+        if not self._had_rows:
+            self._file.write(f"*No {self._singular} data available*\n\n")
+        elif not last:
+            self._file.write("\n\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _TextWriter:
+    """Fixed-width text; rows are spooled to a temp file while column widths accumulate."""
+
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("LIGHTRAG DATA EXPORT\n")
+        self._file.write("=" * 80 + "\n\n")
+
+    def begin(self, section, title, heading, singular):
+        self._file.write(f"{title}\n")
+        self._file.write("-" * 80 + "\n")
+        self._singular = singular
+        self._keys: list[str] | None = None
+        self._widths: dict[str, int] = {}
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def rows(self, rows: list[dict]):
+        for row in rows:
+            if self._keys is None:
+                self._keys = list(row)
+                self._widths = {k: len(k) for k in self._keys}
+            values = [str(row[k]) for k in self._keys]
+            for k, v in zip(self._keys, values):
+                self._widths[k] = max(self._widths[k], len(v))
+            self._spool.write(json.dumps(values, ensure_ascii=False) + "\n")
+
+    def end(self, last: bool):
+        if self._keys is None:
+            self._file.write(f"No {self._singular} data available\n\n")
+        else:
+            header = "  ".join(k.ljust(self._widths[k]) for k in self._keys)
+            self._file.write(header + "\n")
+            self._file.write("-" * len(header) + "\n")
+            self._spool.seek(0)
+            for line in self._spool:
+                values = json.loads(line)
+                self._file.write(
+                    "  ".join(
+                        v.ljust(self._widths[k]) for k, v in zip(self._keys, values)
+                    )
+                    + "\n"
+                )
+            if not last:
+                self._file.write("\n\n")
+        self._spool.close()
+
+    def close(self):
+        self._file.close()
+
+
+class _ExcelWriter:
+    def __init__(self, output_path: str):
+        import xlsxwriter
+
+        # constant_memory flushes each row to disk as soon as the next one starts
+        self._book = xlsxwriter.Workbook(output_path, {"constant_memory": True})
+
+    def begin(self, section, title, heading, singular):
+        self._heading, self._sheet, self._row = heading, None, 0
+
+    def rows(self, rows: list[dict]):
+        if not rows:
+            return
+        if self._sheet is None:
+            self._sheet = self._book.add_worksheet(self._heading)
+            self._sheet.write_row(0, 0, list(rows[0].keys()))
+            self._row = 1
+        for row in rows:
+            self._sheet.write_row(self._row, 0, [str(v) for v in row.values()])
+            self._row += 1
+
+    def end(self, last: bool):
+        pass
+
+    def close(self):
+        self._book.close()
+
+
+class _ArrowWriter:
+    """One Parquet / Arrow IPC file per section, written a record batch at a time."""
+
+    def __init__(
+        self, output_path: str, file_format: str, vector_dims: dict[str, int | None]
+    ):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError(
+                f"{file_format} export requires pyarrow; install it with `pip install pyarrow`"
+            ) from e
+        self._pa = pa
+        self._format = file_format
+        self._base = os.path.splitext(output_path)[0]
+        self._ext = ".parquet" if file_format == "parquet" else ".arrow"
+        self._vector_dims = vector_dims
+        self.paths: list[str] = []
+
+    def _schema(self, section: str):
+        pa = self._pa
+        if section == "relationships":
+            return pa.schema(
+                [
+                    ("relationship_id", pa.string()),
+                    ("src_id", pa.string()),
+                    ("tgt_id", pa.string()),
+                    ("data", pa.string()),
+                ]
+            )
+        if section == "entities":
+            fields = [("entity_name", pa.string()), ("entity_type", pa.string())]
+        else:
+            fields = [
+                ("src_entity", pa.string()),
+                ("tgt_entity", pa.string()),
+                ("weight", pa.float64()),
+                ("keywords", pa.string()),
+            ]
+        fields += [
+            ("description", pa.string()),
+            ("source_id", pa.string()),
+            ("file_path", pa.string()),
+            ("created_at", pa.int64()),
+            ("graph_data", pa.string()),
+        ]
+        dim = self._vector_dims.get(section)
+        if dim:
+            fields.append(("vector", pa.list_(pa.float32(), dim)))
+        return pa.schema(fields)
+
+    def begin(self, section, title, heading, singular):
+        self._section = section
+        self._schema_obj = self._schema(section)
+        self._writer = None
+
+    def _open(self):
+        path = f"{self._base}_{self._section}{self._ext}"
+        if self._format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self._schema_obj)
+        else:
+            import pyarrow.ipc as ipc
+
+            self._sink = self._pa.OSFile(path, "wb")
+            self._writer = ipc.new_file(self._sink, self._schema_obj)
+        self.paths.append(path)
+
+    def rows(self, rows: list[dict]):
+        if not rows:
+            return
+        pa = self._pa
+        names = self._schema_obj.names
+        dim = self._vector_dims.get(self._section)
+        columns = {name: [row.get(name) for row in rows] for name in names}
+        if dim:
+            columns["vector"] = [
+                v if v is not None and len(v) == dim else None
+                for v in columns["vector"]
+            ]
+        batch = pa.RecordBatch.from_pydict(columns, schema=self._schema_obj)
+        if self._writer is None:
+            self._open()
+        self._writer.write_batch(batch)
+
+    def end(self, last: bool):
+        if self._writer is None:
+            # Keep an (empty) file per section so downstream loaders find all three
+            self._open()
+        self._writer.close()
+        if self._format != "parquet":
+            self._sink.close()
+        self._writer = None
+
+    def close(self):
+        pass
+
+
+def _vector_dim(vdb) -> int | None:
+    embedding_func = getattr(vdb, "embedding_func", None)
+    return getattr(embedding_func, "embedding_dim", None)
+
+
+async def astream_export(
+    chunk_entity_relation_graph,
+    entities_vdb,
+    relationships_vdb,
+    output_path: str,
+    file_format: str = "csv",
+    include_vector_data: bool = False,
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+) -> list[str]:
+    """Export entities, relations and relationship vectors page by page.
+
+    Returns the list of files written (one for text formats, one per section for
+    parquet/arrow).
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported file format: {file_format}. Choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+    batch_size = max(1, int(batch_size))
+    columnar = file_format in ("parquet", "arrow")
+    want_vectors = columnar and include_vector_data
+
+    if columnar:
+        writer = _ArrowWriter(
+            output_path,
+            file_format,
+            {
+                "entities": _vector_dim(entities_vdb) if want_vectors else None,
+                "relations": _vector_dim(relationships_vdb) if want_vectors else None,
+            },
+        )
+    elif file_format == "csv":
+        writer = _CsvWriter(output_path)
+    elif file_format == "excel":
+        writer = _ExcelWriter(output_path)
+    elif file_format == "md":
+        writer = _MarkdownWriter(output_path)
+    else:
+        writer = _TextWriter(output_path)
+
+    sources = {
+        "entities": lambda: _iter_entities(
+            chunk_entity_relation_graph,
+            entities_vdb,
+            include_vector_data,
+            want_vectors,
+            batch_size,
+        ),
+        "relations": lambda: _iter_relations(
+            chunk_entity_relation_graph,
+            relationships_vdb,
+            include_vector_data,
+            want_vectors,
+            batch_size,
+        ),
+        "relationships": lambda: _iter_relationships(
+            chunk_entity_relation_graph, relationships_vdb, batch_size
+        ),
+    }
+
+    try:
+        for i, (section, title, heading, singular) in enumerate(_SECTIONS):
+            writer.begin(section, title, heading, singular)
+            count = 0
+            async for items in sources[section]():
+                if columnar:
+                    writer.rows([_columnar_row(section, item) for item in items])
+                else:
+                    writer.rows(
+                        [
+                            _text_row(section, item, include_vector_data)
+                            for item in items
+                        ]
+                    )
+                count += len(items)
+            writer.end(last=i == len(_SECTIONS) - 1)
+            logger.debug(f"Exported {count} {section}")
+    finally:
+        writer.close()
+
+    return writer.paths if columnar else [output_path]
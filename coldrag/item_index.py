@@ -0,0 +1,361 @@
+"""
+Precomputed item-to-item neighbourhood index for ColdRAG cold-start expansion.
+
+The index is built offline after indexing. For every ``item`` node it stores the
+other items reachable within ``max_hops`` through non-item (attribute) nodes such
+as brand, genre or platform, together with:
+
+- the number of connecting paths,
+- an Adamic-Adar style proximity weight (rare attributes count more than hubs),
+- the attribute nodes connecting the pair, and
+- the best (highest weight) path between the two items.
+
+Everything is stored as CSR arrays in one ``.npz`` file so that query-time
+expansion becomes a sparse row gather instead of per-edge graph lookups. Writes to
+the graph remove the file (``invalidate_item_index``), so a stale index is never
+used; rebuild it after indexing again.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .base import BaseGraphStorage
+from .utils import logger
+
+ITEM_INDEX_FILENAME = "item_neighborhood_index.npz"
+ITEM_ENTITY_TYPE = "item"
+
+
+def get_item_index_path(working_dir: str, workspace: str | None = None) -> str:
+    """Return the on-disk location of the item neighbourhood index."""
+    if workspace:
+        return os.path.join(working_dir, workspace, ITEM_INDEX_FILENAME)
+    return os.path.join(working_dir, ITEM_INDEX_FILENAME)
+
+
+@dataclass
+class ItemNeighborhoodIndex:
+    """Sparse item x item proximity index in CSR layout.
+
+    Row ``i`` spans ``indptr[i]:indptr[i + 1]`` in the pair arrays (``indices``,
+    ``path_counts``, ``weights``, ``hops``). Each pair ``p`` in turn spans
+    ``via_indptr[p]:via_indptr[p + 1]`` in ``via_indices`` (connecting attribute
+    node ids) and ``path_indptr[p]:path_indptr[p + 1]`` in ``path_indices``
+    (intermediate attribute node ids of the best path, in order).
+    """
+
+    item_names: np.ndarray
+    attr_names: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    path_counts: np.ndarray
+    weights: np.ndarray
+    hops: np.ndarray
+    via_indptr: np.ndarray
+    via_indices: np.ndarray
+    path_indptr: np.ndarray
+    path_indices: np.ndarray
+    max_hops: int
+
+    def __post_init__(self):
+        self._item_ids = {str(name): i for i, name in enumerate(self.item_names)}
+
+    @property
+    def num_items(self) -> int:
+        return len(self.item_names)
+
+    def item_id(self, name: str) -> int | None:
+        return self._item_ids.get(name)
+
+    def gather(
+        self,
+        item_names: list[str],
+        top_n: int | None = None,
+        exclude_sources: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Aggregate the rows of ``item_names`` into one ranked neighbour list.
+
+        Args:
+            item_names: Seed items (names not present in the index are ignored)
+            top_n: Keep only the ``top_n`` neighbours by accumulated weight
+            exclude_sources: Drop the seed items themselves from the result
+
+        Returns:
+            list[dict]: ``entity_name``, ``weight``, ``path_count``, ``hops`` and
+            ``via`` (connecting attribute names of the strongest pair) per neighbour,
+            sorted by weight descending.
+        """
+        rows = [self._item_ids[n] for n in item_names if n in self._item_ids]
+        if not rows:
+            return []
+
+        pair_idx = np.concatenate(
+            [np.arange(self.indptr[r], self.indptr[r + 1]) for r in rows]
+        )
+        if pair_idx.size == 0:
+            return []
+
+        neighbors = self.indices[pair_idx]
+        uniq, inverse = np.unique(neighbors, return_inverse=True)
+        weight_sum = np.bincount(inverse, weights=self.weights[pair_idx])
+        count_sum = np.bincount(inverse, weights=self.path_counts[pair_idx])
+        min_hops = np.full(uniq.size, np.iinfo(np.int8).max, dtype=np.int8)
+        np.minimum.at(min_hops, inverse, self.hops[pair_idx])
+
+        # Strongest contributing pair per neighbour, used to report connecting attributes
+        order = np.lexsort((-self.weights[pair_idx], inverse))
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = inverse[order][1:] != inverse[order][:-1]
+        best_pair = pair_idx[order[first]]
+
+        if exclude_sources:
+            keep = ~np.isin(uniq, np.asarray(rows))
+        else:
+            keep = np.ones(uniq.size, dtype=bool)
+        candidates = np.nonzero(keep)[0]
+        candidates = candidates[np.argsort(-weight_sum[candidates], kind="stable")]
+        if top_n is not None:
+            candidates = candidates[:top_n]
+
+        results = []
+        for c in candidates:
+            p = best_pair[c]
+            via = self.via_indices[self.via_indptr[p] : self.via_indptr[p + 1]]
+            results.append(
+                {
+                    "entity_name": str(self.item_names[uniq[c]]),
+                    "weight": float(weight_sum[c]),
+                    "path_count": int(count_sum[c]),
+                    "hops": int(min_hops[c]),
+                    "via": [str(self.attr_names[a]) for a in via],
+                }
+            )
+        return results
+
+    def best_path(self, src: str, tgt: str) -> list[str] | None:
+        """Return the best path ``[src, attr..., tgt]`` between two indexed items."""
+        i, j = self._item_ids.get(src), self._item_ids.get(tgt)
+        if i is None or j is None:
+            return None
+        start, end = self.indptr[i], self.indptr[i + 1]
+        pos = np.searchsorted(self.indices[start:end], j)
+        if pos >= end - start or self.indices[start + pos] != j:
+            return None
+        p = start + pos
+        middle = self.path_indices[self.path_indptr[p] : self.path_indptr[p + 1]]
+        return [src, *(str(self.attr_names[a]) for a in middle), tgt]
+
+    def save(self, file_path: str) -> None:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        np.savez(
+            file_path,
+            item_names=self.item_names,
+            attr_names=self.attr_names,
+            indptr=self.indptr,
+            indices=self.indices,
+            path_counts=self.path_counts,
+            weights=self.weights,
+            hops=self.hops,
+            via_indptr=self.via_indptr,
+            via_indices=self.via_indices,
+            path_indptr=self.path_indptr,
+            path_indices=self.path_indices,
+            max_hops=np.asarray(self.max_hops),
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> "ItemNeighborhoodIndex":
+        with np.load(file_path, allow_pickle=False) as data:
+            fields = {k: data[k] for k in data.files}
+        fields["max_hops"] = int(fields["max_hops"])
+        return cls(**fields)
+
+
+_loaded_indexes: dict[str, tuple[float, ItemNeighborhoodIndex]] = {}
+
+
+def load_item_index(file_path: str) -> ItemNeighborhoodIndex | None:
+    """Load (and cache per process) the index at ``file_path`` if it exists.
+
+    The cached copy is refreshed whenever the file modification time changes.
+    """
+    if not os.path.exists(file_path):
+        return None
+    mtime = os.path.getmtime(file_path)
+    cached = _loaded_indexes.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    index = ItemNeighborhoodIndex.load(file_path)
+    _loaded_indexes[file_path] = (mtime, index)
+    logger.info(
+        f"Loaded item neighbourhood index {file_path}: {index.num_items} items, {len(index.indices)} pairs"
+    )
+    return index
+
+
+def get_item_index_version(file_path: str) -> str:
+    """Token that changes whenever the index at ``file_path`` is rebuilt or removed."""
+    if not os.path.exists(file_path):
+        return "none"
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}.{stat.st_size}"
+
+
+def invalidate_item_index(graph: BaseGraphStorage) -> None:
+    """Remove the index built from ``graph`` once the graph has changed.
+
+    Queries with ``use_item_index`` expand hop by hop until the index is rebuilt.
+    """
+    file_path = get_item_index_path(
+        graph.global_config["working_dir"], graph.global_config.get("workspace")
+    )
+    _loaded_indexes.pop(file_path, None)
+    if os.path.exists(file_path):
+        os.remove(file_path)
+        logger.info(
+            f"Graph changed, removed stale item neighbourhood index {file_path}; rebuild it with abuild_item_index"
+        )
+
+
+async def build_item_index(
+    graph: BaseGraphStorage,
+    max_hops: int = 2,
+    max_neighbors: int = 200,
+    max_attr_degree: int = 2000,
+    max_via: int = 8,
+) -> ItemNeighborhoodIndex:
+    """Build the item neighbourhood index from a graph storage.
+
+    Args:
+        graph: Knowledge graph storage
+        max_hops: Maximum path length between two items. Intermediate nodes are
+            always non-item (attribute) nodes; item-to-item edges count as 1 hop
+        max_neighbors: Neighbours kept per item (highest weight first)
+        max_attr_degree: Attribute nodes with a higher degree are treated as too
+            generic to connect items (e.g. a platform shared by the whole catalog)
+        max_via: Maximum number of connecting attribute nodes stored per pair
+
+    Returns:
+        ItemNeighborhoodIndex: The built index (not yet saved)
+    """
+    all_nodes = await graph.get_all_nodes()
+    all_edges = await graph.get_all_edges()
+
+    item_names = sorted(
+        str(n["id"]) for n in all_nodes if n.get("entity_type") == ITEM_ENTITY_TYPE
+    )
+    item_ids = {name: i for i, name in enumerate(item_names)}
+    attr_names = sorted(
+        str(n["id"]) for n in all_nodes if n.get("entity_type") != ITEM_ENTITY_TYPE
+    )
+    attr_ids = {name: i for i, name in enumerate(attr_names)}
+
+    # Adjacency split by node kind: ("i", id) for items, ("a", id) for attributes
+    item_to_items: dict[int, set[int]] = defaultdict(set)
+    item_to_attrs: dict[int, set[int]] = defaultdict(set)
+    attr_to_items: dict[int, set[int]] = defaultdict(set)
+    attr_to_attrs: dict[int, set[int]] = defaultdict(set)
+    for edge in all_edges:
+        src, tgt = str(edge["source"]), str(edge["target"])
+        if src in item_ids and tgt in item_ids:
+            item_to_items[item_ids[src]].add(item_ids[tgt])
+            item_to_items[item_ids[tgt]].add(item_ids[src])
+        elif src in item_ids and tgt in attr_ids:
+            item_to_attrs[item_ids[src]].add(attr_ids[tgt])
+            attr_to_items[attr_ids[tgt]].add(item_ids[src])
+        elif tgt in item_ids and src in attr_ids:
+            item_to_attrs[item_ids[tgt]].add(attr_ids[src])
+            attr_to_items[attr_ids[src]].add(item_ids[tgt])
+        elif src in attr_ids and tgt in attr_ids:
+            attr_to_attrs[attr_ids[src]].add(attr_ids[tgt])
+            attr_to_attrs[attr_ids[tgt]].add(attr_ids[src])
+
+    attr_degree = np.zeros(len(attr_names), dtype=np.int64)
+    for a in range(len(attr_names)):
+        attr_degree[a] = len(attr_to_items.get(a, ())) + len(attr_to_attrs.get(a, ()))
+    attr_weight = 1.0 / np.log2(2.0 + attr_degree)
+    usable = attr_degree <= max_attr_degree
+
+    indptr = [0]
+    indices: list[int] = []
+    path_counts: list[int] = []
+    weights: list[float] = []
+    hops: list[int] = []
+    via_indptr = [0]
+    via_indices: list[int] = []
+    path_indptr = [0]
+    path_indices: list[int] = []
+
+    for i in range(len(item_names)):
+        # neighbour -> [path_count, weight, min_hops, best_weight, best_path, via set]
+        row: dict[int, list[Any]] = {}
+
+        def add_path(j: int, path: tuple[int, ...], w: float):
+            if j == i:
+                return
+            entry = row.get(j)
+            if entry is None:
+                row[j] = [1, w, len(path) + 1, w, path, dict.fromkeys(path)]
+                return
+            entry[0] += 1
+            entry[1] += w
+            entry[2] = min(entry[2], len(path) + 1)
+            if w > entry[3]:
+                entry[3], entry[4] = w, path
+            if len(entry[5]) < max_via:
+                entry[5].update(dict.fromkeys(path))
+
+        for j in item_to_items.get(i, ()):
+            add_path(j, (), 1.0)
+
+        # Depth-first walk over attribute-only intermediate paths
+        stack = [
+            ((a,), float(attr_weight[a])) for a in item_to_attrs.get(i, ()) if usable[a]
+        ]
+        while stack:
+            path, w = stack.pop()
+            last = path[-1]
+            for j in attr_to_items.get(last, ()):
+                add_path(j, path, w)
+            if len(path) + 1 < max_hops:
+                for b in attr_to_attrs.get(last, ()):
+                    if usable[b] and b not in path:
+                        stack.append((path + (b,), w * float(attr_weight[b])))
+
+        kept = sorted(row.items(), key=lambda kv: -kv[1][1])[:max_neighbors]
+        kept.sort(key=lambda kv: kv[0])  # sorted column ids for searchsorted lookups
+        for j, (count, w, h, _, best, via) in kept:
+            indices.append(j)
+            path_counts.append(count)
+            weights.append(w)
+            hops.append(h)
+            via_indices.extend(list(via)[:max_via])
+            via_indptr.append(len(via_indices))
+            path_indices.extend(best)
+            path_indptr.append(len(path_indices))
+        indptr.append(len(indices))
+
+    index = ItemNeighborhoodIndex(
+        item_names=np.asarray(item_names, dtype=str),
+        attr_names=np.asarray(attr_names, dtype=str),
+        indptr=np.asarray(indptr, dtype=np.int64),
+        indices=np.asarray(indices, dtype=np.int32),
+        path_counts=np.asarray(path_counts, dtype=np.int32),
+        weights=np.asarray(weights, dtype=np.float32),
+        hops=np.asarray(hops, dtype=np.int8),
+        via_indptr=np.asarray(via_indptr, dtype=np.int64),
+        via_indices=np.asarray(via_indices, dtype=np.int32),
+        path_indptr=np.asarray(path_indptr, dtype=np.int64),
+        path_indices=np.asarray(path_indices, dtype=np.int32),
+        max_hops=max_hops,
+    )
+    logger.info(
+        f"Built item neighbourhood index: {len(item_names)} items, {len(indices)} pairs, max_hops={max_hops}"
+    )
+    return index
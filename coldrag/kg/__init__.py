@@ -5,6 +5,7 @@ STORAGE_IMPLEMENTATIONS = {
             "RedisKVStorage",
             "PGKVStorage",
             "MongoKVStorage",
+            "SQLiteKVStorage",
         ],
         "required_methods": ["get_by_id", "upsert"],
     },
@@ -36,9 +37,16 @@ STORAGE_IMPLEMENTATIONS = {
             "RedisDocStatusStorage",
             "PGDocStatusStorage",
             "MongoDocStatusStorage",
+            "SQLiteDocStatusStorage",
         ],
         "required_methods": ["get_docs_by_status"],
     },
+    "CACHE_TIER_STORAGE": {
+        "implementations": [
+            "RedisCacheTier",
+        ],
+        "required_methods": ["get_many", "set_many"],
+    },
 }
 
 # Storage implementation environment variable without default value
@@ -48,6 +56,7 @@ STORAGE_ENV_REQUIREMENTS: dict[str, list[str]] = {
     "MongoKVStorage": [],
     "RedisKVStorage": ["REDIS_URI"],
     "PGKVStorage": ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DATABASE"],
+    "SQLiteKVStorage": [],
     # Graph Storage Implementations
     "NetworkXStorage": [],
     "Neo4JStorage": ["NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD"],
@@ -76,6 +85,9 @@ STORAGE_ENV_REQUIREMENTS: dict[str, list[str]] = {
     "RedisDocStatusStorage": ["REDIS_URI"],
     "PGDocStatusStorage": ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DATABASE"],
     "MongoDocStatusStorage": [],
+    "SQLiteDocStatusStorage": [],
+    # Cache Tier Implementations
+    "RedisCacheTier": ["REDIS_URI"],
 }
 
 # Storage implementation module mapping
@@ -101,6 +113,9 @@ STORAGES = {
     "FaissVectorDBStorage": ".kg.faiss_impl",
     "QdrantVectorDBStorage": ".kg.qdrant_impl",
     "MemgraphStorage": ".kg.memgraph_impl",
+    "SQLiteKVStorage": ".kg.sqlite_impl",
+    "SQLiteDocStatusStorage": ".kg.sqlite_impl",
+    "RedisCacheTier": ".kg.redis_impl",
 }
 
 
@@ -0,0 +1,170 @@
+"""
+Approximate-nearest-neighbour index options for the local vector backends.
+
+Both ``FaissVectorDBStorage`` and ``NanoVectorDBStorage`` read the index type and
+its parameters from ``vector_db_storage_cls_kwargs``:
+
+- ``ann_index_type``: ``"flat"`` (exact search, default), ``"hnsw"``,
+  ``"ivf_flat"`` or ``"ivf_pq"``
+- ``hnsw_m``, ``hnsw_ef_construction``, ``hnsw_ef_search``
+- ``ivf_nlist``, ``ivf_nprobe``
+- ``pq_m`` (sub-quantizers, must divide the embedding dimension), ``pq_nbits``
+- ``ann_train_size``: vectors needed before an IVF index is trained; search
+  stays exact until then
+- ``ann_min_vectors``: NanoVectorDB only; below this many vectors search stays
+  exact
+
+All indexes use the inner product on L2-normalised vectors (cosine similarity).
+``hnsw_ef_search`` / ``ivf_nprobe`` are applied per query through Faiss search
+parameters, so they can be changed on a live storage through ``AnnConfig``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+# You must manually install faiss-cpu or faiss-gpu before using ANN indexes
+import faiss  # type: ignore
+import numpy as np
+
+ANN_INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+
+@dataclass
+class AnnConfig:
+    index_type: str = "flat"
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 256
+    ivf_nprobe: int = 16
+    pq_m: int | None = None
+    pq_nbits: int = 8
+    train_size: int | None = None
+    min_vectors: int = 0
+
+    @classmethod
+    def from_kwargs(cls, kwargs: dict[str, Any]) -> AnnConfig:
+        index_type = kwargs.get("ann_index_type", "flat")
+        if index_type not in ANN_INDEX_TYPES:
+            raise ValueError(
+                f"ann_index_type must be one of {ANN_INDEX_TYPES}, got {index_type!r}"
+            )
+        defaults = cls()
+        return cls(
+            index_type=index_type,
+            hnsw_m=kwargs.get("hnsw_m", defaults.hnsw_m),
+            hnsw_ef_construction=kwargs.get(
+                "hnsw_ef_construction", defaults.hnsw_ef_construction
+            ),
+            hnsw_ef_search=kwargs.get("hnsw_ef_search", defaults.hnsw_ef_search),
+            ivf_nlist=kwargs.get("ivf_nlist", defaults.ivf_nlist),
+            ivf_nprobe=kwargs.get("ivf_nprobe", defaults.ivf_nprobe),
+            pq_m=kwargs.get("pq_m"),
+            pq_nbits=kwargs.get("pq_nbits", defaults.pq_nbits),
+            train_size=kwargs.get("ann_train_size"),
+            min_vectors=kwargs.get("ann_min_vectors", defaults.min_vectors),
+        )
+
+    @property
+    def exact(self) -> bool:
+        return self.index_type == "flat"
+
+    @property
+    def needs_training(self) -> bool:
+        return self.index_type in ("ivf_flat", "ivf_pq")
+
+    def min_train_size(self) -> int:
+        """Vectors required to train an IVF index (Faiss asks for ~39 per centroid)."""
+        if self.train_size is not None:
+            return self.train_size
+        centroids = self.ivf_nlist
+        if self.index_type == "ivf_pq":
+            centroids = max(centroids, 2**self.pq_nbits)
+        return 39 * centroids
+
+
+def _default_pq_m(dim: int) -> int:
+    # Largest divisor of dim giving sub-vectors of at least 4 dimensions, capped at 64
+    for m in range(min(64, dim // 4), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def create_index(config: AnnConfig, dim: int) -> faiss.Index:
+    """Return an empty (possibly untrained) index for ``config``."""
+    metric = faiss.METRIC_INNER_PRODUCT
+    if config.index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m, metric)
+        index.hnsw.efConstruction = config.hnsw_ef_construction
+        index.hnsw.efSearch = config.hnsw_ef_search
+        return index
+    if config.index_type == "ivf_flat":
+        quantizer = faiss.IndexFlatIP(dim)
+        return faiss.IndexIVFFlat(quantizer, dim, config.ivf_nlist, metric)
+    if config.index_type == "ivf_pq":
+        quantizer = faiss.IndexFlatIP(dim)
+        pq_m = config.pq_m or _default_pq_m(dim)
+        return faiss.IndexIVFPQ(
+            quantizer, dim, config.ivf_nlist, pq_m, config.pq_nbits, metric
+        )
+    return faiss.IndexFlatIP(dim)
+
+
+def build_index(
+    config: AnnConfig, vectors: np.ndarray, ids: np.ndarray | None = None
+) -> faiss.Index:
+    """Create, train (IVF) and fill an index with normalised ``vectors``.
+
+    With ``ids`` the vectors are keyed by them: IVF indexes store the ids in their
+    inverted lists, the others are wrapped in an ``IndexIDMap2``. Without ``ids``
+    vectors are addressed by their row.
+    """
+    index = create_index(config, vectors.shape[1])
+    if config.needs_training:
+        index.train(vectors)
+    if ids is not None and not config.needs_training:
+        index = faiss.IndexIDMap2(index)
+    if len(vectors) == 0:
+        return index
+    if ids is None:
+        index.add(vectors)
+    else:
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def is_index_type(index: faiss.Index, index_type: str) -> bool:
+    """Whether ``index`` (possibly wrapped in an id map) is of ``index_type``."""
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    expected = {
+        "flat": faiss.IndexFlat,
+        "hnsw": faiss.IndexHNSW,
+        "ivf_flat": faiss.IndexIVFFlat,
+        "ivf_pq": faiss.IndexIVFPQ,
+    }[index_type]
+    return isinstance(index, expected)
+
+
+def search_params(
+    config: AnnConfig, index: faiss.Index, sel: Any = None
+) -> faiss.SearchParameters | None:
+    """Per-query search parameters (efSearch / nprobe and an optional id filter)."""
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = config.hnsw_ef_search
+    elif isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = config.ivf_nprobe
+    elif sel is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+    if sel is not None:
+        params.sel = sel
+    return params
@@ -9,7 +9,15 @@ from dataclasses import dataclass
 from lightrag.utils import logger, compute_mdhash_id
 from lightrag.base import BaseVectorStorage
 
+from .ann_index import (
+    AnnConfig,
+    build_index,
+    create_index,
+    is_index_type,
+    search_params,
+)
 from .shared_storage import (
+    get_namespace_data,
     get_storage_lock,
     get_update_flag,
     set_all_update_flags,
@@ -18,6 +26,9 @@ from .shared_storage import (
 # You must manually install faiss-cpu or faiss-gpu before using FAISS vector db
 import faiss  # type: ignore
 
+DEFAULT_COMPACT_MIN_DELETED = 1024
+DEFAULT_COMPACT_RATIO = 0.25
+
 
 @final
 @dataclass
@@ -25,6 +36,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
     """
     A Faiss-based Vector DB Storage for LightRAG.
     Uses cosine similarity by storing normalized vectors in a Faiss index with inner product search.
+    The index is exact (IndexFlatIP) unless an ANN type is configured through
+    `ann_index_type` in vector_db_storage_cls_kwargs (see coldrag.kg.ann_index).
     """
 
     def __post_init__(self):
@@ -55,27 +68,63 @@ class FaissVectorDBStorage(BaseVectorStorage):
             workspace_dir, f"faiss_index_{self.namespace}.index"
         )
         self._meta_file = self._faiss_index_file + ".meta.json"
+        # Raw vectors of indexes that cannot reconstruct them (IVF)
+        self._vectors_file = self._faiss_index_file + ".vectors.npz"
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
         # Embedding dimension (e.g. 768) must match your embedding function
         self._dim = self.embedding_func.embedding_dim
 
-        # Create an empty Faiss index for inner product (useful for normalized vectors = cosine similarity).
-        # If you have a large number of vectors, you might want IVF or other indexes.
-        # For demonstration, we use a simple IndexFlatIP.
-        self._index = faiss.IndexFlatIP(self._dim)
-        # Keep a local store for metadata, IDs, etc.
-        # Maps <int faiss_id> → metadata (including your original ID).
-        self._id_to_meta = {}
+        # Tombstoned ids are only removed from the Faiss index (one remove_ids pass,
+        # or a rebuild for HNSW) once this many have accumulated; saved indexes keep
+        # them, and ids present in the index but not in the metadata are tombstones
+        self._compact_min_deleted = kwargs.get(
+            "faiss_compact_min_deleted", DEFAULT_COMPACT_MIN_DELETED
+        )
+        self._compact_ratio = kwargs.get("faiss_compact_ratio", DEFAULT_COMPACT_RATIO)
+        self._ann = AnnConfig.from_kwargs(kwargs)
 
+        # Index version: the shared counter (bumped on every save/drop) this process
+        # last loaded or wrote, plus the number of unsaved changes on top of it
+        self._index_versions = None
+        self._loaded_version = 0
+        self._pending_changes = 0
+
+        self._reset_index()
         self._load_faiss_index()
 
+    def _reset_index(self):
+        """Start from an empty index and empty in-memory structures."""
+        # Inner product on normalized vectors = cosine similarity. The id map lets us
+        # address vectors by our own stable ids and remove them without a rebuild.
+        # IVF indexes search exactly (flat) until enough vectors exist to train them.
+        if self._ann.needs_training:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+        else:
+            self._index = faiss.IndexIDMap2(create_index(self._ann, self._dim))
+        # Maps <int faiss_id> → metadata (including your original ID).
+        self._id_to_meta: dict[int, dict[str, Any]] = {}
+        # Maps <custom id> → <int faiss_id>
+        self._custom_id_to_fid: dict[str, int] = {}
+        # Row <faiss_id> holds the normalized vector of that id
+        self._vectors = np.empty((0, self._dim), dtype=np.float32)
+        # Ids deleted/replaced but still present in the Faiss index
+        self._deleted_fids: set[int] = set()
+        self._deleted_selector = None
+        # Ids removed from the Faiss index whose buffer rows can be reused
+        self._free_fids: list[int] = []
+        self._next_fid = 0
+
     async def initialize(self):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock()
+        # Index versions shared by all processes, keyed by namespace
+        self._index_versions = await get_namespace_data("vector_versions")
+        async with self._storage_lock:
+            self._loaded_version = self._index_versions.get(self.final_namespace, 0)
 
     async def _get_index(self):
         """Check if the shtorage should be reloaded"""
@@ -87,12 +136,26 @@ class FaissVectorDBStorage(BaseVectorStorage):
                     f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
                 self._load_faiss_index()
+                self._loaded_version = self._index_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 self.storage_updated.value = False
             return self._index
 
+    async def get_index_version(self) -> str:
+        await self._get_index()
+        if not self._pending_changes:
+            return str(self._loaded_version)
+        # Unsaved changes are only visible to this process
+        return f"{self._loaded_version}.{os.getpid()}.{self._pending_changes}"
+
+    def _bump_index_version(self) -> None:
+        """Publish a new shared index version (caller must hold the storage lock)"""
+        self._loaded_version = self._index_versions.get(self.final_namespace, 0) + 1
+        self._index_versions[self.final_namespace] = self._loaded_version
+        self._pending_changes = 0
+
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
         Insert or update vectors in the Faiss index.
@@ -150,29 +213,36 @@ class FaissVectorDBStorage(BaseVectorStorage):
         faiss.normalize_L2(embeddings)
 
         # Upsert logic:
-        # 1. Identify which vectors to remove if they exist
-        # 2. Remove them
-        # 3. Add the new vectors
-        existing_ids_to_remove = []
-        for meta, emb in zip(list_data, embeddings):
-            faiss_internal_id = self._find_faiss_id_by_custom_id(meta["__id__"])
-            if faiss_internal_id is not None:
-                existing_ids_to_remove.append(faiss_internal_id)
-
+        # 1. Tombstone the current vectors of ids that already exist
+        # 2. Add the new vectors under fresh (or recycled) Faiss ids
+        await self._get_index()
+        existing_ids_to_remove = [
+            self._custom_id_to_fid[meta["__id__"]]
+            for meta in list_data
+            if meta["__id__"] in self._custom_id_to_fid
+        ]
         if existing_ids_to_remove:
             await self._remove_faiss_ids(existing_ids_to_remove)
 
-        # Step 2: Add new vectors
-        index = await self._get_index()
-        start_idx = index.ntotal
-        index.add(embeddings)
-
-        # Step 3: Store metadata + vector for each new ID
-        for i, meta in enumerate(list_data):
-            fid = start_idx + i
-            # Store the raw vector so we can rebuild if something is removed
-            meta["__vector__"] = embeddings[i].tolist()
-            self._id_to_meta.update({fid: meta})
+        fids = self._allocate_fids(len(list_data))
+        self._vectors[fids] = embeddings
+        self._index.add_with_ids(embeddings, fids)
+        for fid, meta in zip(fids.tolist(), list_data):
+            self._id_to_meta[fid] = meta
+            self._custom_id_to_fid[meta["__id__"]] = fid
+        self._pending_changes += 1
+
+        # Train the IVF index on first build, once there are enough vectors
+        if (
+            self._ann.needs_training
+            and not is_index_type(self._index, self._ann.index_type)
+            and len(self._id_to_meta) >= self._ann.min_train_size()
+        ):
+            async with self._storage_lock:
+                self._rebuild_index()
+            logger.info(
+                f"[{self.workspace}] Trained {self._ann.index_type} index for {self.namespace} on {len(self._id_to_meta)} vectors"
+            )
 
         logger.debug(
             f"[{self.workspace}] Upserted {len(list_data)} vectors into Faiss index."
@@ -196,9 +266,16 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         faiss.normalize_L2(embedding)  # we do in-place normalization
 
-        # Perform the similarity search
+        # Perform the similarity search, skipping tombstoned vectors
         index = await self._get_index()
-        distances, indices = index.search(embedding, top_k)
+        if self._deleted_fids and self._deleted_selector is None:
+            self._deleted_selector = faiss.IDSelectorNot(
+                faiss.IDSelectorBatch(np.fromiter(self._deleted_fids, dtype=np.int64))
+            )
+        params = search_params(
+            self._ann, index, self._deleted_selector if self._deleted_fids else None
+        )
+        distances, indices = index.search(embedding, top_k, params=params)
 
         distances = distances[0]
         indices = indices[0]
@@ -213,12 +290,10 @@ class FaissVectorDBStorage(BaseVectorStorage):
             if dist < self.cosine_better_than_threshold:
                 continue
 
-            meta = self._id_to_meta.get(idx, {})
-            # Filter out __vector__ from query results to avoid returning large vector data
-            filtered_meta = {k: v for k, v in meta.items() if k != "__vector__"}
+            meta = self._id_to_meta.get(int(idx), {})
             results.append(
                 {
-                    **filtered_meta,
+                    **meta,
                     "id": meta.get("__id__"),
                     "distance": float(dist),
                     "created_at": meta.get("__created_at__"),
@@ -244,11 +319,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
         logger.debug(
             f"[{self.workspace}] Deleting {len(ids)} vectors from {self.namespace}"
         )
-        to_remove = []
-        for cid in ids:
-            fid = self._find_faiss_id_by_custom_id(cid)
-            if fid is not None:
-                to_remove.append(fid)
+        to_remove = [
+            self._custom_id_to_fid[cid] for cid in ids if cid in self._custom_id_to_fid
+        ]
 
         if to_remove:
             await self._remove_faiss_ids(to_remove)
@@ -299,44 +372,113 @@ class FaissVectorDBStorage(BaseVectorStorage):
         """
         Return the Faiss internal ID for a given custom ID, or None if not found.
         """
-        for fid, meta in self._id_to_meta.items():
-            if meta.get("__id__") == custom_id:
-                return fid
-        return None
+        return self._custom_id_to_fid.get(custom_id)
+
+    def _allocate_fids(self, count: int) -> np.ndarray:
+        """
+        Reserve Faiss ids (= rows of the vector buffer) for new vectors,
+        recycling ids that were already removed from the index.
+        """
+        reused = self._free_fids[-count:] if count else []
+        del self._free_fids[len(self._free_fids) - len(reused) :]
+        fresh = count - len(reused)
+        fids = np.concatenate(
+            [
+                np.asarray(reused, dtype=np.int64),
+                np.arange(self._next_fid, self._next_fid + fresh, dtype=np.int64),
+            ]
+        )
+        self._next_fid += fresh
+
+        # Grow the contiguous buffer geometrically
+        if self._next_fid > len(self._vectors):
+            capacity = max(self._next_fid, 2 * len(self._vectors), 1024)
+            vectors = np.empty((capacity, self._dim), dtype=np.float32)
+            vectors[: len(self._vectors)] = self._vectors
+            self._vectors = vectors
+        return fids
 
     async def _remove_faiss_ids(self, fid_list):
         """
-        Remove a list of internal Faiss IDs from the index.
-        Because IndexFlatIP doesn't support 'removals',
-        we rebuild the index excluding those vectors.
+        Remove a list of internal Faiss IDs.
+        Metadata goes immediately; the vectors are tombstoned (filtered out of
+        searches) and dropped from the index in one batch by _compact.
         """
-        keep_fids = [fid for fid in self._id_to_meta if fid not in fid_list]
+        for fid in fid_list:
+            meta = self._id_to_meta.pop(fid, None)
+            if meta is None:
+                continue
+            if self._custom_id_to_fid.get(meta["__id__"]) == fid:
+                del self._custom_id_to_fid[meta["__id__"]]
+            self._deleted_fids.add(fid)
+        self._deleted_selector = None
+        self._pending_changes += 1
 
-        # Rebuild the index
-        vectors_to_keep = []
-        new_id_to_meta = {}
-        for new_fid, old_fid in enumerate(keep_fids):
-            vec_meta = self._id_to_meta[old_fid]
-            vectors_to_keep.append(vec_meta["__vector__"])  # stored as list
-            new_id_to_meta[new_fid] = vec_meta
+        if self._compaction_due():
+            async with self._storage_lock:
+                self._compact()
 
-        async with self._storage_lock:
-            # Re-init index
-            self._index = faiss.IndexFlatIP(self._dim)
-            if vectors_to_keep:
-                arr = np.array(vectors_to_keep, dtype=np.float32)
-                self._index.add(arr)
+    def _compaction_due(self) -> bool:
+        return len(self._deleted_fids) >= max(
+            self._compact_min_deleted, self._compact_ratio * self._index.ntotal
+        )
 
-            self._id_to_meta = new_id_to_meta
+    def _compact(self):
+        """Drop tombstoned vectors from the Faiss index in a single remove_ids pass."""
+        if not self._deleted_fids:
+            return
+        if is_index_type(self._index, "hnsw"):
+            # HNSW graphs do not support removal; rebuild from the vector buffer
+            self._rebuild_index()
+            return
+        deleted = np.fromiter(self._deleted_fids, dtype=np.int64)
+        self._index.remove_ids(faiss.IDSelectorBatch(deleted))
+        self._free_fids.extend(deleted.tolist())
+        self._deleted_fids = set()
+        self._deleted_selector = None
+
+    def _rebuild_index(self):
+        """
+        Rebuild the index from the live vectors of the buffer, training it
+        (IVF) when there are enough of them.
+        """
+        live = np.fromiter(
+            self._id_to_meta, dtype=np.int64, count=len(self._id_to_meta)
+        )
+        live.sort()
+        vectors = self._vectors[live]
+        if self._ann.needs_training and len(live) < self._ann.min_train_size():
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+            self._index.add_with_ids(vectors, live)
+        else:
+            self._index = build_index(self._ann, vectors, live)
+        self._deleted_fids = set()
+        self._deleted_selector = None
+        self._free_fids = sorted(
+            set(range(self._next_fid)) - set(live.tolist()), reverse=True
+        )
 
     def _save_faiss_index(self):
         """
         Save the current Faiss index + metadata to disk so it can persist across runs.
         """
+        # Tombstones are saved with the index (their ids have no metadata), so a save
+        # never forces a compaction, which would rebuild an HNSW graph every time
+        if self._compaction_due():
+            self._compact()
         faiss.write_index(self._index, self._faiss_index_file)
+        if isinstance(self._index, faiss.IndexIDMap):
+            if os.path.exists(self._vectors_file):
+                os.remove(self._vectors_file)
+        else:
+            fids = np.array(
+                sorted(self._id_to_meta.keys() | self._deleted_fids), dtype=np.int64
+            )
+            with open(self._vectors_file, "wb") as f:
+                np.savez(f, fids=fids, vectors=self._vectors[fids])
 
         # Save metadata dict to JSON. Convert all keys to strings for JSON storage.
-        # _id_to_meta is { int: { '__id__': doc_id, '__vector__': [float,...], ... } }
+        # _id_to_meta is { int: { '__id__': doc_id, ... } }; vectors live in the index.
         # We'll keep the int -> dict, but JSON requires string keys.
         serializable_dict = {}
         for fid, meta in self._id_to_meta.items():
@@ -358,16 +500,52 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         try:
             # Load the Faiss index
-            self._index = faiss.read_index(self._faiss_index_file)
+            index = faiss.read_index(self._faiss_index_file)
             # Load metadata
             with open(self._meta_file, "r", encoding="utf-8") as f:
                 stored_dict = json.load(f)
 
+            if isinstance(index, faiss.IndexIDMap):
+                fids = faiss.vector_to_array(index.id_map).astype(np.int64)
+                vectors = faiss.downcast_index(index.index).reconstruct_n(
+                    0, index.ntotal
+                )
+            elif isinstance(index, faiss.IndexIVF):
+                with np.load(self._vectors_file) as stored_vectors:
+                    fids = stored_vectors["fids"]
+                    vectors = stored_vectors["vectors"]
+            else:
+                # Older files: a plain IndexFlatIP whose positions are the ids
+                fids = np.arange(index.ntotal, dtype=np.int64)
+                vectors = index.reconstruct_n(0, index.ntotal)
+            # Trained indexes are kept as saved
+            keep_index = is_index_type(index, self._ann.index_type) and (
+                isinstance(index, (faiss.IndexIDMap, faiss.IndexIVF))
+            )
+            self._index = index
+
+            # Rebuild the vector buffer and id maps; unused ids become free rows
+            self._next_fid = int(fids.max()) + 1 if len(fids) else 0
+            self._vectors = np.zeros((self._next_fid, self._dim), dtype=np.float32)
+            self._vectors[fids] = vectors
+            self._free_fids = sorted(
+                set(range(self._next_fid)) - set(fids.tolist()), reverse=True
+            )
+
             # Convert string keys back to int
             self._id_to_meta = {}
             for fid_str, meta in stored_dict.items():
                 fid = int(fid_str)
+                # Vectors used to be duplicated into the metadata as lists
+                meta.pop("__vector__", None)
                 self._id_to_meta[fid] = meta
+                self._custom_id_to_fid[meta["__id__"]] = fid
+            # Saved tombstones: still in the index, no longer in the metadata
+            self._deleted_fids = set(fids.tolist()) - self._id_to_meta.keys()
+
+            if not keep_index:
+                # Saved with another index type (or before ANN support): rebuild
+                self._rebuild_index()
 
             logger.info(
                 f"[{self.workspace}] Faiss index loaded with {self._index.ntotal} vectors from {self._faiss_index_file}"
@@ -377,8 +555,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 f"[{self.workspace}] Failed to load Faiss index or metadata: {e}"
             )
             logger.warning(f"[{self.workspace}] Starting with an empty Faiss index.")
-            self._index = faiss.IndexFlatIP(self._dim)
-            self._id_to_meta = {}
+            self._reset_index()
 
     async def index_done_callback(self) -> None:
         async with self._storage_lock:
@@ -388,9 +565,10 @@ class FaissVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"[{self.workspace}] Storage for FAISS {self.namespace} was updated by another process, reloading..."
                 )
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
                 self._load_faiss_index()
+                self._loaded_version = self._index_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 self.storage_updated.value = False
                 return False  # Return error
 
@@ -399,6 +577,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
             try:
                 # Save data to disk
                 self._save_faiss_index()
+                if self._pending_changes:
+                    self._bump_index_version()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -430,10 +610,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
         if not metadata:
             return None
 
-        # Filter out __vector__ from metadata to avoid returning large vector data
-        filtered_metadata = {k: v for k, v in metadata.items() if k != "__vector__"}
         return {
-            **filtered_metadata,
+            **metadata,
             "id": metadata.get("__id__"),
             "created_at": metadata.get("__created_at__"),
         }
@@ -457,12 +635,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
             if fid is not None:
                 metadata = self._id_to_meta.get(fid)
                 if metadata:
-                    # Filter out __vector__ from metadata to avoid returning large vector data
-                    filtered_metadata = {
-                        k: v for k, v in metadata.items() if k != "__vector__"
-                    }
                     record = {
-                        **filtered_metadata,
+                        **metadata,
                         "id": metadata.get("__id__"),
                         "created_at": metadata.get("__created_at__"),
                     }
@@ -487,11 +661,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
         for id in ids:
             # Find the Faiss internal ID for the custom ID
             fid = self._find_faiss_id_by_custom_id(id)
-            if fid is not None and fid in self._id_to_meta:
-                metadata = self._id_to_meta[fid]
-                # Get the stored vector from metadata
-                if "__vector__" in metadata:
-                    vectors_dict[id] = metadata["__vector__"]
+            if fid is not None:
+                vectors_dict[id] = self._vectors[fid].tolist()
 
         return vectors_dict
 
@@ -514,17 +685,18 @@ class FaissVectorDBStorage(BaseVectorStorage):
         try:
             async with self._storage_lock:
                 # Reset the index
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
+                self._reset_index()
 
                 # Remove storage files if they exist
                 if os.path.exists(self._faiss_index_file):
                     os.remove(self._faiss_index_file)
                 if os.path.exists(self._meta_file):
                     os.remove(self._meta_file)
+                if os.path.exists(self._vectors_file):
+                    os.remove(self._vectors_file)
 
-                self._id_to_meta = {}
                 self._load_faiss_index()
+                self._bump_index_version()
 
                 # Notify other processes
                 await set_all_update_flags(self.final_namespace)
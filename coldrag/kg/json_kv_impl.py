@@ -11,6 +11,7 @@ from coldrag.utils import (
     write_json,
 )
 from coldrag.exceptions import StorageNotInitializedError
+from coldrag.snapshot import WorkspaceSnapshot, load_snapshot_object
 from .shared_storage import (
     get_namespace_data,
     get_storage_lock,
@@ -53,7 +54,11 @@ class JsonKVStorage(BaseKVStorage):
             need_init = await try_initialize_namespace(self.final_namespace)
             self._data = await get_namespace_data(self.final_namespace)
             if need_init:
-                loaded_data = load_json(self._file_name) or {}
+                loaded_data = None
+                if self.global_config.get("use_snapshot"):
+                    loaded_data = load_snapshot_object(self._file_name)
+                if loaded_data is None:
+                    loaded_data = load_json(self._file_name) or {}
                 async with self._storage_lock:
                     # Migrate legacy cache structure if needed
                     if self.namespace.endswith("_cache"):
@@ -84,6 +89,13 @@ class JsonKVStorage(BaseKVStorage):
                 write_json(data_dict, self._file_name)
                 await clear_all_update_flags(self.final_namespace)
 
+    async def export_snapshot(self, snapshot: WorkspaceSnapshot) -> bool:
+        async with self._storage_lock:
+            data_dict = (
+                dict(self._data) if hasattr(self._data, "_getvalue") else self._data
+            )
+            return snapshot.add_object(self._file_name, data_dict)
+
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
         async with self._storage_lock:
             result = self._data.get(id)
@@ -0,0 +1,191 @@
+"""Incremental label index for in-memory graph storages.
+
+Backs ``search_labels`` and ``get_popular_labels`` without scanning every node:
+
+- lowercased trigram posting lists (labels padded with a sentinel so labels shorter
+  than three characters still have grams) narrow a substring query down to the
+  labels that contain all of its trigrams;
+- a sorted list of lowercased labels answers prefix queries with two bisects, and
+  since exact/prefix matches always outrank plain substring matches it
+  short-circuits the search once it alone fills ``limit``;
+- a lazily invalidated max-heap of node degrees returns the top-k labels in
+  O(k log n).
+
+Scores and ordering match the original linear scan in ``NetworkXStorage``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Iterable
+
+_PAD = "\x00"
+
+
+def _grams(folded: str) -> set[str]:
+    padded = f"{_PAD}{folded}{_PAD}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def label_score(label: str, folded: str, query: str) -> int:
+    """Relevance of ``label`` for lowercased ``query`` (caller guarantees a substring match)."""
+    if folded == query:
+        return 1000
+    if folded.startswith(query):
+        return 500
+    score = 100 - len(label)
+    if f" {query}" in folded or f"_{query}" in folded:
+        score += 50
+    return score
+
+
+class LabelIndex:
+    def __init__(self):
+        self._folded: dict[str, str] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._sorted: list[tuple[str, str]] = []  # (lowercased label, label)
+        self._degree: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []  # (-degree, label); stale entries skipped
+
+    @classmethod
+    def from_graph(cls, graph) -> "LabelIndex":
+        index = cls()
+        for node, degree in graph.degree():
+            index._add_label(str(node))
+            index._degree[str(node)] = degree
+        index._sorted.sort()
+        index._heap = [(-d, label) for label, d in index._degree.items()]
+        heapq.heapify(index._heap)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._folded)
+
+    # --- maintenance ---------------------------------------------------------
+
+    def _add_label(self, label: str, keep_sorted: bool = False) -> bool:
+        if label in self._folded:
+            return False
+        folded = label.lower()
+        self._folded[label] = folded
+        for gram in _grams(folded):
+            self._postings.setdefault(gram, set()).add(label)
+        if keep_sorted:
+            bisect.insort(self._sorted, (folded, label))
+        else:
+            self._sorted.append((folded, label))
+        return True
+
+    def add_node(self, label: str) -> None:
+        label = str(label)
+        if self._add_label(label, keep_sorted=True):
+            self._set_degree(label, 0)
+
+    def remove_node(self, label: str, neighbors: Iterable[str] = ()) -> None:
+        """Drop ``label``; ``neighbors`` lose the edge they had with it."""
+        label = str(label)
+        folded = self._folded.pop(label, None)
+        if folded is None:
+            return
+        for gram in _grams(folded):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(label)
+                if not posting:
+                    del self._postings[gram]
+        pos = bisect.bisect_left(self._sorted, (folded, label))
+        if pos < len(self._sorted) and self._sorted[pos] == (folded, label):
+            del self._sorted[pos]
+        self._degree.pop(label, None)
+        for neighbor in neighbors:
+            neighbor = str(neighbor)
+            if neighbor != label:
+                self.adjust_degree(neighbor, -1)
+
+    def add_edge(self, src: str, tgt: str) -> None:
+        """Record a *new* edge (callers skip edges that already existed)."""
+        self.add_node(src)
+        self.add_node(tgt)
+        self.adjust_degree(str(src), 1)
+        self.adjust_degree(str(tgt), 1)
+
+    def remove_edge(self, src: str, tgt: str) -> None:
+        self.adjust_degree(str(src), -1)
+        self.adjust_degree(str(tgt), -1)
+
+    def adjust_degree(self, label: str, delta: int) -> None:
+        if label in self._degree:
+            self._set_degree(label, max(0, self._degree[label] + delta))
+
+    def _set_degree(self, label: str, degree: int) -> None:
+        self._degree[label] = degree
+        heapq.heappush(self._heap, (-degree, label))
+        # Compact once stale entries dominate
+        if len(self._heap) > 4 * len(self._degree) + 1024:
+            self._heap = [(-d, lbl) for lbl, d in self._degree.items()]
+            heapq.heapify(self._heap)
+
+    # --- queries -------------------------------------------------------------
+
+    def popular(self, limit: int) -> list[str]:
+        result: list[str] = []
+        popped: list[tuple[int, str]] = []
+        seen: set[str] = set()
+        while self._heap and len(result) < limit:
+            neg_degree, label = heapq.heappop(self._heap)
+            if self._degree.get(label) != -neg_degree or label in seen:
+                continue  # stale or duplicate entry
+            seen.add(label)
+            popped.append((neg_degree, label))
+            result.append(label)
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def _prefix_range(self, query: str) -> list[str]:
+        lo = bisect.bisect_left(self._sorted, (query,))
+        hi = bisect.bisect_left(self._sorted, (query + "\U0010ffff",))
+        return [label for _, label in self._sorted[lo:hi]]
+
+    def _candidates(self, query: str) -> set[str]:
+        if len(query) >= 3:
+            grams = sorted(
+                {query[i : i + 3] for i in range(len(query) - 2)},
+                key=lambda g: len(self._postings.get(g, ())),
+            )
+            if not grams or grams[0] not in self._postings:
+                return set()
+            candidates = set(self._postings[grams[0]])
+            for gram in grams[1:]:
+                candidates &= self._postings.get(gram, set())
+                if not candidates:
+                    break
+            return candidates
+        # One or two characters: union of the (padded) grams that contain the query
+        candidates: set[str] = set()
+        for gram, labels in self._postings.items():
+            if query in gram:
+                candidates |= labels
+        return candidates
+
+    def search(self, query: str, limit: int) -> list[str]:
+        query = query.lower().strip()
+        if not query or limit <= 0:
+            return []
+
+        prefix = self._prefix_range(query)
+        if len(prefix) >= limit:
+            # Exact/prefix scores (>= 500) always beat contains scores (<= 150)
+            scored = (
+                (-label_score(label, self._folded[label], query), label)
+                for label in prefix
+            )
+            return [label for _, label in heapq.nsmallest(limit, scored)]
+
+        scored = []
+        for label in self._candidates(query):
+            folded = self._folded[label]
+            if query in folded:
+                scored.append((-label_score(label, folded, query), label))
+        return [label for _, label in heapq.nsmallest(limit, scored)]
@@ -6,7 +6,7 @@ from typing import final
 import configparser
 
 from ..utils import logger
-from ..base import BaseGraphStorage
+from ..base import BaseGraphStorage, FrontierExpansion
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from ..constants import GRAPH_FIELD_SEP
 from ..kg.shared_storage import get_data_init_lock, get_graph_db_lock
@@ -31,6 +31,14 @@ config = configparser.ConfigParser()
 config.read("config.ini", "utf-8")
 
 
+def _property_map(var: str, fields: list[str] | None) -> str:
+    """Cypher expression for the properties of ``var``, restricted to ``fields``"""
+    if fields is None:
+        return f"properties({var})"
+    names = [f.replace("`", "``") for f in fields]
+    return "{" + ", ".join(f"`{n}`: {var}.`{n}`" for n in names) + "}"
+
+
 @final
 @dataclass
 class MemgraphStorage(BaseGraphStorage):
@@ -784,6 +792,77 @@ class MemgraphStorage(BaseGraphStorage):
         degrees = int(src_degree) + int(trg_degree)
         return degrees
 
+    async def expand_frontier(
+        self,
+        nodes: list[str],
+        exclude: set[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_fields: list[str] | None = None,
+        limit: int | None = None,
+    ) -> FrontierExpansion:
+        """Expand the frontier in one query: incident edges, neighbors and their degrees.
+
+        Edges are collected per frontier node (and cut to ``limit``) on the server;
+        node properties and degrees are only returned for neighbors not in ``exclude``.
+
+        Raises:
+            Exception: If there is an error executing the query
+        """
+        if self._driver is None:
+            raise RuntimeError(
+                "Memgraph driver is not initialized. Call 'await initialize()' first."
+            )
+        expansion = FrontierExpansion()
+        if not nodes:
+            return expansion
+        async with self._driver.session(
+            database=self._DATABASE, default_access_mode="READ"
+        ) as session:
+            try:
+                workspace_label = self._get_workspace_label()
+                query = f"""
+                    UNWIND $node_ids AS id
+                    MATCH (n:`{workspace_label}` {{entity_id: id}})-[r]-(m:`{workspace_label}`)
+                    WHERE m.entity_id IS NOT NULL
+                    WITH id, collect({{edge: {_property_map("r", edge_fields)}, neighbor: m}}){"[..$limit]" if limit is not None else ""} AS hops
+                    UNWIND hops AS hop
+                    WITH id, hop.edge AS edge, hop.neighbor AS m
+                    WITH id, edge, m, m.entity_id IN $exclude AS known
+                    RETURN id AS node_id, m.entity_id AS neighbor_id, edge,
+                           CASE WHEN known THEN null ELSE {_property_map("m", node_fields)} END AS neighbor,
+                           CASE WHEN known THEN null ELSE degree(m) END AS degree
+                """
+                result = await session.run(
+                    query,
+                    node_ids=list(nodes),
+                    exclude=list(exclude or ()),
+                    limit=limit,
+                )
+                seen = set()
+                async for record in result:
+                    node_id = record["node_id"]
+                    neighbor_id = record["neighbor_id"]
+                    key = tuple(sorted((node_id, neighbor_id)))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    expansion.edges[(node_id, neighbor_id)] = {
+                        k: v for k, v in record["edge"].items() if v is not None
+                    }
+                    neighbor = record["neighbor"]
+                    if neighbor is not None and neighbor_id not in expansion.nodes:
+                        expansion.nodes[neighbor_id] = {
+                            k: v for k, v in neighbor.items() if v is not None
+                        }
+                        expansion.degrees[neighbor_id] = record["degree"]
+                await result.consume()
+                return expansion
+            except Exception as e:
+                logger.error(
+                    f"[{self.workspace}] Error expanding frontier of {len(nodes)} nodes: {str(e)}"
+                )
+                raise
+
     async def get_nodes_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
         """Get all nodes that are associated with the given chunk_ids.
 
@@ -15,6 +15,7 @@ from ..base import (
     DocProcessingStatus,
     DocStatus,
     DocStatusStorage,
+    FrontierExpansion,
 )
 from ..utils import logger, compute_mdhash_id
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -1036,6 +1037,149 @@ class MongoGraphStorage(BaseGraphStorage):
 
         return result
 
+    async def expand_frontier(
+        self,
+        nodes: list[str],
+        exclude: set[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_fields: list[str] | None = None,
+        limit: int | None = None,
+    ) -> FrontierExpansion:
+        """
+        Expand the frontier with a single aggregation over the edge collection.
+
+        Every matching edge is unwound once per frontier endpoint, optionally cut to
+        ``limit`` edges per frontier node, and joined with the neighbor document and
+        its in/out edge counts. Neighbors in ``exclude`` are not joined.
+        """
+        expansion = FrontierExpansion()
+        if not nodes:
+            return expansion
+        nodes = list(nodes)
+
+        pipeline: list[dict[str, Any]] = [
+            {
+                "$match": {
+                    "$or": [
+                        {"source_node_id": {"$in": nodes}},
+                        {"target_node_id": {"$in": nodes}},
+                    ]
+                }
+            }
+        ]
+        if edge_fields is not None:
+            pipeline.append(
+                {
+                    "$project": {
+                        **{f: 1 for f in edge_fields},
+                        "source_node_id": 1,
+                        "target_node_id": 1,
+                    }
+                }
+            )
+        pipeline += [
+            {
+                "$addFields": {
+                    "ends": {
+                        "$filter": {
+                            "input": [
+                                {
+                                    "node": "$source_node_id",
+                                    "neighbor": "$target_node_id",
+                                },
+                                {
+                                    "node": "$target_node_id",
+                                    "neighbor": "$source_node_id",
+                                },
+                            ],
+                            "cond": {"$in": ["$$this.node", {"$literal": nodes}]},
+                        }
+                    }
+                }
+            },
+            {"$unwind": "$ends"},
+        ]
+        if limit is not None:
+            pipeline += [
+                {"$group": {"_id": "$ends.node", "edges": {"$push": "$$ROOT"}}},
+                {"$project": {"edges": {"$slice": ["$edges", limit]}}},
+                {"$unwind": "$edges"},
+                {"$replaceRoot": {"newRoot": "$edges"}},
+            ]
+
+        # Excluded neighbors get a null lookup key, which matches no node or edge
+        node_lookup: dict[str, Any] = {
+            "from": self._collection_name,
+            "localField": "lookup_id",
+            "foreignField": "_id",
+            "as": "neighbor",
+        }
+        if node_fields is not None:
+            node_lookup["pipeline"] = [
+                {"$project": {"_id": 0, **{f: 1 for f in node_fields}}}
+            ]
+        pipeline += [
+            {
+                "$addFields": {
+                    "lookup_id": {
+                        "$cond": [
+                            {
+                                "$in": [
+                                    "$ends.neighbor",
+                                    {"$literal": list(exclude or ())},
+                                ]
+                            },
+                            None,
+                            "$ends.neighbor",
+                        ]
+                    }
+                }
+            },
+            {"$lookup": node_lookup},
+            {
+                "$lookup": {
+                    "from": self._edge_collection_name,
+                    "localField": "lookup_id",
+                    "foreignField": "source_node_id",
+                    "pipeline": [{"$count": "n"}],
+                    "as": "out_degree",
+                }
+            },
+            {
+                "$lookup": {
+                    "from": self._edge_collection_name,
+                    "localField": "lookup_id",
+                    "foreignField": "target_node_id",
+                    "pipeline": [{"$count": "n"}],
+                    "as": "in_degree",
+                }
+            },
+        ]
+
+        seen = set()
+        cursor = await self.edge_collection.aggregate(pipeline, allowDiskUse=True)
+        async for doc in cursor:
+            ends = doc.pop("ends")
+            node_id, neighbor_id = ends["node"], ends["neighbor"]
+            key = tuple(sorted((node_id, neighbor_id)))
+            if key in seen:
+                continue
+            seen.add(key)
+            neighbor = doc.pop("neighbor")
+            out_degree = doc.pop("out_degree")
+            in_degree = doc.pop("in_degree")
+            for helper in ("_id", "lookup_id"):
+                doc.pop(helper, None)
+            if edge_fields is not None:
+                doc = {k: doc[k] for k in edge_fields if k in doc}
+            expansion.edges[(node_id, neighbor_id)] = doc
+            if neighbor and neighbor_id not in expansion.nodes:
+                expansion.nodes[neighbor_id] = neighbor[0]
+                expansion.degrees[neighbor_id] = (
+                    out_degree[0]["n"] if out_degree else 0
+                ) + (in_degree[0]["n"] if in_degree else 0)
+        return expansion
+
     async def get_nodes_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
         """Get all nodes that are associated with the given chunk_ids.
 
@@ -13,8 +13,16 @@ from coldrag.utils import (
 )
 
 from coldrag.base import BaseVectorStorage
+from coldrag.snapshot import WorkspaceSnapshot, load_snapshot_vectors
 from nano_vectordb import NanoVectorDB
+from .vector_quantization import (
+    DEFAULT_RERANK_FACTOR,
+    VECTOR_QUANTIZATION_TYPES,
+    QuantizedNanoVectorDB,
+    vectors_file_for,
+)
 from .shared_storage import (
+    get_namespace_data,
     get_storage_lock,
     get_update_flag,
     set_all_update_flags,
@@ -39,6 +47,37 @@ class NanoVectorDBStorage(BaseVectorStorage):
             )
         self.cosine_better_than_threshold = cosine_threshold
 
+        # Optional ANN index over the matrix (see coldrag.kg.ann_index). It is built
+        # lazily on query and rebuilt after writes, so it suits read-mostly workloads.
+        self._ann = None
+        self._ann_index = None
+        self._ann_matrix = None
+        self._ann_version = -1
+        self._vector_version = 0
+        # Index version: the shared counter (bumped on every save/drop) this process
+        # last loaded or wrote, plus the number of unsaved changes on top of it
+        self._index_versions = None
+        self._loaded_version = 0
+        self._pending_changes = 0
+        if kwargs.get("ann_index_type", "flat") != "flat":
+            from .ann_index import AnnConfig
+
+            self._ann = AnnConfig.from_kwargs(kwargs)
+
+        # Optional int8 matrix (see coldrag.kg.vector_quantization)
+        self._quantization = kwargs.get("vector_quantization", "none")
+        if self._quantization not in VECTOR_QUANTIZATION_TYPES:
+            raise ValueError(
+                f"vector_quantization must be one of {VECTOR_QUANTIZATION_TYPES}, got {self._quantization!r}"
+            )
+        if self._quantization != "none" and self._ann is not None:
+            raise ValueError(
+                "vector_quantization cannot be combined with ann_index_type"
+            )
+        self._rerank_factor = kwargs.get(
+            "quantization_rerank_factor", DEFAULT_RERANK_FACTOR
+        )
+
         working_dir = self.global_config["working_dir"]
         if self.workspace:
             # Include workspace in the file path for data isolation
@@ -57,9 +96,38 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
 
-        self._client = NanoVectorDB(
-            self.embedding_func.embedding_dim,
-            storage_file=self._client_file_name,
+        self._client = self._load_client()
+
+    def _load_client(self) -> NanoVectorDB:
+        """Load the vector DB, from the warm-start snapshot when it is still current"""
+        if self.global_config.get("use_snapshot"):
+            storage = load_snapshot_vectors(self._client_file_name)
+            if (
+                storage is not None
+                and storage["embedding_dim"] == self.embedding_func.embedding_dim
+            ):
+                # Start from an empty client and swap in the mapped (already normalised) data
+                client = self._new_client(f"{self._client_file_name}.snapshot")
+                client.storage_file = self._client_file_name
+                if isinstance(client, QuantizedNanoVectorDB):
+                    client.attach(storage)
+                else:
+                    setattr(client, "_NanoVectorDB__storage", storage)
+                logger.info(
+                    f"[{self.workspace}] Process {os.getpid()} mapped {self.namespace} from snapshot with {len(storage['data'])} vectors"
+                )
+                return client
+        return self._new_client(self._client_file_name)
+
+    def _new_client(self, storage_file: str) -> NanoVectorDB:
+        if self._quantization == "int8":
+            return QuantizedNanoVectorDB(
+                self.embedding_func.embedding_dim,
+                storage_file=storage_file,
+                rerank_factor=self._rerank_factor,
+            )
+        return NanoVectorDB(
+            self.embedding_func.embedding_dim, storage_file=storage_file
         )
 
     async def initialize(self):
@@ -68,6 +136,10 @@ class NanoVectorDBStorage(BaseVectorStorage):
         self.storage_updated = await get_update_flag(self.final_namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock(enable_logging=False)
+        # Index versions shared by all processes, keyed by namespace
+        self._index_versions = await get_namespace_data("vector_versions")
+        async with self._storage_lock:
+            self._loaded_version = self._index_versions.get(self.final_namespace, 0)
 
     async def _get_client(self):
         """Check if the storage should be reloaded"""
@@ -79,15 +151,27 @@ class NanoVectorDBStorage(BaseVectorStorage):
                     f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                self._client = self._load_client()
+                self._loaded_version = self._index_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 # Reset update flag
                 self.storage_updated.value = False
 
             return self._client
 
+    async def get_index_version(self) -> str:
+        await self._get_client()
+        if not self._pending_changes:
+            return str(self._loaded_version)
+        # Unsaved changes are only visible to this process
+        return f"{self._loaded_version}.{os.getpid()}.{self._pending_changes}"
+
+    def _bump_index_version(self) -> None:
+        """Publish a new shared index version (caller must hold the storage lock)"""
+        self._loaded_version = self._index_versions.get(self.final_namespace, 0) + 1
+        self._index_versions[self.final_namespace] = self._loaded_version
+        self._pending_changes = 0
+
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
         Importance notes:
@@ -121,14 +205,18 @@ class NanoVectorDBStorage(BaseVectorStorage):
         embeddings = np.concatenate(embeddings_list)
         if len(embeddings) == len(list_data):
             for i, d in enumerate(list_data):
-                # Compress vector using Float16 + zlib + Base64 for storage optimization
-                vector_f16 = embeddings[i].astype(np.float16)
-                compressed_vector = zlib.compress(vector_f16.tobytes())
-                encoded_vector = base64.b64encode(compressed_vector).decode("utf-8")
-                d["vector"] = encoded_vector
+                if self._quantization == "none":
+                    # Compress vector using Float16 + zlib + Base64 for storage optimization
+                    vector_f16 = embeddings[i].astype(np.float16)
+                    compressed_vector = zlib.compress(vector_f16.tobytes())
+                    encoded_vector = base64.b64encode(compressed_vector).decode("utf-8")
+                    d["vector"] = encoded_vector
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
             results = client.upsert(datas=list_data)
+            # Existing rows are updated in place, so the matrix identity alone is not enough
+            self._vector_version += 1
+            self._pending_changes += 1
             return results
         else:
             # sometimes the embedding is not returned correctly. just log it.
@@ -150,11 +238,13 @@ class NanoVectorDBStorage(BaseVectorStorage):
             embedding = embedding[0]
 
         client = await self._get_client()
-        results = client.query(
-            query=embedding,
-            top_k=top_k,
-            better_than_threshold=self.cosine_better_than_threshold,
-        )
+        results = self._ann_query(client, embedding, top_k)
+        if results is None:
+            results = client.query(
+                query=embedding,
+                top_k=top_k,
+                better_than_threshold=self.cosine_better_than_threshold,
+            )
         results = [
             {
                 **{k: v for k, v in dp.items() if k != "vector"},
@@ -166,6 +256,50 @@ class NanoVectorDBStorage(BaseVectorStorage):
         ]
         return results
 
+    def _ann_query(
+        self, client: NanoVectorDB, embedding, top_k: int
+    ) -> list[dict[str, Any]] | None:
+        """Search the ANN index, or return None to fall back to the exact scan"""
+        if self._ann is None:
+            return None
+        storage = getattr(client, "_NanoVectorDB__storage")
+        min_vectors = max(self._ann.min_vectors, 1)
+        if self._ann.needs_training:
+            min_vectors = max(min_vectors, self._ann.min_train_size())
+        if len(storage["data"]) < min_vectors:
+            return None
+
+        from .ann_index import build_index, search_params
+
+        matrix = storage["matrix"]
+        if (
+            self._ann_index is None
+            or self._ann_matrix is not matrix
+            or self._ann_version != self._vector_version
+        ):
+            start = time.perf_counter()
+            # Rows of the matrix are already normalised; row positions are the ids
+            self._ann_index = build_index(
+                self._ann, np.ascontiguousarray(matrix, dtype=np.float32)
+            )
+            self._ann_matrix = matrix
+            self._ann_version = self._vector_version
+            logger.info(
+                f"[{self.workspace}] Built {self._ann.index_type} index for {self.namespace} over {len(matrix)} vectors in {time.perf_counter() - start:.2f}s"
+            )
+
+        query = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        query = query / np.linalg.norm(query)
+        scores, rows = self._ann_index.search(
+            query, top_k, params=search_params(self._ann, self._ann_index)
+        )
+        results = []
+        for score, row in zip(scores[0], rows[0]):
+            if row < 0 or score < self.cosine_better_than_threshold:
+                continue
+            results.append({**storage["data"][row], "__metrics__": float(score)})
+        return results
+
     @property
     async def client_storage(self):
         client = await self._get_client()
@@ -188,6 +322,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             before_count = len(client)
 
             client.delete(ids)
+            self._pending_changes += 1
 
             # Calculate actual deleted count
             after_count = len(client)
@@ -219,6 +354,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             client = await self._get_client()
             if client.get([entity_id]):
                 client.delete([entity_id])
+                self._pending_changes += 1
                 logger.debug(
                     f"[{self.workspace}] Successfully deleted entity {entity_name}"
                 )
@@ -253,6 +389,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             if ids_to_delete:
                 client = await self._get_client()
                 client.delete(ids_to_delete)
+                self._pending_changes += 1
                 logger.debug(
                     f"[{self.workspace}] Deleted {len(ids_to_delete)} relations for {entity_name}"
                 )
@@ -274,10 +411,9 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
                 )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                self._client = self._load_client()
+                self._loaded_version = self._index_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -287,6 +423,8 @@ class NanoVectorDBStorage(BaseVectorStorage):
             try:
                 # Save data to disk
                 self._client.save()
+                if self._pending_changes:
+                    self._bump_index_version()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -300,6 +438,14 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         return True  # Return success
 
+    async def export_snapshot(self, snapshot: WorkspaceSnapshot) -> bool:
+        async with self._storage_lock:
+            if isinstance(self._client, QuantizedNanoVectorDB):
+                storage = self._client.export_storage()
+            else:
+                storage = getattr(self._client, "_NanoVectorDB__storage")
+            return snapshot.add_vectors(self._client_file_name, storage)
+
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
         """Get vector data by its ID
 
@@ -371,6 +517,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
         results = client.get(ids)
 
         vectors_dict = {}
+        from_matrix = []
         for result in results:
             if result and "vector" in result and "__id__" in result:
                 # Decompress vector data (Base64 + zlib + Float16 compressed)
@@ -379,6 +526,19 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 vector_f16 = np.frombuffer(decompressed, dtype=np.float16)
                 vector_f32 = vector_f16.astype(np.float32).tolist()
                 vectors_dict[result["__id__"]] = vector_f32
+            elif result and "__id__" in result:
+                from_matrix.append(result["__id__"])
+
+        if from_matrix:
+            # Records written in int8 mode only have the (normalised) matrix rows
+            if isinstance(client, QuantizedNanoVectorDB):
+                vectors = client.full_vectors(from_matrix)
+            else:
+                storage = getattr(client, "_NanoVectorDB__storage")
+                rows = {dp["__id__"]: i for i, dp in enumerate(storage["data"])}
+                vectors = storage["matrix"][[rows[id] for id in from_matrix]]
+            for id, vector in zip(from_matrix, vectors):
+                vectors_dict[id] = vector.tolist()
 
         return vectors_dict
 
@@ -401,13 +561,15 @@ class NanoVectorDBStorage(BaseVectorStorage):
         try:
             async with self._storage_lock:
                 # delete _client_file_name
-                if os.path.exists(self._client_file_name):
-                    os.remove(self._client_file_name)
-
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                for file_name in (
+                    self._client_file_name,
+                    vectors_file_for(self._client_file_name),
+                ):
+                    if os.path.exists(file_name):
+                        os.remove(file_name)
+
+                self._client = self._new_client(self._client_file_name)
+                self._bump_index_version()
 
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
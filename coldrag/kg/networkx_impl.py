@@ -4,10 +4,13 @@ from typing import final
 
 from coldrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from coldrag.utils import logger
-from coldrag.base import BaseGraphStorage
+from coldrag.base import BaseGraphStorage, FrontierExpansion
 from coldrag.constants import GRAPH_FIELD_SEP
+from coldrag.snapshot import WorkspaceSnapshot, load_snapshot_object
 import networkx as nx
+from .label_index import LabelIndex
 from .shared_storage import (
+    get_namespace_data,
     get_storage_lock,
     get_update_flag,
     set_all_update_flags,
@@ -56,9 +59,16 @@ class NetworkXStorage(BaseGraphStorage):
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
+        # Built lazily on the first label search; dropped whenever the graph is reloaded
+        self._label_index: LabelIndex | None = None
+        # Graph version: the shared counter (bumped on every persist/drop) this process
+        # last loaded or wrote, plus the number of in-memory mutations made since then
+        self._graph_versions = None
+        self._loaded_version = 0
+        self._pending_changes = 0
 
         # Load initial graph
-        preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
+        preloaded_graph = self._load_graph()
         if preloaded_graph is not None:
             logger.info(
                 f"[{self.workspace}] Loaded graph from {self._graphml_xml_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
@@ -69,12 +79,24 @@ class NetworkXStorage(BaseGraphStorage):
             )
         self._graph = preloaded_graph or nx.Graph()
 
+    def _load_graph(self) -> nx.Graph | None:
+        """Load the graph, from the warm-start snapshot when it is still current"""
+        if self.global_config.get("use_snapshot"):
+            graph = load_snapshot_object(self._graphml_xml_file)
+            if graph is not None:
+                return graph
+        return NetworkXStorage.load_nx_graph(self._graphml_xml_file)
+
     async def initialize(self):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock()
+        # Graph versions shared by all processes, keyed by namespace
+        self._graph_versions = await get_namespace_data("graph_versions")
+        async with self._storage_lock:
+            self._loaded_version = self._graph_versions.get(self.final_namespace, 0)
 
     async def _get_graph(self):
         """Check if the storage should be reloaded"""
@@ -86,14 +108,34 @@ class NetworkXStorage(BaseGraphStorage):
                     f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
                 )
                 # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                self._graph = self._load_graph() or nx.Graph()
+                self._label_index = None
+                self._loaded_version = self._graph_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 # Reset update flag
                 self.storage_updated.value = False
 
             return self._graph
 
+    async def get_graph_version(self) -> str:
+        await self._get_graph()
+        if not self._pending_changes:
+            return str(self._loaded_version)
+        # Unsaved changes are only visible to this process
+        return f"{self._loaded_version}.{os.getpid()}.{self._pending_changes}"
+
+    def _bump_graph_version(self) -> None:
+        """Publish a new shared graph version (caller must hold the storage lock)"""
+        self._loaded_version = self._graph_versions.get(self.final_namespace, 0) + 1
+        self._graph_versions[self.final_namespace] = self._loaded_version
+        self._pending_changes = 0
+
+    async def _get_label_index(self) -> LabelIndex:
+        graph = await self._get_graph()
+        if self._label_index is None:
+            self._label_index = LabelIndex.from_graph(graph)
+        return self._label_index
+
     async def has_node(self, node_id: str) -> bool:
         graph = await self._get_graph()
         return graph.has_node(node_id)
@@ -128,6 +170,47 @@ class NetworkXStorage(BaseGraphStorage):
             return list(graph.edges(source_node_id))
         return None
 
+    async def expand_frontier(
+        self,
+        nodes: list[str],
+        exclude: set[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_fields: list[str] | None = None,
+        limit: int | None = None,
+    ) -> FrontierExpansion:
+        graph = await self._get_graph()
+        exclude = exclude or set()
+        expansion = FrontierExpansion()
+        seen: set[tuple[str, str]] = set()
+
+        def project(data: dict, fields: list[str] | None) -> dict:
+            # Copy: callers may annotate the returned dicts
+            if fields is None:
+                return dict(data)
+            return {k: data[k] for k in fields if k in data}
+
+        for node in nodes:
+            if not graph.has_node(node):
+                continue
+            count = 0
+            for neighbor in graph.neighbors(node):
+                if limit is not None and count >= limit:
+                    break
+                key = (node, neighbor) if node <= neighbor else (neighbor, node)
+                if key in seen:
+                    continue
+                seen.add(key)
+                count += 1
+                expansion.edges[(node, neighbor)] = project(
+                    graph.edges[node, neighbor], edge_fields
+                )
+                if neighbor not in exclude and neighbor not in expansion.nodes:
+                    expansion.nodes[neighbor] = project(
+                        graph.nodes[neighbor], node_fields
+                    )
+                    expansion.degrees[neighbor] = graph.degree(neighbor)
+        return expansion
+
     async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
         """
         Importance notes:
@@ -137,6 +220,9 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_node(node_id, **node_data)
+        self._pending_changes += 1
+        if self._label_index is not None:
+            self._label_index.add_node(node_id)
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -148,7 +234,11 @@ class NetworkXStorage(BaseGraphStorage):
            KG-storage-log should be used to avoid data corruption
         """
         graph = await self._get_graph()
+        is_new_edge = not graph.has_edge(source_node_id, target_node_id)
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._pending_changes += 1
+        if self._label_index is not None and is_new_edge:
+            self._label_index.add_edge(source_node_id, target_node_id)
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -159,7 +249,10 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         if graph.has_node(node_id):
+            if self._label_index is not None:
+                self._label_index.remove_node(node_id, list(graph.neighbors(node_id)))
             graph.remove_node(node_id)
+            self._pending_changes += 1
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
             logger.warning(
@@ -180,7 +273,10 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         for node in nodes:
             if graph.has_node(node):
+                if self._label_index is not None:
+                    self._label_index.remove_node(node, list(graph.neighbors(node)))
                 graph.remove_node(node)
+                self._pending_changes += 1
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -197,6 +293,9 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                self._pending_changes += 1
+                if self._label_index is not None:
+                    self._label_index.remove_edge(source, target)
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -222,14 +321,8 @@ class NetworkXStorage(BaseGraphStorage):
         Returns:
             List of labels sorted by degree (highest first)
         """
-        graph = await self._get_graph()
-
-        # Get degrees of all nodes and sort by degree descending
-        degrees = dict(graph.degree())
-        sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)
-
-        # Return top labels limited by the specified limit
-        popular_labels = [str(node) for node, _ in sorted_nodes[:limit]]
+        label_index = await self._get_label_index()
+        popular_labels = label_index.popular(limit)
 
         logger.debug(
             f"[{self.workspace}] Retrieved {len(popular_labels)} popular labels (limit: {limit})"
@@ -248,44 +341,12 @@ class NetworkXStorage(BaseGraphStorage):
         Returns:
             List of matching labels sorted by relevance
         """
-        graph = await self._get_graph()
-        query_lower = query.lower().strip()
-
-        if not query_lower:
+        if not query.strip():
             return []
 
-        # Collect matching nodes with relevance scores
-        matches = []
-        for node in graph.nodes():
-            node_str = str(node)
-            node_lower = node_str.lower()
-
-            # Skip if no match
-            if query_lower not in node_lower:
-                continue
-
-            # Calculate relevance score
-            # Exact match gets highest score
-            if node_lower == query_lower:
-                score = 1000
-            # Prefix match gets high score
-            elif node_lower.startswith(query_lower):
-                score = 500
-            # Contains match gets base score, with bonus for shorter strings
-            else:
-                # Shorter strings with matches are more relevant
-                score = 100 - len(node_str)
-                # Bonus for word boundary matches
-                if f" {query_lower}" in node_lower or f"_{query_lower}" in node_lower:
-                    score += 50
-
-            matches.append((node_str, score))
-
-        # Sort by relevance score (desc) then alphabetically
-        matches.sort(key=lambda x: (-x[1], x[0]))
-
-        # Return top matches limited by the specified limit
-        search_results = [match[0] for match in matches[:limit]]
+        label_index = await self._get_label_index()
+        # Ranked exact > prefix > substring (shorter / word-boundary first), then alphabetically
+        search_results = label_index.search(query, limit)
 
         logger.debug(
             f"[{self.workspace}] Search query '{query}' returned {len(search_results)} results (limit: {limit})"
@@ -535,9 +596,10 @@ class NetworkXStorage(BaseGraphStorage):
                 logger.info(
                     f"[{self.workspace}] Graph was updated by another process, reloading..."
                 )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                self._graph = self._load_graph() or nx.Graph()
+                self._label_index = None
+                self._loaded_version = self._graph_versions.get(self.final_namespace, 0)
+                self._pending_changes = 0
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -549,6 +611,8 @@ class NetworkXStorage(BaseGraphStorage):
                 NetworkXStorage.write_nx_graph(
                     self._graph, self._graphml_xml_file, self.workspace
                 )
+                if self._pending_changes:
+                    self._bump_graph_version()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -560,6 +624,10 @@ class NetworkXStorage(BaseGraphStorage):
 
         return True
 
+    async def export_snapshot(self, snapshot: WorkspaceSnapshot) -> bool:
+        async with self._storage_lock:
+            return snapshot.add_object(self._graphml_xml_file, self._graph)
+
     async def drop(self) -> dict[str, str]:
         """Drop all graph data from storage and clean up resources
 
@@ -580,6 +648,8 @@ class NetworkXStorage(BaseGraphStorage):
                 if os.path.exists(self._graphml_xml_file):
                     os.remove(self._graphml_xml_file)
                 self._graph = nx.Graph()
+                self._label_index = None
+                self._bump_graph_version()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -30,6 +30,7 @@ from ..base import (
     DocProcessingStatus,
     DocStatus,
     DocStatusStorage,
+    FrontierExpansion,
 )
 from ..namespace import NameSpace, is_namespace
 from ..utils import logger
@@ -4151,6 +4152,120 @@ class PGGraphStorage(BaseGraphStorage):
 
         return out
 
+    async def expand_frontier(
+        self,
+        nodes: list[str],
+        exclude: set[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_fields: list[str] | None = None,
+        limit: int | None = None,
+    ) -> FrontierExpansion:
+        """
+        Expand the frontier in one SQL statement over the vertex and edge tables.
+
+        Incident edges are numbered per frontier node so ``limit`` is applied in the
+        database; neighbor properties and degrees are only computed for neighbors
+        not in ``exclude``.
+        """
+        expansion = FrontierExpansion()
+        if not nodes:
+            return expansion
+
+        names: dict[str, str] = {}
+        for nid in nodes:
+            names.setdefault(self._normalize_node_id(nid), nid)
+        excluded = [self._normalize_node_id(nid) for nid in exclude or ()]
+
+        def entity_id(alias: str) -> str:
+            return f"ag_catalog.agtype_access_operator(VARIADIC ARRAY[{alias}.properties, '\"entity_id\"'::agtype])"
+
+        query = f"""
+            WITH ids(name, node_id) AS (
+              SELECT v, (to_json(v)::text)::agtype
+              FROM unnest($1::text[]) AS t(v)
+            ),
+            excluded(node_id) AS (
+              SELECT (to_json(v)::text)::agtype
+              FROM unnest($2::text[]) AS t(v)
+            ),
+            frontier AS (
+              SELECT b.id AS vid, i.name
+              FROM {self.graph_name}.base AS b
+              JOIN ids i ON {entity_id("b")} = i.node_id
+            ),
+            incident AS (
+              SELECT f.name, e.id AS eid, e.properties, e.end_id AS nbr_vid
+              FROM frontier f
+              JOIN {self.graph_name}."DIRECTED" AS e ON e.start_id = f.vid
+              UNION ALL
+              SELECT f.name, e.id AS eid, e.properties, e.start_id AS nbr_vid
+              FROM frontier f
+              JOIN {self.graph_name}."DIRECTED" AS e ON e.end_id = f.vid
+            ),
+            hops AS (
+              SELECT h.*, row_number() OVER (PARTITION BY h.name ORDER BY h.eid) AS rn
+              FROM incident h
+            )
+            SELECT h.name AS node_id,
+                   {entity_id("n")}::text AS neighbor_id,
+                   h.properties AS edge_properties,
+                   k.known,
+                   CASE WHEN k.known THEN NULL ELSE n.properties END AS neighbor_properties,
+                   CASE WHEN k.known THEN NULL ELSE
+                     (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" d WHERE d.start_id = n.id)
+                     + (SELECT COUNT(*) FROM {self.graph_name}."DIRECTED" d WHERE d.end_id = n.id)
+                   END AS degree
+            FROM hops h
+            JOIN {self.graph_name}.base AS n ON n.id = h.nbr_vid
+            CROSS JOIN LATERAL (
+              SELECT EXISTS (
+                SELECT 1 FROM excluded x WHERE x.node_id = {entity_id("n")}
+              ) AS known
+            ) k
+            WHERE $3::int IS NULL OR h.rn <= $3::int
+            ORDER BY h.name, h.rn
+        """
+        results = await self._query(
+            query,
+            params={"ids": list(names), "exclude": excluded, "limit": limit},
+        )
+
+        def parse(props: Any) -> dict | None:
+            if isinstance(props, str):
+                try:
+                    return json.loads(props)
+                except json.JSONDecodeError:
+                    logger.warning(f"Failed to parse properties string: {props}")
+                    return None
+            return props
+
+        seen = set()
+        for result in results:
+            if not result["neighbor_id"]:
+                continue
+            node_id = names.get(result["node_id"], result["node_id"])
+            neighbor_id = json.loads(result["neighbor_id"])
+            key = tuple(sorted((node_id, neighbor_id)))
+            if key in seen:
+                continue
+            edge = parse(result["edge_properties"])
+            if edge is None:
+                continue
+            seen.add(key)
+            if edge_fields is not None:
+                edge = {k: edge[k] for k in edge_fields if k in edge}
+            expansion.edges[(node_id, neighbor_id)] = edge
+            if result["known"] or neighbor_id in expansion.nodes:
+                continue
+            node = parse(result["neighbor_properties"])
+            if node is None:
+                continue
+            if node_fields is not None:
+                node = {k: node[k] for k in node_fields if k in node}
+            expansion.nodes[neighbor_id] = node
+            expansion.degrees[neighbor_id] = int(result["degree"] or 0)
+        return expansion
+
     async def get_all_labels(self) -> list[str]:
         """
         Get all labels (node IDs) in the graph.
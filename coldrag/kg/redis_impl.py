@@ -22,6 +22,7 @@ from lightrag.base import (
     DocProcessingStatus,
 )
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
+from ..derived_cache import BaseCacheTier
 import json
 
 # Import tenacity for retry logic
@@ -63,50 +64,57 @@ class RedisConnectionManager:
     _lock = threading.Lock()
 
     @classmethod
-    def get_pool(cls, redis_url: str) -> ConnectionPool:
+    def _pool_key(cls, redis_url: str, decode_responses: bool) -> str:
+        # Binary clients (cache tier) need their own pool: decoding is per connection
+        return redis_url if decode_responses else f"{redis_url}#binary"
+
+    @classmethod
+    def get_pool(cls, redis_url: str, decode_responses: bool = True) -> ConnectionPool:
         """Get or create a connection pool for the given Redis URL"""
+        pool_key = cls._pool_key(redis_url, decode_responses)
         with cls._lock:
-            if redis_url not in cls._pools:
-                cls._pools[redis_url] = ConnectionPool.from_url(
+            if pool_key not in cls._pools:
+                cls._pools[pool_key] = ConnectionPool.from_url(
                     redis_url,
                     max_connections=MAX_CONNECTIONS,
-                    decode_responses=True,
+                    decode_responses=decode_responses,
                     socket_timeout=SOCKET_TIMEOUT,
                     socket_connect_timeout=SOCKET_CONNECT_TIMEOUT,
                 )
-                cls._pool_refs[redis_url] = 0
-                logger.info(f"Created shared Redis connection pool for {redis_url}")
+                cls._pool_refs[pool_key] = 0
+                logger.info(f"Created shared Redis connection pool for {pool_key}")
 
             # Increment reference count
-            cls._pool_refs[redis_url] += 1
+            cls._pool_refs[pool_key] += 1
             logger.debug(
-                f"Redis pool {redis_url} reference count: {cls._pool_refs[redis_url]}"
+                f"Redis pool {pool_key} reference count: {cls._pool_refs[pool_key]}"
             )
 
-        return cls._pools[redis_url]
+        return cls._pools[pool_key]
 
     @classmethod
-    def release_pool(cls, redis_url: str):
+    def release_pool(cls, redis_url: str, decode_responses: bool = True):
         """Release a reference to the connection pool"""
+        pool_key = cls._pool_key(redis_url, decode_responses)
         with cls._lock:
-            if redis_url in cls._pool_refs:
-                cls._pool_refs[redis_url] -= 1
+            if pool_key in cls._pool_refs:
+                cls._pool_refs[pool_key] -= 1
                 logger.debug(
-                    f"Redis pool {redis_url} reference count: {cls._pool_refs[redis_url]}"
+                    f"Redis pool {pool_key} reference count: {cls._pool_refs[pool_key]}"
                 )
 
                 # If no more references, close the pool
-                if cls._pool_refs[redis_url] <= 0:
+                if cls._pool_refs[pool_key] <= 0:
                     try:
-                        cls._pools[redis_url].disconnect()
+                        cls._pools[pool_key].disconnect()
                         logger.info(
-                            f"Closed Redis connection pool for {redis_url} (no more references)"
+                            f"Closed Redis connection pool for {pool_key} (no more references)"
                         )
                     except Exception as e:
-                        logger.error(f"Error closing Redis pool for {redis_url}: {e}")
+                        logger.error(f"Error closing Redis pool for {pool_key}: {e}")
                     finally:
-                        del cls._pools[redis_url]
-                        del cls._pool_refs[redis_url]
+                        del cls._pools[pool_key]
+                        del cls._pool_refs[pool_key]
 
     @classmethod
     def close_all_pools(cls):
@@ -1123,3 +1131,94 @@ class RedisDocStatusStorage(DocStatusStorage):
                     f"[{self.workspace}] Error dropping doc status {self.namespace}: {e}"
                 )
                 return {"status": "error", "message": str(e)}
+
+
+@final
+@dataclass
+class RedisCacheTier(BaseCacheTier):
+    """Shared L2 of ``DerivedCache``: raw binary values with a TTL.
+
+    Uses its own (non-decoding) connection pool from ``RedisConnectionManager``;
+    keys live under ``{workspace}_{namespace}:``.
+    """
+
+    def __post_init__(self):
+        redis_workspace = os.environ.get("REDIS_WORKSPACE")
+        if redis_workspace and redis_workspace.strip():
+            effective_workspace = redis_workspace.strip()
+        else:
+            effective_workspace = self.workspace
+        if effective_workspace:
+            self.final_namespace = f"{effective_workspace}_{self.namespace}"
+        else:
+            self.final_namespace = self.namespace
+            self.workspace = "_"
+
+        self._redis_url = os.environ.get(
+            "REDIS_URI", config.get("redis", "uri", fallback="redis://localhost:6379")
+        )
+        self._pool = RedisConnectionManager.get_pool(
+            self._redis_url, decode_responses=False
+        )
+        self._redis = Redis(connection_pool=self._pool)
+
+    def _key(self, key: str) -> str:
+        return f"{self.final_namespace}:{key}"
+
+    async def initialize(self):
+        try:
+            await self._redis.ping()
+            logger.info(
+                f"[{self.workspace}] Connected to Redis cache tier {self.final_namespace}"
+            )
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Failed to connect to Redis: {e}")
+            await self.finalize()
+            raise
+
+    async def finalize(self):
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception as e:
+                logger.error(f"[{self.workspace}] Error closing Redis connection: {e}")
+            finally:
+                self._redis = None
+                RedisConnectionManager.release_pool(
+                    self._redis_url, decode_responses=False
+                )
+                self._pool = None
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        return await self._redis.mget([self._key(key) for key in keys])
+
+    async def set_many(self, items: dict[str, bytes], ttl: int | None = None) -> None:
+        if not items:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._key(key), value, ex=ttl)
+        await pipe.execute()
+
+    async def drop(self) -> dict[str, str]:
+        try:
+            pattern = f"{self.final_namespace}:*"
+            cursor = 0
+            deleted_count = 0
+            while True:
+                cursor, keys = await self._redis.scan(cursor, match=pattern, count=1000)
+                if keys:
+                    deleted_count += await self._redis.delete(*keys)
+                if cursor == 0:
+                    break
+            logger.info(
+                f"[{self.workspace}] Dropped {deleted_count} keys from cache tier {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error dropping cache tier {self.namespace}: {e}"
+            )
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,660 @@
+"""
+SQLite implementations of the KV and document status storages.
+
+Embedded alternative to ``JsonKVStorage`` / ``JsonDocStatusStorage`` that needs no
+external service: every namespace is a ``kv_store_<namespace>.sqlite`` database in
+the (workspace) working directory.
+
+- Writes are committed when ``upsert`` / ``delete`` return, as one batched
+  ``executemany`` transaction; nothing is kept in RAM and no file is rewritten.
+- WAL journal mode, so readers never block the writer; concurrent writers from
+  other processes wait up to ``SQLITE_BUSY_TIMEOUT`` seconds for the write lock.
+- Each process opens its own connection (reopened after a fork) and runs it on a
+  dedicated thread, so no ``Manager`` dicts or cross-process update flags are used.
+- Document status rows keep ``status``, ``track_id``, ``file_path`` and the sort
+  columns in indexed columns; ``get_docs_paginated`` seeks from the last row of
+  the previous page (keyset pagination) when pages are walked in order.
+
+Use ``kv_storage="SQLiteKVStorage"`` and ``doc_status_storage="SQLiteDocStatusStorage"``.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Union, final
+
+from coldrag.base import (
+    BaseKVStorage,
+    DocProcessingStatus,
+    DocStatus,
+    DocStatusStorage,
+)
+from coldrag.exceptions import StorageNotInitializedError
+from coldrag.utils import logger
+
+# Bound parameters per statement, below SQLITE_MAX_VARIABLE_NUMBER of old builds
+_MAX_PARAMS = 500
+# Page boundaries remembered per storage for keyset pagination
+_MAX_PAGE_MARKS = 256
+
+
+class _SQLiteDatabase:
+    """One connection per process, used from a single worker thread."""
+
+    def __init__(self, path: str, schema: list[str]):
+        self.path = path
+        self.schema = schema
+        self._pid = None
+        self._conn: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            busy_timeout = float(os.environ.get("SQLITE_BUSY_TIMEOUT", 30))
+            conn = sqlite3.connect(
+                self.path, timeout=busy_timeout, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in self.schema:
+                    conn.execute(statement)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    async def run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run ``func(connection)`` on the connection thread of this process"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            # Threads and connections are not inherited across a fork
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="sqlite"
+            )
+            self._executor_pid = os.getpid()
+            self._conn = None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self._connect()))
+
+    async def close(self) -> None:
+        if self._executor is None or self._executor_pid != os.getpid():
+            return
+        if self._conn is not None:
+            conn = self._conn
+            await asyncio.get_running_loop().run_in_executor(self._executor, conn.close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._conn = None
+
+
+def _chunks(items: list, size: int = _MAX_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+def _database_path(storage) -> str:
+    working_dir = storage.global_config["working_dir"]
+    if storage.workspace:
+        # Include workspace in the file path for data isolation
+        workspace_dir = os.path.join(working_dir, storage.workspace)
+        storage.final_namespace = f"{storage.workspace}_{storage.namespace}"
+    else:
+        workspace_dir = working_dir
+        storage.final_namespace = storage.namespace
+        storage.workspace = "_"
+    os.makedirs(workspace_dir, exist_ok=True)
+    return os.path.join(workspace_dir, f"kv_store_{storage.namespace}.sqlite")
+
+
+@final
+@dataclass
+class SQLiteKVStorage(BaseKVStorage):
+    def __post_init__(self):
+        self._file_name = _database_path(self)
+        self._db: _SQLiteDatabase | None = None
+
+    async def initialize(self):
+        """Open the database of this process and create the table if needed"""
+        self._db = _SQLiteDatabase(
+            self._file_name,
+            [
+                "CREATE TABLE IF NOT EXISTS kv ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "create_time INTEGER NOT NULL, update_time INTEGER NOT NULL)"
+            ],
+        )
+        count = await self._db.run(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+        )
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} SQLite KV open {self.namespace} with {count} records"
+        )
+
+    async def finalize(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _database(self) -> _SQLiteDatabase:
+        if self._db is None:
+            raise StorageNotInitializedError("SQLiteKVStorage")
+        return self._db
+
+    @staticmethod
+    def _decode(row: tuple) -> dict[str, Any]:
+        id, data, create_time, update_time = row
+        result = json.loads(data)
+        result["create_time"] = create_time
+        result["update_time"] = update_time
+        result["_id"] = id
+        return result
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        row = await self._database().run(
+            lambda conn: conn.execute(
+                "SELECT id, data, create_time, update_time FROM kv WHERE id = ?",
+                (id,),
+            ).fetchone()
+        )
+        return self._decode(row) if row else None
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        def fetch(conn: sqlite3.Connection) -> dict[str, tuple]:
+            rows = {}
+            for chunk in _chunks(list(dict.fromkeys(ids))):
+                cursor = conn.execute(
+                    "SELECT id, data, create_time, update_time FROM kv "
+                    f"WHERE id IN ({_placeholders(len(chunk))})",
+                    chunk,
+                )
+                rows.update((row[0], row) for row in cursor)
+            return rows
+
+        rows = await self._database().run(fetch)
+        return [self._decode(rows[id]) if id in rows else None for id in ids]
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        def existing(conn: sqlite3.Connection) -> set[str]:
+            found = set()
+            for chunk in _chunks(list(keys)):
+                cursor = conn.execute(
+                    f"SELECT id FROM kv WHERE id IN ({_placeholders(len(chunk))})",
+                    chunk,
+                )
+                found.update(row[0] for row in cursor)
+            return found
+
+        return set(keys) - await self._database().run(existing)
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Insert or replace records in one transaction, durable on return"""
+        if not data:
+            return
+        db = self._database()
+        current_time = int(time.time())
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+
+        rows = []
+        for k, v in data.items():
+            # For text_chunks namespace, ensure llm_cache_list field exists
+            if self.namespace.endswith("text_chunks"):
+                if "llm_cache_list" not in v:
+                    v["llm_cache_list"] = []
+            v["update_time"] = current_time
+            v["_id"] = k
+            payload = {
+                key: value
+                for key, value in v.items()
+                if key not in ("_id", "create_time", "update_time")
+            }
+            rows.append(
+                (k, json.dumps(payload, ensure_ascii=False), current_time, current_time)
+            )
+
+        def write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO kv (id, data, create_time, update_time) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                    "data = excluded.data, update_time = excluded.update_time",
+                    rows,
+                )
+
+        await db.run(write)
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs, durable on return
+
+        Args:
+            ids (list[str]): List of document IDs to be deleted from storage
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+
+        def remove(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany("DELETE FROM kv WHERE id = ?", [(id,) for id in ids])
+
+        await self._database().run(remove)
+
+    async def is_empty(self) -> bool:
+        """Check if the storage is empty
+
+        Returns:
+            bool: True if storage contains no data, False otherwise
+        """
+        row = await self._database().run(
+            lambda conn: conn.execute("SELECT 1 FROM kv LIMIT 1").fetchone()
+        )
+        return row is None
+
+    async def index_done_callback(self) -> None:
+        # Every write is already committed; only move the WAL into the database
+        await self._database().run(
+            lambda conn: conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        )
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all data from storage
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+
+            def clear(conn: sqlite3.Connection) -> None:
+                with conn:
+                    conn.execute("DELETE FROM kv")
+
+            await self._database().run(clear)
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+
+_DOC_SORT_COLUMNS = ("created_at", "updated_at", "id", "file_path")
+
+
+@final
+@dataclass
+class SQLiteDocStatusStorage(DocStatusStorage):
+    """SQLite implementation of document status storage"""
+
+    def __post_init__(self):
+        self._file_name = _database_path(self)
+        self._db: _SQLiteDatabase | None = None
+        # (status, sort field, direction, page size) -> {page: last (sort value, id)}
+        self._page_marks: dict[tuple, dict[int, tuple[Any, str]]] = {}
+
+    async def initialize(self):
+        """Open the database of this process and create the table if needed"""
+        schema = [
+            "CREATE TABLE IF NOT EXISTS doc_status ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, track_id TEXT, "
+            "file_path TEXT, created_at TEXT, updated_at TEXT, data TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_doc_status_track_id "
+            "ON doc_status (track_id)",
+        ]
+        for column in ("created_at", "updated_at", "file_path"):
+            schema.append(
+                f"CREATE INDEX IF NOT EXISTS idx_doc_status_{column} "
+                f"ON doc_status ({column}, id)"
+            )
+            schema.append(
+                f"CREATE INDEX IF NOT EXISTS idx_doc_status_status_{column} "
+                f"ON doc_status (status, {column}, id)"
+            )
+        self._db = _SQLiteDatabase(self._file_name, schema)
+        count = await self._db.run(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM doc_status").fetchone()[0]
+        )
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} SQLite doc status open {self.namespace} with {count} records"
+        )
+
+    async def finalize(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    def _database(self) -> _SQLiteDatabase:
+        if self._db is None:
+            raise StorageNotInitializedError("SQLiteDocStatusStorage")
+        return self._db
+
+    def _to_doc_status(self, doc_id: str, data: str) -> DocProcessingStatus | None:
+        data = json.loads(data)
+        # Remove deprecated content field if it exists
+        data.pop("content", None)
+        # If file_path is not in data, use document id as file path
+        if "file_path" not in data:
+            data["file_path"] = "no-file-path"
+        # Ensure new fields exist with default values
+        if "metadata" not in data:
+            data["metadata"] = {}
+        if "error_msg" not in data:
+            data["error_msg"] = None
+        try:
+            return DocProcessingStatus(**data)
+        except (KeyError, TypeError) as e:
+            logger.error(
+                f"[{self.workspace}] Missing required field for document {doc_id}: {e}"
+            )
+            return None
+
+    async def _select_docs(
+        self, where: str, params: tuple
+    ) -> dict[str, DocProcessingStatus]:
+        rows = await self._database().run(
+            lambda conn: conn.execute(
+                f"SELECT id, data FROM doc_status WHERE {where}", params
+            ).fetchall()
+        )
+        result = {}
+        for doc_id, data in rows:
+            doc_status = self._to_doc_status(doc_id, data)
+            if doc_status is not None:
+                result[doc_id] = doc_status
+        return result
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        """Return keys that should be processed (not in storage or not successfully processed)"""
+
+        def existing(conn: sqlite3.Connection) -> set[str]:
+            found = set()
+            for chunk in _chunks(list(keys)):
+                cursor = conn.execute(
+                    "SELECT id FROM doc_status "
+                    f"WHERE id IN ({_placeholders(len(chunk))})",
+                    chunk,
+                )
+                found.update(row[0] for row in cursor)
+            return found
+
+        return set(keys) - await self._database().run(existing)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        def fetch(conn: sqlite3.Connection) -> dict[str, str]:
+            rows = {}
+            for chunk in _chunks(list(dict.fromkeys(ids))):
+                cursor = conn.execute(
+                    "SELECT id, data FROM doc_status "
+                    f"WHERE id IN ({_placeholders(len(chunk))})",
+                    chunk,
+                )
+                rows.update(cursor)
+            return rows
+
+        rows = await self._database().run(fetch)
+        return [json.loads(rows[id]) if id in rows else None for id in ids]
+
+    async def get_by_id(self, id: str) -> Union[dict[str, Any], None]:
+        row = await self._database().run(
+            lambda conn: conn.execute(
+                "SELECT data FROM doc_status WHERE id = ?", (id,)
+            ).fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    async def get_status_counts(self) -> dict[str, int]:
+        """Get counts of documents in each status"""
+        counts = {status.value: 0 for status in DocStatus}
+        rows = await self._database().run(
+            lambda conn: conn.execute(
+                "SELECT status, COUNT(*) FROM doc_status GROUP BY status"
+            ).fetchall()
+        )
+        counts.update(rows)
+        return counts
+
+    async def get_all_status_counts(self) -> dict[str, int]:
+        """Get counts of documents in each status for all documents
+
+        Returns:
+            Dictionary mapping status names to counts, including 'all' field
+        """
+        counts = await self.get_status_counts()
+        counts["all"] = sum(counts.values())
+        return counts
+
+    async def get_docs_by_status(
+        self, status: DocStatus
+    ) -> dict[str, DocProcessingStatus]:
+        """Get all documents with a specific status"""
+        return await self._select_docs("status = ?", (status.value,))
+
+    async def get_docs_by_track_id(
+        self, track_id: str
+    ) -> dict[str, DocProcessingStatus]:
+        """Get all documents with a specific track_id"""
+        return await self._select_docs("track_id = ?", (track_id,))
+
+    async def get_doc_by_file_path(self, file_path: str) -> Union[dict[str, Any], None]:
+        """Get document by file path
+
+        Args:
+            file_path: The file path to search for
+
+        Returns:
+            Union[dict[str, Any], None]: Document data if found, None otherwise
+            Returns the same format as get_by_ids method
+        """
+        row = await self._database().run(
+            lambda conn: conn.execute(
+                "SELECT data FROM doc_status WHERE file_path = ? LIMIT 1",
+                (file_path,),
+            ).fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Insert or replace documents in one transaction, durable on return"""
+        if not data:
+            return
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+        rows = []
+        for doc_id, doc_data in data.items():
+            # Ensure chunks_list field exists for new documents
+            if "chunks_list" not in doc_data:
+                doc_data["chunks_list"] = []
+            status = doc_data.get("status")
+            rows.append(
+                (
+                    doc_id,
+                    getattr(status, "value", status),
+                    doc_data.get("track_id"),
+                    # Sort columns are never NULL so that keyset comparisons hold
+                    doc_data.get("file_path") or "",
+                    doc_data.get("created_at") or "",
+                    doc_data.get("updated_at") or "",
+                    json.dumps(doc_data, ensure_ascii=False),
+                )
+            )
+
+        def write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO doc_status "
+                    "(id, status, track_id, file_path, created_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        await self._database().run(write)
+        self._page_marks.clear()
+
+    async def delete(self, doc_ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs, durable on return
+
+        Args:
+            ids (list[str]): List of document IDs to be deleted from storage
+
+        Returns:
+            None
+        """
+        if not doc_ids:
+            return
+
+        def remove(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM doc_status WHERE id = ?", [(id,) for id in doc_ids]
+                )
+
+        await self._database().run(remove)
+        self._page_marks.clear()
+
+    async def is_empty(self) -> bool:
+        """Check if the storage is empty
+
+        Returns:
+            bool: True if storage is empty, False otherwise
+
+        Raises:
+            StorageNotInitializedError: If storage is not initialized
+        """
+        row = await self._database().run(
+            lambda conn: conn.execute("SELECT 1 FROM doc_status LIMIT 1").fetchone()
+        )
+        return row is None
+
+    async def get_docs_paginated(
+        self,
+        status_filter: DocStatus | None = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort_field: str = "updated_at",
+        sort_direction: str = "desc",
+    ) -> tuple[list[tuple[str, DocProcessingStatus]], int]:
+        """Get documents with pagination support
+
+        Pages are ordered by ``(sort_field, id)``. A page that follows one already
+        served by this storage seeks from that page's last row through the
+        ``(status, sort_field, id)`` index instead of skipping ``OFFSET`` rows.
+        ``file_path`` sorts by code point, not by pinyin as in JsonDocStatusStorage.
+
+        Args:
+            status_filter: Filter by document status, None for all statuses
+            page: Page number (1-based)
+            page_size: Number of documents per page (10-200)
+            sort_field: Field to sort by ('created_at', 'updated_at', 'id', 'file_path')
+            sort_direction: Sort direction ('asc' or 'desc')
+
+        Returns:
+            Tuple of (list of (doc_id, DocProcessingStatus) tuples, total_count)
+        """
+        # Validate parameters
+        page = max(page, 1)
+        page_size = min(max(page_size, 10), 200)
+        if sort_field not in _DOC_SORT_COLUMNS:
+            sort_field = "updated_at"
+        if sort_direction.lower() not in ["asc", "desc"]:
+            sort_direction = "desc"
+        direction = sort_direction.upper()
+
+        status_value = status_filter.value if status_filter is not None else None
+        marks_key = (status_value, sort_field, direction, page_size)
+        marks = self._page_marks.get(marks_key, {})
+        previous = marks.get(page - 1)
+
+        conditions, params = [], []
+        if status_value is not None:
+            conditions.append("status = ?")
+            params.append(status_value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        count_sql = f"SELECT COUNT(*) FROM doc_status {where}"
+        count_params = tuple(params)
+
+        offset = 0
+        if previous is not None:
+            compare = "<" if direction == "DESC" else ">"
+            if sort_field == "id":
+                conditions.append(f"id {compare} ?")
+                params.append(previous[1])
+            else:
+                conditions.append(f"({sort_field}, id) {compare} (?, ?)")
+                params.extend(previous)
+        else:
+            offset = (page - 1) * page_size
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = (
+            f"id {direction}"
+            if sort_field == "id"
+            else f"{sort_field} {direction}, id {direction}"
+        )
+        sort_column = "id" if sort_field == "id" else sort_field
+        page_sql = (
+            f"SELECT id, data, {sort_column} FROM doc_status {where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        page_params = (*params, page_size, offset)
+
+        def fetch(conn: sqlite3.Connection) -> tuple[list[tuple], int]:
+            total = conn.execute(count_sql, count_params).fetchone()[0]
+            return conn.execute(page_sql, page_params).fetchall(), total
+
+        rows, total_count = await self._database().run(fetch)
+
+        if rows:
+            if len(self._page_marks) >= _MAX_PAGE_MARKS:
+                self._page_marks.clear()
+            last_id, _, last_value = rows[-1]
+            self._page_marks.setdefault(marks_key, {})[page] = (last_value, last_id)
+
+        docs = []
+        for doc_id, data, _ in rows:
+            doc_status = self._to_doc_status(doc_id, data)
+            if doc_status is not None:
+                docs.append((doc_id, doc_status))
+        return docs, total_count
+
+    async def index_done_callback(self) -> None:
+        # Every write is already committed; only move the WAL into the database
+        await self._database().run(
+            lambda conn: conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        )
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all document status data from storage
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+
+            def clear(conn: sqlite3.Connection) -> None:
+                with conn:
+                    conn.execute("DELETE FROM doc_status")
+
+            await self._database().run(clear)
+            self._page_marks.clear()
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,297 @@
+"""
+Int8 scalar quantisation for ``NanoVectorDBStorage``.
+
+Enabled through ``vector_db_storage_cls_kwargs``:
+
+- ``vector_quantization``: ``"none"`` (float32 matrix, default) or ``"int8"``
+- ``quantization_rerank_factor``: the best ``top_k * factor`` candidates of the
+  quantised scan are re-scored with full-precision vectors (default 4); 0 returns
+  the quantised scores as they are
+
+In int8 mode every L2-normalised vector is held as int8 codes plus one float32
+scale (``max(|x|) / 127``), a quarter of the float32 matrix, and the float16 copies
+that records otherwise carry for ``get_vectors_by_ids`` are not kept in memory.
+Queries are quantised the same way. Blocks of codes are widened to float32 and
+multiplied through BLAS, which is exact integer arithmetic for embedding
+dimensions up to 1040; the widening costs some latency over the float32 scan.
+
+Full-precision vectors are only read for re-ranking and ``get_vectors_by_ids``.
+They are memory-mapped from ``vdb_<namespace>.vectors.npy`` (written next to the
+storage file on save, or when a file without it is loaded) or from the warm-start
+snapshot, so their pages are shared by all workers through the page cache. The
+storage file keeps the NanoVectorDB layout, so a workspace can be switched between
+modes. ANN indexes (``ann_index_type``) cannot be combined with int8 mode.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from nano_vectordb import NanoVectorDB
+from nano_vectordb.dbs import (
+    f_ID,
+    f_METRICS,
+    f_VECTOR,
+    array_to_buffer_string,
+    hash_ndarray,
+    load_storage,
+    normalize,
+)
+
+from coldrag.utils import logger
+
+VECTOR_QUANTIZATION_TYPES = ("none", "int8")
+DEFAULT_RERANK_FACTOR = 4
+# Rows of codes widened to float32 at a time while scoring
+SCORE_BLOCK_ROWS = 4096
+
+
+def quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantisation: ``vectors ~= codes * scales[:, None]``"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = (np.abs(vectors).max(axis=1) / 127.0).astype(np.float32)
+    safe_scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.rint(vectors / safe_scales[:, None]).astype(np.int8)
+    return codes, scales
+
+
+def vectors_file_for(storage_file: str) -> str:
+    return f"{os.path.splitext(storage_file)[0]}.vectors.npy"
+
+
+def _write_vectors_file(path: str, matrix: np.ndarray) -> np.ndarray:
+    """Atomically write ``matrix`` and return it memory-mapped"""
+    if not len(matrix):
+        if os.path.exists(path):
+            os.remove(path)
+        return matrix
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+    # Workers still mapping the previous file keep reading it until they reload
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+class QuantizedMatrix:
+    """Int8 codes and per-row scales of an L2-normalised matrix."""
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray) -> QuantizedMatrix:
+        return cls(*quantize(vectors))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def set_rows(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        self.codes[rows], self.scales[rows] = quantize(vectors)
+
+    def append(self, vectors: np.ndarray) -> None:
+        codes, scales = quantize(vectors)
+        self.codes = np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+
+    def delete(self, rows: list[int]) -> None:
+        self.codes = np.delete(self.codes, rows, axis=0)
+        self.scales = np.delete(self.scales, rows)
+
+    def score(self, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products of a normalised ``query`` with every row"""
+        query_codes, query_scale = quantize(query.reshape(1, -1))
+        query_codes = query_codes[0].astype(np.float32)
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = self.codes[start : start + SCORE_BLOCK_ROWS]
+            np.dot(
+                block.astype(np.float32),
+                query_codes,
+                out=scores[start : start + len(block)],
+            )
+        scores *= self.scales * query_scale[0]
+        return scores
+
+
+@dataclass
+class QuantizedNanoVectorDB(NanoVectorDB):
+    """NanoVectorDB that keeps int8 codes in memory and full-precision vectors on disk."""
+
+    rerank_factor: int = DEFAULT_RERANK_FACTOR
+
+    def __post_init__(self):
+        assert self.metric == "cosine", f"Metric {self.metric} not supported"
+        self.usable_metrics = {"cosine": self._cosine_query}
+        storage = load_storage(self.storage_file) or {
+            "embedding_dim": self.embedding_dim,
+            "data": [],
+            "matrix": np.empty((0, self.embedding_dim), dtype=np.float32),
+        }
+        assert storage["embedding_dim"] == self.embedding_dim, (
+            f"Embedding dim mismatch, expected: {self.embedding_dim}, but loaded: {storage['embedding_dim']}"
+        )
+        self.attach(storage)
+
+    @property
+    def vectors_file(self) -> str:
+        return vectors_file_for(self.storage_file)
+
+    def attach(self, storage: dict[str, Any]) -> None:
+        """Take over a loaded NanoVectorDB storage dict, quantising its matrix"""
+        matrix = storage.pop("matrix")
+        for record in storage["data"]:
+            record.pop("vector", None)
+        if isinstance(matrix, np.memmap):
+            # Warm-start snapshot: already normalised and mapped from disk
+            self._full = matrix
+        else:
+            matrix = normalize(matrix) if len(matrix) else matrix
+            self._full = self._map_vectors(matrix)
+        self._full_rows = {record[f_ID]: i for i, record in enumerate(storage["data"])}
+        # Full-precision vectors upserted since the last save
+        self._pending: dict[str, np.ndarray] = {}
+        self.quantized = QuantizedMatrix.from_vectors(matrix)
+        self._NanoVectorDB__storage = storage
+
+    def _map_vectors(self, matrix: np.ndarray) -> np.ndarray:
+        if not len(matrix):
+            return matrix
+        if os.path.exists(self.vectors_file):
+            try:
+                mapped = np.load(self.vectors_file, mmap_mode="r")
+                if mapped.shape == matrix.shape and np.array_equal(mapped, matrix):
+                    return mapped
+            except (OSError, ValueError) as e:
+                logger.warning(f"Rewriting unreadable {self.vectors_file}: {e}")
+        return _write_vectors_file(self.vectors_file, matrix)
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory size of the vectors (codes, scales and unsaved vectors)"""
+        return self.quantized.nbytes + sum(v.nbytes for v in self._pending.values())
+
+    def full_vectors(self, ids: list[str]) -> np.ndarray:
+        """Full-precision (normalised) vectors of ``ids``, which must be stored"""
+        vectors = np.empty((len(ids), self.embedding_dim), dtype=np.float32)
+        saved_positions, saved_rows = [], []
+        for i, id in enumerate(ids):
+            vector = self._pending.get(id)
+            if vector is None:
+                saved_positions.append(i)
+                saved_rows.append(self._full_rows[id])
+            else:
+                vectors[i] = vector
+        if saved_rows:
+            vectors[saved_positions] = self._full[saved_rows]
+        return vectors
+
+    def upsert(self, datas: list[dict]):
+        storage = self._NanoVectorDB__storage
+        index_datas = {
+            data.get(f_ID, hash_ndarray(data[f_VECTOR])): data for data in datas
+        }
+        rows = {record[f_ID]: i for i, record in enumerate(storage["data"])}
+        report_return = {"update": [], "insert": []}
+        update_rows, update_vectors = [], []
+        new_datas, new_vectors = [], []
+        for id, data in index_datas.items():
+            vector = normalize(np.asarray(data.pop(f_VECTOR), dtype=np.float32))
+            data.pop("vector", None)
+            data[f_ID] = id
+            self._pending[id] = vector
+            if id in rows:
+                storage["data"][rows[id]] = data
+                update_rows.append(rows[id])
+                update_vectors.append(vector)
+                report_return["update"].append(id)
+            else:
+                new_datas.append(data)
+                new_vectors.append(vector)
+                report_return["insert"].append(id)
+        if update_rows:
+            self.quantized.set_rows(np.array(update_rows), np.stack(update_vectors))
+        if new_datas:
+            storage["data"].extend(new_datas)
+            self.quantized.append(np.stack(new_vectors))
+        return report_return
+
+    def delete(self, ids: list[str]):
+        storage = self._NanoVectorDB__storage
+        ids = set(ids)
+        left_data = []
+        delete_index = []
+        for i, data in enumerate(storage["data"]):
+            if data[f_ID] in ids:
+                delete_index.append(i)
+                self._pending.pop(data[f_ID], None)
+            else:
+                left_data.append(data)
+        storage["data"] = left_data
+        self.quantized.delete(delete_index)
+
+    def export_storage(self) -> dict[str, Any]:
+        """The storage dict in NanoVectorDB layout, with the full-precision matrix"""
+        storage = self._NanoVectorDB__storage
+        return {
+            **storage,
+            "matrix": self.full_vectors([data[f_ID] for data in storage["data"]]),
+        }
+
+    def save(self):
+        storage = self.export_storage()
+        matrix = storage["matrix"]
+        with open(self.storage_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {**storage, "matrix": array_to_buffer_string(matrix)},
+                f,
+                ensure_ascii=False,
+            )
+        self._full = _write_vectors_file(self.vectors_file, matrix)
+        self._full_rows = {data[f_ID]: i for i, data in enumerate(storage["data"])}
+        self._pending = {}
+
+    def _cosine_query(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        better_than_threshold: float,
+        filter_lambda=None,
+    ):
+        data = self._NanoVectorDB__storage["data"]
+        if not data or top_k <= 0:
+            return []
+        query = normalize(np.asarray(query, dtype=np.float32))
+        scores = self.quantized.score(query)
+        rows = np.arange(len(data))
+        if filter_lambda is not None:
+            rows = np.array(
+                [i for i, d in enumerate(data) if filter_lambda(d)], dtype=np.int64
+            )
+            if not len(rows):
+                return []
+            scores = scores[rows]
+
+        num_candidates = min(len(rows), top_k * max(self.rerank_factor, 1))
+        best = np.argpartition(-scores, num_candidates - 1)[:num_candidates]
+        candidates = rows[best]
+        if self.rerank_factor:
+            scores = self.full_vectors([data[i][f_ID] for i in candidates]) @ query
+        else:
+            scores = scores[best]
+
+        results = []
+        for i in np.argsort(-scores)[:top_k]:
+            if better_than_threshold is not None and scores[i] < better_than_threshold:
+                break
+            results.append({**data[candidates[i]], f_METRICS: float(scores[i])})
+        return results
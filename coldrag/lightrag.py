@@ -6,12 +6,13 @@ import configparser
 import os
 import time
 import warnings
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, fields, replace
 from datetime import datetime, timezone
 from functools import partial
 from typing import (
     Any,
     AsyncIterator,
+    Awaitable,
     Callable,
     Iterator,
     cast,
@@ -20,11 +21,14 @@ from typing import (
     Optional,
     List,
     Dict,
+    TYPE_CHECKING,
 )
 from coldrag.prompt import PROMPTS
 from coldrag.exceptions import PipelineCancelledException
 from coldrag.constants import (
     DEFAULT_MAX_GLEANING,
+    DEFAULT_GLEANING_POLICY,
+    DEFAULT_GLEANING_TOKENS_PER_RECORD,
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_TOP_K,
@@ -38,6 +42,8 @@ from coldrag.constants import (
     DEFAULT_SUMMARY_MAX_TOKENS,
     DEFAULT_SUMMARY_CONTEXT_SIZE,
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
+    DEFAULT_SUMMARY_BATCH_SIZE,
+    DEFAULT_SUMMARY_BATCH_WAIT,
     DEFAULT_MAX_ASYNC,
     DEFAULT_MAX_PARALLEL_INSERT,
     DEFAULT_MAX_GRAPH_NODES,
@@ -50,6 +56,8 @@ from coldrag.constants import (
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
+    DEFAULT_DERIVED_CACHE_MAX_BYTES,
+    DEFAULT_DERIVED_CACHE_TTL,
 )
 from coldrag.utils import get_env_value
 
@@ -94,7 +102,10 @@ from coldrag.utils import (
     Tokenizer,
     TiktokenTokenizer,
     EmbeddingFunc,
+    BroadcastStream,
+    SingleFlight,
     always_get_an_event_loop,
+    compute_args_hash,
     compute_mdhash_id,
     lazy_external_import,
     priority_limit_async_func_call,
@@ -106,9 +117,26 @@ from coldrag.utils import (
     logger,
     subtract_source_ids,
     make_relation_chunk_key,
+    parse_relation_chunk_key,
     normalize_source_ids_limit_method,
 )
-from coldrag.types import KnowledgeGraph
+from coldrag.derived_cache import (
+    BaseCacheTier,
+    DerivedCache,
+    DerivedCacheKVStorage,
+)
+from coldrag.chunk_index import (
+    ChunkGraphIndex,
+    ChunkTrackedKVStorage,
+    build_chunk_graph_index,
+    ENTITY_FIELD as CHUNK_INDEX_ENTITY_FIELD,
+    RELATION_FIELD as CHUNK_INDEX_RELATION_FIELD,
+)
+
+if TYPE_CHECKING:
+    from coldrag.structured_extract import StructuredExtractor
+    from coldrag.types import KnowledgeGraph
+
 from dotenv import load_dotenv
 
 # use the .env that is inside the current folder
@@ -121,6 +149,19 @@ config = configparser.ConfigParser()
 config.read("config.ini", "utf-8")
 
 
+def _share_query_result(result: QueryResult | None) -> QueryResult | None:
+    """Per-caller view of a coalesced query result (own raw_data dict and stream)"""
+    if result is None:
+        return None
+    return replace(
+        result,
+        raw_data=dict(result.raw_data) if result.raw_data is not None else None,
+        response_iterator=result.response_iterator.subscribe()
+        if result.is_streaming
+        else result.response_iterator,
+    )
+
+
 @final
 @dataclass
 class LightRAG:
@@ -147,6 +188,14 @@ class LightRAG:
     doc_status_storage: str = field(default="JsonDocStatusStorage")
     """Storage type for tracking document processing statuses."""
 
+    cache_tier_storage: str | None = field(
+        default_factory=lambda: os.getenv("CACHE_TIER_STORAGE") or None
+    )
+    """Cache tier shared by all workers (e.g. RedisCacheTier) for query embeddings, keyword extractions and edge judgements. None keeps them in the in-process cache only."""
+
+    use_snapshot: bool = field(default=get_env_value("USE_SNAPSHOT", False, bool))
+    """Load file-backed storages from the warm-start snapshot written by `acompile_snapshot` (entries whose source file changed since are ignored)."""
+
     # Workspace
     # ---
 
@@ -207,6 +256,21 @@ class LightRAG:
     )
     """Maximum number of entity extraction attempts for ambiguous content."""
 
+    entity_extract_gleaning_policy: str = field(
+        default=get_env_value("GLEANING_POLICY", DEFAULT_GLEANING_POLICY, str)
+    )
+    """Gleaning policy: 'always' runs the gleaning pass for every chunk, 'adaptive' skips it when the first pass already looks complete."""
+
+    gleaning_tokens_per_record: int = field(
+        default=get_env_value(
+            "GLEANING_TOKENS_PER_RECORD", DEFAULT_GLEANING_TOKENS_PER_RECORD, int
+        )
+    )
+    """Adaptive gleaning: chunk tokens the first pass may cover per extracted record before the chunk counts as under-extracted."""
+
+    structured_extractor: StructuredExtractor | None = field(default=None)
+    """Rule-based extractor run on each chunk before the LLM (e.g. `ItemRecordExtractor`). Fields it recognises become entities/relations directly; the LLM only sees the remaining free text, and is skipped when none is left."""
+
     force_llm_summary_on_merge: int = field(
         default=get_env_value(
             "FORCE_LLM_SUMMARY_ON_MERGE", DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE, int
@@ -270,6 +334,11 @@ class LightRAG:
     embedding_func: EmbeddingFunc | None = field(default=None)
     """Function for computing text embeddings. Must be set before use."""
 
+    embedding_model_name: str = field(
+        default_factory=lambda: os.getenv("EMBEDDING_MODEL", "")
+    )
+    """Name of the embedding model; part of the keys of cached query embeddings."""
+
     embedding_batch_num: int = field(default=int(os.getenv("EMBEDDING_BATCH_NUM", 10)))
     """Batch size for embedding computations."""
 
@@ -321,6 +390,16 @@ class LightRAG:
     )
     """Recommended length of LLM summary output."""
 
+    summary_batch_size: int = field(
+        default=get_env_value("SUMMARY_BATCH_SIZE", DEFAULT_SUMMARY_BATCH_SIZE, int)
+    )
+    """Maximum number of entities/relations summarised in one LLM call during merge. 1 disables batching."""
+
+    summary_batch_wait: float = field(
+        default=get_env_value("SUMMARY_BATCH_WAIT", DEFAULT_SUMMARY_BATCH_WAIT, float)
+    )
+    """Seconds a merge-phase summary request waits for others to share a batched LLM call."""
+
     llm_model_max_async: int = field(
         default=int(os.getenv("MAX_ASYNC", DEFAULT_MAX_ASYNC))
     )
@@ -353,6 +432,18 @@ class LightRAG:
     enable_llm_cache: bool = field(default=True)
     """Enables caching for LLM responses to avoid redundant computations."""
 
+    derived_cache_max_bytes: int = field(
+        default=get_env_value(
+            "DERIVED_CACHE_MAX_BYTES", DEFAULT_DERIVED_CACHE_MAX_BYTES, int
+        )
+    )
+    """Size of the in-process LRU in front of the cache tier for query-time artifacts (0 disables it)."""
+
+    derived_cache_ttl: int = field(
+        default=get_env_value("DERIVED_CACHE_TTL", DEFAULT_DERIVED_CACHE_TTL, int)
+    )
+    """Expiry in seconds of entries in the shared cache tier."""
+
     enable_llm_cache_for_entity_extract: bool = field(default=True)
     """If True, enables caching for entity extraction steps to reduce LLM costs."""
 
@@ -467,6 +558,8 @@ class LightRAG:
             ("GRAPH_STORAGE", self.graph_storage),
             ("DOC_STATUS_STORAGE", self.doc_status_storage),
         ]
+        if self.cache_tier_storage:
+            storage_configs.append(("CACHE_TIER_STORAGE", self.cache_tier_storage))
 
         for storage_type, storage_name in storage_configs:
             # Verify storage implementation compatibility
@@ -585,6 +678,20 @@ class LightRAG:
             embedding_func=self.embedding_func,
         )
 
+        # Inverted chunk -> entity/relation index, kept in step with entity_chunks/relation_chunks
+        self.chunk_graph_index: BaseKVStorage = self.key_string_value_json_storage_cls(  # type: ignore
+            namespace=NameSpace.KV_STORE_CHUNK_GRAPH_INDEX,
+            workspace=self.workspace,
+            embedding_func=self.embedding_func,
+        )
+        self._chunk_index = ChunkGraphIndex(self.chunk_graph_index)
+        self.entity_chunks = ChunkTrackedKVStorage(  # type: ignore
+            self.entity_chunks, self._chunk_index, CHUNK_INDEX_ENTITY_FIELD
+        )
+        self.relation_chunks = ChunkTrackedKVStorage(  # type: ignore
+            self.relation_chunks, self._chunk_index, CHUNK_INDEX_RELATION_FIELD
+        )
+
         self.chunk_entity_relation_graph: BaseGraphStorage = self.graph_storage_cls(  # type: ignore
             namespace=NameSpace.GRAPH_STORE_CHUNK_ENTITY_RELATION,
             workspace=self.workspace,
@@ -618,6 +725,44 @@ class LightRAG:
             embedding_func=None,
         )
 
+        # Query-time artifacts (embeddings, keywords, edge judgements) go through an
+        # in-process LRU and the optional shared cache tier
+        self.cache_tier: BaseCacheTier | None = None
+        if self.cache_tier_storage:
+            self.cache_tier = self._get_storage_class(self.cache_tier_storage)(
+                namespace=NameSpace.DERIVED_CACHE,
+                workspace=self.workspace,
+                global_config=global_config,
+            )
+        embedding_model = (
+            f"{self.embedding_model_name}:{self.embedding_func.embedding_dim}"
+        )
+
+        async def embedding_model_version() -> str:
+            return embedding_model
+
+        async def item_index_version() -> str:
+            from coldrag.item_index import get_item_index_path, get_item_index_version
+
+            return get_item_index_version(
+                get_item_index_path(self.working_dir, self.workspace)
+            )
+
+        self.derived_cache = DerivedCache(
+            self.cache_tier,
+            versions={
+                "embedding_model": embedding_model_version,
+                "graph": self.chunk_entity_relation_graph.get_graph_version,
+                "entities": self.entities_vdb.get_index_version,
+                "item_index": item_index_version,
+            },
+            l1_max_bytes=self.derived_cache_max_bytes,
+            ttl=self.derived_cache_ttl,
+        )
+        self.llm_response_cache = DerivedCacheKVStorage(  # type: ignore
+            self.llm_response_cache, self.derived_cache
+        )
+
         # Directly use llm_response_cache, don't create a new object
         hashing_kv = self.llm_response_cache
 
@@ -634,6 +779,9 @@ class LightRAG:
             )
         )
 
+        # Concurrent identical queries share one in-flight run
+        self._query_flight = SingleFlight()
+
         self._storages_status = StoragesStatus.CREATED
 
     async def initialize_storages(self):
@@ -646,12 +794,14 @@ class LightRAG:
                 self.full_relations,
                 self.entity_chunks,
                 self.relation_chunks,
+                self.chunk_graph_index,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
                 self.chunk_entity_relation_graph,
                 self.llm_response_cache,
                 self.doc_status,
+                self.cache_tier,
             ):
                 if storage:
                     # logger.debug(f"Initializing storage: {storage}")
@@ -670,12 +820,14 @@ class LightRAG:
                 ("full_relations", self.full_relations),
                 ("entity_chunks", self.entity_chunks),
                 ("relation_chunks", self.relation_chunks),
+                ("chunk_graph_index", self.chunk_graph_index),
                 ("entities_vdb", self.entities_vdb),
                 ("relationships_vdb", self.relationships_vdb),
                 ("chunks_vdb", self.chunks_vdb),
                 ("chunk_entity_relation_graph", self.chunk_entity_relation_graph),
                 ("llm_response_cache", self.llm_response_cache),
                 ("doc_status", self.doc_status),
+                ("cache_tier", self.cache_tier),
             ]
 
             # Finalize each storage individually to ensure one failure doesn't prevent others from closing
@@ -732,6 +884,12 @@ class LightRAG:
                     logger.error(f"Error during chunk_tracking migration: {e}")
                     raise e
 
+                try:
+                    await self._migrate_chunk_graph_index()
+                except Exception as e:
+                    logger.error(f"Error during chunk graph index migration: {e}")
+                    raise e
+
                 # Check if full_entities and full_relations are empty
                 # Get all processed documents to check their entity/relation data
                 try:
@@ -1009,6 +1167,23 @@ class LightRAG:
                     f"Relation chunk_tracking migration completed: {total_migrated} records persisted"
                 )
 
+    async def _migrate_chunk_graph_index(self) -> None:
+        """Seed the inverted chunk -> entity/relation index for graphs built before it existed."""
+        if not await self._chunk_index.is_empty():
+            return
+
+        logger.info("Building chunk graph index from existing graph data")
+        entity_count, relation_count = await build_chunk_graph_index(
+            self._chunk_index,
+            self.chunk_entity_relation_graph,
+            self.entity_chunks,
+            self.relation_chunks,
+        )
+        await self.chunk_graph_index.index_done_callback()
+        logger.info(
+            f"Chunk graph index built: {entity_count} entities, {relation_count} relations"
+        )
+
     async def get_graph_labels(self):
         text = await self.chunk_entity_relation_graph.get_all_labels()
         return text
@@ -1706,6 +1881,7 @@ class LightRAG:
                     processing_start_time = int(time.time())
                     first_stage_tasks = []
                     entity_relation_task = None
+                    gleaning_stats: dict[str, int] = {}
 
                     async with semaphore:
                         nonlocal processed_count
@@ -1832,7 +2008,10 @@ class LightRAG:
                             # Stage 2: Process entity relation graph (after text_chunks are saved)
                             entity_relation_task = asyncio.create_task(
                                 self._process_extract_entities(
-                                    chunks, pipeline_status, pipeline_status_lock
+                                    chunks,
+                                    pipeline_status,
+                                    pipeline_status_lock,
+                                    gleaning_stats=gleaning_stats,
                                 )
                             )
                             chunk_results = await entity_relation_task
@@ -1957,6 +2136,7 @@ class LightRAG:
                                             "metadata": {
                                                 "processing_start_time": processing_start_time,
                                                 "processing_end_time": processing_end_time,
+                                                "gleaning": gleaning_stats,
                                             },
                                         }
                                     }
@@ -2101,7 +2281,11 @@ class LightRAG:
                 pipeline_status["history_messages"].append(log_message)
 
     async def _process_extract_entities(
-        self, chunk: dict[str, Any], pipeline_status=None, pipeline_status_lock=None
+        self,
+        chunk: dict[str, Any],
+        pipeline_status=None,
+        pipeline_status_lock=None,
+        gleaning_stats: dict[str, int] | None = None,
     ) -> list:
         try:
             chunk_results = await extract_entities(
@@ -2111,6 +2295,7 @@ class LightRAG:
                 pipeline_status_lock=pipeline_status_lock,
                 llm_response_cache=self.llm_response_cache,
                 text_chunks_storage=self.text_chunks,
+                gleaning_stats=gleaning_stats,
             )
             return chunk_results
         except Exception as e:
@@ -2122,8 +2307,9 @@ class LightRAG:
             raise e
 
     async def _insert_done(
-        self, pipeline_status=None, pipeline_status_lock=None
+        self, pipeline_status=None, pipeline_status_lock=None, graph_written=True
     ) -> None:
+        graph_version = await self.chunk_entity_relation_graph.get_graph_version()
         tasks = [
             cast(StorageNameSpace, storage_inst).index_done_callback()
             for storage_inst in [  # type: ignore
@@ -2134,6 +2320,7 @@ class LightRAG:
                 self.full_relations,
                 self.entity_chunks,
                 self.relation_chunks,
+                self.chunk_graph_index,
                 self.llm_response_cache,
                 self.entities_vdb,
                 self.relationships_vdb,
@@ -2144,6 +2331,20 @@ class LightRAG:
         ]
         await asyncio.gather(*tasks)
 
+        # Storages without versioning cannot tell, so their item index is dropped
+        # whenever the caller wrote to the graph
+        if graph_version is None:
+            graph_changed = graph_written
+        else:
+            graph_changed = (
+                graph_version
+                != await self.chunk_entity_relation_graph.get_graph_version()
+            )
+        if graph_changed:
+            from coldrag.item_index import invalidate_item_index
+
+            invalidate_item_index(self.chunk_entity_relation_graph)
+
         log_message = "In memory DB persist to disk"
         logger.info(log_message)
 
@@ -2540,33 +2741,51 @@ class LightRAG:
             model_func=param.model_func,
             user_prompt=param.user_prompt,
             enable_rerank=param.enable_rerank,
+            coalesce_identical=param.coalesce_identical,
+            candidate_items=param.candidate_items,
+            use_item_index=param.use_item_index,
+            item_index_seed_ratio=param.item_index_seed_ratio,
+            pipelined_reasoning=param.pipelined_reasoning,
+            max_inflight_batches=param.max_inflight_batches,
         )
 
         query_result = None
 
         if data_param.mode in ["local", "global", "hybrid", "mix", "coldrag"]:
             logger.debug(f"[aquery_data] Using kg_query for mode: {data_param.mode}")
-            query_result = await kg_query(
-                query.strip(),
-                self.chunk_entity_relation_graph,
-                self.entities_vdb,
-                self.relationships_vdb,
-                self.text_chunks,
-                data_param,  # Use data_param with only_need_context=True
-                global_config,
-                hashing_kv=self.llm_response_cache,
-                system_prompt=None,
-                chunks_vdb=self.chunks_vdb,
+            query_result = await self._coalesced_query(
+                query,
+                data_param,
+                None,
+                partial(
+                    kg_query,
+                    query.strip(),
+                    self.chunk_entity_relation_graph,
+                    self.entities_vdb,
+                    self.relationships_vdb,
+                    self.text_chunks,
+                    data_param,  # Use data_param with only_need_context=True
+                    global_config,
+                    hashing_kv=self.llm_response_cache,
+                    system_prompt=None,
+                    chunks_vdb=self.chunks_vdb,
+                ),
             )
         elif data_param.mode == "naive":
             logger.debug(f"[aquery_data] Using naive_query for mode: {data_param.mode}")
-            query_result = await naive_query(
-                query.strip(),
-                self.chunks_vdb,
-                data_param,  # Use data_param with only_need_context=True
-                global_config,
-                hashing_kv=self.llm_response_cache,
-                system_prompt=None,
+            query_result = await self._coalesced_query(
+                query,
+                data_param,
+                None,
+                partial(
+                    naive_query,
+                    query.strip(),
+                    self.chunks_vdb,
+                    data_param,  # Use data_param with only_need_context=True
+                    global_config,
+                    hashing_kv=self.llm_response_cache,
+                    system_prompt=None,
+                ),
             )
         elif data_param.mode == "bypass":
             logger.debug("[aquery_data] Using bypass mode")
@@ -2643,26 +2862,38 @@ class LightRAG:
             query_result = None
 
             if param.mode in ["local", "global", "hybrid", "mix", "coldrag"]:
-                query_result = await kg_query(
-                    query.strip(),
-                    self.chunk_entity_relation_graph,
-                    self.entities_vdb,
-                    self.relationships_vdb,
-                    self.text_chunks,
+                query_result = await self._coalesced_query(
+                    query,
                     param,
-                    global_config,
-                    hashing_kv=self.llm_response_cache,
-                    system_prompt=system_prompt,
-                    chunks_vdb=self.chunks_vdb,
+                    system_prompt,
+                    partial(
+                        kg_query,
+                        query.strip(),
+                        self.chunk_entity_relation_graph,
+                        self.entities_vdb,
+                        self.relationships_vdb,
+                        self.text_chunks,
+                        param,
+                        global_config,
+                        hashing_kv=self.llm_response_cache,
+                        system_prompt=system_prompt,
+                        chunks_vdb=self.chunks_vdb,
+                    ),
                 )
             elif param.mode == "naive":
-                query_result = await naive_query(
-                    query.strip(),
-                    self.chunks_vdb,
+                query_result = await self._coalesced_query(
+                    query,
                     param,
-                    global_config,
-                    hashing_kv=self.llm_response_cache,
-                    system_prompt=system_prompt,
+                    system_prompt,
+                    partial(
+                        naive_query,
+                        query.strip(),
+                        self.chunks_vdb,
+                        param,
+                        global_config,
+                        hashing_kv=self.llm_response_cache,
+                        system_prompt=system_prompt,
+                    ),
                 )
             elif param.mode == "bypass":
                 # Bypass mode: directly use LLM without knowledge retrieval
@@ -2779,6 +3010,35 @@ class LightRAG:
     async def _query_done(self):
         await self.llm_response_cache.index_done_callback()
 
+    async def _coalesced_query(
+        self,
+        query: str,
+        param: QueryParam,
+        system_prompt: str | None,
+        run_query: Callable[[], Awaitable[QueryResult | None]],
+    ) -> QueryResult | None:
+        """Run ``run_query``, sharing one run between concurrent identical queries.
+
+        The key covers the query text, the system prompt and every QueryParam field,
+        so only requests that would compute the same result are coalesced.
+        """
+        if not param.coalesce_identical:
+            return await run_query()
+
+        parts = [query.strip(), system_prompt or ""]
+        for f in fields(param):
+            value = getattr(param, f.name)
+            parts.append(f"{f.name}={id(value) if callable(value) else repr(value)}")
+        key = compute_args_hash(*parts)
+
+        async def run_once() -> QueryResult | None:
+            result = await run_query()
+            if result is not None and result.is_streaming:
+                result.response_iterator = BroadcastStream(result.response_iterator)
+            return result
+
+        return await self._query_flight.do(key, run_once, share=_share_query_result)
+
     async def aclear_cache(self) -> None:
         """Clear all cache data from the LLM response cache storage.
 
@@ -3076,9 +3336,35 @@ class LightRAG:
                 affected_nodes = []
                 affected_edges = []
 
+                entity_names = list(
+                    (doc_entities_data or {}).get("entity_names", []) or []
+                )
+                relation_pairs = [
+                    list(pair)
+                    for pair in (doc_relations_data or {}).get("relation_pairs", [])
+                    or []
+                ]
+
+                # Add everything the chunk index attributes to this document's chunks;
+                # covers documents whose full_entities/full_relations entry is missing or stale
+                (
+                    indexed_entities,
+                    indexed_relation_keys,
+                ) = await self._chunk_index.lookup(chunk_ids)
+                known_entities = set(entity_names)
+                entity_names.extend(sorted(indexed_entities - known_entities))
+                known_pairs = {tuple(sorted(pair)) for pair in relation_pairs}
+                for relation_key in sorted(indexed_relation_keys):
+                    try:
+                        pair = parse_relation_chunk_key(relation_key)
+                    except ValueError:
+                        continue
+                    if tuple(sorted(pair)) not in known_pairs:
+                        known_pairs.add(tuple(sorted(pair)))
+                        relation_pairs.append(list(pair))
+
                 # Get entity data from graph storage using entity names from full_entities
-                if doc_entities_data and "entity_names" in doc_entities_data:
-                    entity_names = doc_entities_data["entity_names"]
+                if entity_names:
                     # get_nodes_batch returns dict[str, dict], need to convert to list[dict]
                     nodes_dict = await self.chunk_entity_relation_graph.get_nodes_batch(
                         entity_names
@@ -3092,8 +3378,7 @@ class LightRAG:
                             affected_nodes.append(node_data)
 
                 # Get relation data from graph storage using relation pairs from full_relations
-                if doc_relations_data and "relation_pairs" in doc_relations_data:
-                    relation_pairs = doc_relations_data["relation_pairs"]
+                if relation_pairs:
                     edge_pairs_dicts = [
                         {"src": pair[0], "tgt": pair[1]} for pair in relation_pairs
                     ]
@@ -3847,20 +4132,24 @@ class LightRAG:
     async def aexport_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "parquet", "arrow"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = 1000,
     ) -> None:
         """
         Asynchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "excel", "md", "txt", "parquet", "arrow".
                 - csv: Comma-separated values file
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
-            include_vector_data: Whether to include data from the vector database.
+                - parquet: One Parquet file per section, next to output_path
+                - arrow: One Arrow IPC file per section, next to output_path
+            include_vector_data: Whether to include data from the vector database
+                (embeddings as a fixed-size-list column for parquet/arrow).
+            batch_size: Number of entities / relations fetched and written per page.
         """
         from coldrag.utils import aexport_data as utils_aexport_data
 
@@ -3871,25 +4160,24 @@ class LightRAG:
             output_path,
             file_format,
             include_vector_data,
+            batch_size,
         )
 
     def export_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "excel", "md", "txt", "parquet", "arrow"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = 1000,
     ) -> None:
         """
         Synchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
-                - csv: Comma-separated values file
-                - excel: Microsoft Excel file with multiple sheets
-                - md: Markdown tables
-                - txt: Plain text formatted output
-                - table: Print formatted tables to console
+            file_format: Output format - "csv", "excel", "md", "txt", "parquet", "arrow".
+                See ``aexport_data`` for details.
             include_vector_data: Whether to include data from the vector database.
+            batch_size: Number of entities / relations fetched and written per page.
         """
         try:
             loop = asyncio.get_event_loop()
@@ -3898,5 +4186,103 @@ class LightRAG:
             asyncio.set_event_loop(loop)
 
         loop.run_until_complete(
-            self.aexport_data(output_path, file_format, include_vector_data)
+            self.aexport_data(output_path, file_format, include_vector_data, batch_size)
         )
+
+    async def abuild_item_index(
+        self,
+        max_hops: int = 2,
+        max_neighbors: int = 200,
+        max_attr_degree: int = 2000,
+    ) -> str:
+        """
+        Asynchronously builds the item-to-item neighbourhood index used by coldrag queries.
+
+        Should be run after indexing has finished. The index is written to the working
+        directory and picked up by queries with `QueryParam.use_item_index=True`.
+
+        Args:
+            max_hops: Maximum path length between two items through attribute nodes.
+            max_neighbors: Number of neighbours kept per item.
+            max_attr_degree: Attribute nodes above this degree are ignored as too generic.
+
+        Returns:
+            str: Path of the written index file.
+        """
+        from coldrag.item_index import build_item_index, get_item_index_path
+
+        index = await build_item_index(
+            self.chunk_entity_relation_graph,
+            max_hops=max_hops,
+            max_neighbors=max_neighbors,
+            max_attr_degree=max_attr_degree,
+        )
+        index_path = get_item_index_path(self.working_dir, self.workspace)
+        index.save(index_path)
+        logger.info(f"Item neighbourhood index saved to {index_path}")
+        return index_path
+
+    def build_item_index(
+        self,
+        max_hops: int = 2,
+        max_neighbors: int = 200,
+        max_attr_degree: int = 2000,
+    ) -> str:
+        """Synchronously builds the item-to-item neighbourhood index (see abuild_item_index)."""
+        loop = always_get_an_event_loop()
+        return loop.run_until_complete(
+            self.abuild_item_index(max_hops, max_neighbors, max_attr_degree)
+        )
+
+    async def acompile_snapshot(self) -> str:
+        """
+        Asynchronously compiles the workspace into a warm-start snapshot.
+
+        Pending changes are persisted first; every file-backed storage (JSON KV and
+        doc status, NanoVectorDB, NetworkX) then writes a binary copy of its data to
+        the snapshot directory. Instances created with `use_snapshot=True` load from
+        it instead of parsing JSON / GraphML, as long as the source files are unchanged.
+
+        Returns:
+            str: Path of the snapshot directory.
+        """
+        from coldrag.snapshot import WorkspaceSnapshot, get_snapshot_dir
+
+        # Only flushes: the item index built for the current graph stays valid
+        await self._insert_done(graph_written=False)
+
+        snapshot_dir = get_snapshot_dir(self.working_dir, self.workspace)
+        snapshot = WorkspaceSnapshot(snapshot_dir)
+        storages = [
+            self.full_docs,
+            self.doc_status,
+            self.text_chunks,
+            self.full_entities,
+            self.full_relations,
+            self.entity_chunks,
+            self.relation_chunks,
+            self.chunk_graph_index,
+            self.llm_response_cache,
+            self.entities_vdb,
+            self.relationships_vdb,
+            self.chunks_vdb,
+            self.chunk_entity_relation_graph,
+        ]
+        skipped = []
+        for storage in storages:
+            if storage is None:
+                continue
+            if not await storage.export_snapshot(snapshot):
+                skipped.append(storage.namespace)
+        snapshot.save()
+
+        logger.info(
+            f"Snapshot compiled to {snapshot_dir}: {len(snapshot.entries)} storages"
+            + (f", skipped {', '.join(skipped)}" if skipped else "")
+        )
+        return snapshot_dir
+
+    def compile_snapshot(self) -> str:
+        """Synchronously compiles the workspace into a warm-start snapshot (see acompile_snapshot)."""
+        loop = always_get_an_event_loop()
+        return loop.run_until_complete(self.acompile_snapshot())
@@ -12,6 +12,7 @@ class NameSpace:
     KV_STORE_FULL_RELATIONS = "full_relations"
     KV_STORE_ENTITY_CHUNKS = "entity_chunks"
     KV_STORE_RELATION_CHUNKS = "relation_chunks"
+    KV_STORE_CHUNK_GRAPH_INDEX = "chunk_graph_index"
 
     VECTOR_STORE_ENTITIES = "entities"
     VECTOR_STORE_RELATIONSHIPS = "relationships"
@@ -21,6 +22,8 @@ class NameSpace:
 
     DOC_STATUS = "doc_status"
 
+    DERIVED_CACHE = "derived_cache"
+
 
 def is_namespace(namespace: str, base_namespace: str | Iterable[str]):
     if isinstance(base_namespace, str):
@@ -3,14 +3,21 @@ from functools import partial
 from pathlib import Path
 
 import asyncio
+import heapq
 import json
-import json_repair
-from typing import Any, AsyncIterator, overload, Literal
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    overload,
+    Literal,
+)
 from collections import Counter, defaultdict
 
 ###
 from datetime import datetime
-from vllm_preset import vllm_qwen_complete
 import os
 import re
 ###
@@ -36,6 +43,7 @@ from coldrag.utils import (
     pick_by_vector_similarity,
     process_chunks_unified,
     safe_vdb_operation_with_exception,
+    VdbUpsertBuffer,
     create_prefixed_exception,
     fix_tuple_delimiter_corruption,
     convert_to_user_format,
@@ -43,6 +51,8 @@ from coldrag.utils import (
     apply_source_ids_limit,
     merge_source_ids,
     make_relation_chunk_key,
+    sanitize_text_for_encoding,
+    statistic_data,
 )
 from coldrag.base import (
     BaseGraphStorage,
@@ -53,7 +63,7 @@ from coldrag.base import (
     QueryResult,
     QueryContextResult,
 )
-from coldrag.prompt import PROMPTS
+from coldrag.prompt import PROMPTS, render_prompt_layout
 from coldrag.constants import (
     GRAPH_FIELD_SEP,
     DEFAULT_MAX_ENTITY_TOKENS,
@@ -68,12 +78,18 @@ from coldrag.constants import (
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_ENTITY_NAME_MAX_LENGTH,
+    DEFAULT_SUMMARY_BATCH_WAIT,
+    DEFAULT_GLEANING_TOKENS_PER_RECORD,
 )
 DEFAULT_ENTITY_TYPES = PROMPTS["DEFAULT_ENTITY_TYPES"] ###
 from coldrag.kg.shared_storage import get_storage_keyed_lock
+from coldrag.derived_cache import DerivedCache, cached_embeddings
 import time
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from coldrag.structured_extract import StructuredExtraction
+
 # use the .env that is inside the current folder
 # allows to use different .env file for each lightrag instance
 # the OS environment variables take precedence over the .env file
@@ -193,6 +209,7 @@ async def _handle_entity_relation_summary(
     seperator: str,
     global_config: dict,
     llm_response_cache: BaseKVStorage | None = None,
+    summary_batcher: "_SummaryBatcher | None" = None,
 ) -> tuple[str, bool]:
     """Handle entity relation description summary using map-reduce approach.
 
@@ -208,6 +225,7 @@ async def _handle_entity_relation_summary(
         description_list: List of description strings to summarize
         global_config: Global configuration containing tokenizer and limits
         llm_response_cache: Optional cache for LLM responses
+        summary_batcher: Optional batcher that shares LLM calls with other merges
 
     Returns:
         Tuple of (final_summarized_description_string, llm_was_used_boolean)
@@ -255,6 +273,7 @@ async def _handle_entity_relation_summary(
                     current_list,
                     global_config,
                     llm_response_cache,
+                    summary_batcher,
                 )
                 return final_summary, True  # LLM was used for final summarization
 
@@ -310,6 +329,7 @@ async def _handle_entity_relation_summary(
                     chunk,
                     global_config,
                     llm_response_cache,
+                    summary_batcher,
                 )
                 new_summaries.append(summary)
                 llm_was_used = True  # Mark that LLM was used in reduce phase
@@ -324,6 +344,7 @@ async def _summarize_descriptions(
     description_list: list[str],
     global_config: dict,
     llm_response_cache: BaseKVStorage | None = None,
+    summary_batcher: "_SummaryBatcher | None" = None,
 ) -> str:
     """Helper function to summarize a list of descriptions using LLM.
 
@@ -332,6 +353,7 @@ async def _summarize_descriptions(
         descriptions: List of description strings to summarize
         global_config: Global configuration containing LLM function and settings
         llm_response_cache: Optional cache for LLM responses
+        summary_batcher: Optional batcher; the request may share an LLM call with others
 
     Returns:
         Summarized description string
@@ -376,6 +398,11 @@ async def _summarize_descriptions(
     )
     use_prompt = prompt_template.format(**context_base)
 
+    if summary_batcher is not None:
+        return await summary_batcher.summarize(
+            description_type, description_name, joined_descriptions, use_prompt
+        )
+
     # Use LLM function with cache (higher priority for summary generation)
     summary, _ = await use_llm_func_with_cache(
         use_prompt,
@@ -386,6 +413,227 @@ async def _summarize_descriptions(
     return summary
 
 
+class _SummaryBatcher:
+    """Packs concurrent merge-phase summary requests into shared LLM calls.
+
+    Each request is first looked up in ``llm_response_cache`` under the key of its
+    single-item prompt, and identical in-flight requests share one future. Misses wait
+    up to ``summary_batch_wait`` seconds for company, then up to ``summary_batch_size``
+    of them (bounded by ``summary_context_size`` tokens) go out as one
+    ``summarize_entity_descriptions_batch`` prompt with a JSON output schema. Every
+    parsed summary is cached under its single-item key; items that are missing from
+    or unparsable in the batched response fall back to the single-item prompt.
+    """
+
+    def __init__(
+        self,
+        global_config: dict,
+        llm_response_cache: BaseKVStorage | None = None,
+        pipeline_status: dict = None,
+        pipeline_status_lock=None,
+    ):
+        self.global_config = global_config
+        self.llm_response_cache = llm_response_cache
+        self.pipeline_status = pipeline_status
+        self.pipeline_status_lock = pipeline_status_lock
+        self.batch_size = max(1, global_config.get("summary_batch_size", 1))
+        self.max_wait = global_config.get(
+            "summary_batch_wait", DEFAULT_SUMMARY_BATCH_WAIT
+        )
+        self.tokenizer: Tokenizer = global_config["tokenizer"]
+        self.token_budget = global_config["summary_context_size"]
+        self.use_llm_func = partial(global_config["llm_model_func"], _priority=8)
+
+        self._queue: list[dict] = []
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._timer: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()
+        self.llm_calls = 0
+        self.batched_summaries = 0
+
+    def _cache_enabled(self) -> bool:
+        return bool(
+            self.llm_response_cache is not None
+            and self.llm_response_cache.global_config.get(
+                "enable_llm_cache_for_entity_extract"
+            )
+        )
+
+    async def summarize(
+        self,
+        description_type: str,
+        description_name: str,
+        joined_descriptions: str,
+        single_prompt: str,
+    ) -> str:
+        safe_prompt = sanitize_text_for_encoding(single_prompt)
+        arg_hash = compute_args_hash(safe_prompt)
+
+        pending = self._inflight.get(arg_hash)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[arg_hash] = future
+        future.add_done_callback(
+            lambda f: self._inflight.pop(arg_hash, None)
+            if self._inflight.get(arg_hash) is f
+            else None
+        )
+        try:
+            cached = await handle_cache(
+                self.llm_response_cache,
+                arg_hash,
+                safe_prompt,
+                "default",
+                cache_type="summary",
+            )
+            if cached:
+                statistic_data["llm_cache"] += 1
+                future.set_result(cached[0])
+            else:
+                self._queue.append(
+                    dict(
+                        arg_hash=arg_hash,
+                        prompt=single_prompt,
+                        safe_prompt=safe_prompt,
+                        description_type=description_type,
+                        description_name=description_name,
+                        descriptions=joined_descriptions,
+                        tokens=len(self.tokenizer.encode(joined_descriptions)),
+                        future=future,
+                    )
+                )
+                if len(self._queue) >= self.batch_size:
+                    self._dispatch()
+                elif self._timer is None:
+                    self._timer = asyncio.create_task(self._dispatch_later())
+        except Exception as e:
+            future.set_exception(e)
+        return await asyncio.shield(future)
+
+    async def _dispatch_later(self):
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        while self._queue:
+            self._dispatch()
+
+    def _dispatch(self):
+        batch, tokens = [], 0
+        while self._queue and len(batch) < self.batch_size:
+            item = self._queue[0]
+            if batch and tokens + item["tokens"] > self.token_budget:
+                break
+            batch.append(self._queue.pop(0))
+            tokens += item["tokens"]
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list[dict]):
+        error: Exception | None = None
+        try:
+            await self._resolve_batch(batch)
+        except Exception as e:
+            error = e
+            logger.error(f"Batched summary of {len(batch)} items failed: {e}")
+        finally:
+            # Never leave a merge waiting on a future this batch did not resolve
+            for item in batch:
+                if not item["future"].done():
+                    item["future"].set_exception(
+                        error or RuntimeError("Batched summary was cancelled")
+                    )
+
+    async def _resolve_batch(self, batch: list[dict]):
+        try:
+            results = await self._summarize_batch(batch) if len(batch) > 1 else {}
+        except Exception as e:
+            logger.warning(
+                f"Batched summary of {len(batch)} items failed, falling back per item: {e}"
+            )
+            results = {}
+
+        fallback = [item for i, item in enumerate(batch) if i not in results]
+        for i, summary in results.items():
+            item = batch[i]
+            if self._cache_enabled():
+                await save_to_cache(
+                    self.llm_response_cache,
+                    CacheData(
+                        args_hash=item["arg_hash"],
+                        content=summary,
+                        prompt=item["safe_prompt"],
+                        cache_type="summary",
+                    ),
+                )
+            item["future"].set_result(summary)
+
+        async def _single(item):
+            try:
+                summary, _ = await use_llm_func_with_cache(
+                    item["prompt"],
+                    self.use_llm_func,
+                    llm_response_cache=self.llm_response_cache,
+                    cache_type="summary",
+                )
+            except Exception as e:
+                item["future"].set_exception(e)
+            else:
+                item["future"].set_result(summary)
+
+        if fallback:
+            self.llm_calls += len(fallback)
+            await asyncio.gather(*(_single(item) for item in fallback))
+
+    async def _summarize_batch(self, batch: list[dict]) -> dict[int, str]:
+        items_text = "\n\n".join(
+            f"### Item {i + 1}\n"
+            f"Type: {item['description_type']}\n"
+            f"Name: {item['description_name']}\n"
+            f"Description List:\n```\n{item['descriptions']}\n```"
+            for i, item in enumerate(batch)
+        )
+        prompt = PROMPTS["summarize_entity_descriptions_batch"].format(
+            items=items_text,
+            summary_length=self.global_config["summary_length_recommended"],
+            language=self.global_config["addon_params"].get(
+                "language", DEFAULT_SUMMARY_LANGUAGE
+            ),
+        )
+
+        self.llm_calls += 1
+        statistic_data["llm_call"] += 1
+        response = await self.use_llm_func(sanitize_text_for_encoding(prompt))
+        import json_repair
+
+        parsed = json_repair.loads(remove_think_tags(response))
+
+        entries = parsed.get("summaries", []) if isinstance(parsed, dict) else parsed
+        results: dict[int, str] = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                idx = int(entry.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            summary = entry.get("summary")
+            if 0 <= idx < len(batch) and isinstance(summary, str) and summary.strip():
+                results.setdefault(idx, summary.strip())
+
+        self.batched_summaries += len(results)
+        status_message = f"Batched summary: {len(results)}/{len(batch)} summaries in one LLM call"
+        logger.info(status_message)
+        if self.pipeline_status is not None and self.pipeline_status_lock is not None:
+            async with self.pipeline_status_lock:
+                self.pipeline_status["latest_message"] = status_message
+                self.pipeline_status["history_messages"].append(status_message)
+        return results
+
+
 async def _handle_single_entity_extraction(
     record_attributes: list[str],
     chunk_key: str,
@@ -599,7 +847,8 @@ async def rebuild_knowledge_from_chunks(
         text_chunks_storage=text_chunks_storage,
     )
 
-    if not cached_results:
+    structured_extractor = global_config.get("structured_extractor")
+    if not cached_results and structured_extractor is None:
         status_message = "No cached extraction results found, cannot rebuild"
         logger.warning(status_message)
         if pipeline_status is not None and pipeline_status_lock is not None:
@@ -685,6 +934,26 @@ async def rebuild_knowledge_from_chunks(
                     pipeline_status["history_messages"].append(status_message)
             continue
 
+    # Rule-based records are not in the LLM cache; re-derive them from the chunk text
+    if structured_extractor is not None:
+        chunk_ids = list(all_referenced_chunk_ids)
+        chunk_datas = await text_chunks_storage.get_by_ids(chunk_ids)
+        for chunk_id, chunk_data in zip(chunk_ids, chunk_datas):
+            if not chunk_data or not chunk_data.get("content"):
+                continue
+            structured = structured_extractor.extract(
+                chunk_id,
+                chunk_data["content"],
+                chunk_data.get("file_path", "unknown_source"),
+                chunk_data.get("create_time", int(time.time())),
+            )
+            _merge_structured_extraction(
+                chunk_entities.setdefault(chunk_id, defaultdict(list)),
+                chunk_relationships.setdefault(chunk_id, defaultdict(list)),
+                structured,
+                chunk_id,
+            )
+
     # Get max async tasks limit from global_config for semaphore control
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
@@ -1600,6 +1869,56 @@ async def _rebuild_single_relationship(
             pipeline_status["history_messages"].append(status_message)
 
 
+async def _upsert_vdb_record(
+    storage: BaseVectorStorage,
+    payload: dict[str, dict],
+    operation_name: str,
+    entity_name: str,
+    retry_delay: float,
+    vdb_buffer: VdbUpsertBuffer | None = None,
+) -> None:
+    """Upsert one vector record now, or hand it to the merge write-behind buffer."""
+    if vdb_buffer is not None:
+        await vdb_buffer.add(
+            storage,
+            payload,
+            operation_name=operation_name,
+            entity_name=entity_name,
+            max_retries=3,
+            retry_delay=retry_delay,
+        )
+        return
+    await safe_vdb_operation_with_exception(
+        operation=lambda: storage.upsert(payload),
+        operation_name=operation_name,
+        entity_name=entity_name,
+        max_retries=3,
+        retry_delay=retry_delay,
+    )
+
+
+def _new_description_fragments(
+    sorted_records: list[dict], already_description: list[str]
+) -> list[str]:
+    """Descriptions of new records to append to the stored ones.
+
+    Rule-based (structured) fragments repeat verbatim across documents, e.g.
+    "Brand X." on every item, so one that is already stored or already taken from
+    this batch is skipped. LLM fragments are merged as before.
+    """
+    known = {" ".join(desc.split()) for desc in already_description}
+    fragments = []
+    for dp in sorted_records:
+        description = dp["description"]
+        if dp.get("structured"):
+            key = " ".join(description.split())
+            if key in known:
+                continue
+            known.add(key)
+        fragments.append(description)
+    return fragments
+
+
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1610,6 +1929,8 @@ async def _merge_nodes_then_upsert(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     entity_chunks_storage: BaseKVStorage | None = None,
+    vdb_buffer: VdbUpsertBuffer | None = None,
+    summary_batcher: _SummaryBatcher | None = None,
 ):
     """Get existing nodes from knowledge graph use name,if exists, merge data, else create, then upsert."""
     already_entity_types = []
@@ -1725,7 +2046,7 @@ async def _merge_nodes_then_upsert(
         unique_nodes.values(),
         key=lambda x: (x.get("timestamp", 0), -len(x.get("description", ""))),
     )
-    sorted_descriptions = [dp["description"] for dp in sorted_nodes]
+    sorted_descriptions = _new_description_fragments(sorted_nodes, already_description)
 
     # Combine already_description with sorted new sorted descriptions
     description_list = already_description + sorted_descriptions
@@ -1747,6 +2068,7 @@ async def _merge_nodes_then_upsert(
         GRAPH_FIELD_SEP,
         global_config,
         llm_response_cache,
+        summary_batcher,
     )
 
     # 9. Build file_path within MAX_FILE_PATHS
@@ -1868,12 +2190,13 @@ async def _merge_nodes_then_upsert(
                 "file_path": file_path,
             }
         }
-        await safe_vdb_operation_with_exception(
-            operation=lambda payload=data_for_vdb: entity_vdb.upsert(payload),
+        await _upsert_vdb_record(
+            entity_vdb,
+            data_for_vdb,
             operation_name="entity_upsert",
             entity_name=entity_name,
-            max_retries=3,
             retry_delay=0.1,
+            vdb_buffer=vdb_buffer,
         )
     return node_data
 
@@ -1892,6 +2215,8 @@ async def _merge_edges_then_upsert(
     added_entities: list = None,  # New parameter to track entities added during edge processing
     relation_chunks_storage: BaseKVStorage | None = None,
     entity_chunks_storage: BaseKVStorage | None = None,
+    vdb_buffer: VdbUpsertBuffer | None = None,
+    summary_batcher: _SummaryBatcher | None = None,
 ):
     if src_id == tgt_id:
         return None
@@ -2052,7 +2377,7 @@ async def _merge_edges_then_upsert(
         unique_edges.values(),
         key=lambda x: (x.get("timestamp", 0), -len(x.get("description", ""))),
     )
-    sorted_descriptions = [dp["description"] for dp in sorted_edges]
+    sorted_descriptions = _new_description_fragments(sorted_edges, already_description)
 
     # Combine already_description with sorted new descriptions
     description_list = already_description + sorted_descriptions
@@ -2076,6 +2401,7 @@ async def _merge_edges_then_upsert(
         GRAPH_FIELD_SEP,
         global_config,
         llm_response_cache,
+        summary_batcher,
     )
 
     # 9. Build file_path within MAX_FILE_PATHS limit
@@ -2218,12 +2544,13 @@ async def _merge_edges_then_upsert(
                         "file_path": file_path,
                     }
                 }
-                await safe_vdb_operation_with_exception(
-                    operation=lambda payload=vdb_data: entity_vdb.upsert(payload),
+                await _upsert_vdb_record(
+                    entity_vdb,
+                    vdb_data,
                     operation_name="added_entity_upsert",
                     entity_name=need_insert_id,
-                    max_retries=3,
                     retry_delay=0.1,
+                    vdb_buffer=vdb_buffer,
                 )
 
             # Track entities added during edge processing
@@ -2324,12 +2651,13 @@ async def _merge_edges_then_upsert(
                             ),
                         }
                     }
-                    await safe_vdb_operation_with_exception(
-                        operation=lambda payload=vdb_data: entity_vdb.upsert(payload),
+                    await _upsert_vdb_record(
+                        entity_vdb,
+                        vdb_data,
                         operation_name="existing_entity_update",
                         entity_name=need_insert_id,
-                        max_retries=3,
                         retry_delay=0.1,
+                        vdb_buffer=vdb_buffer,
                     )
 
             # 6. Log once at the end if any update occurred
@@ -2394,12 +2722,13 @@ async def _merge_edges_then_upsert(
                 "file_path": file_path,
             }
         }
-        await safe_vdb_operation_with_exception(
-            operation=lambda payload=vdb_data: relationships_vdb.upsert(payload),
+        await _upsert_vdb_record(
+            relationships_vdb,
+            vdb_data,
             operation_name="relationship_upsert",
             entity_name=f"{src_id}-{tgt_id}",
-            max_retries=3,
             retry_delay=0.2,
+            vdb_buffer=vdb_buffer,
         )
 
     return edge_data
@@ -2430,6 +2759,9 @@ async def merge_nodes_and_edges(
     2. Phase 2: Process all relationships concurrently (may add missing entities)
     3. Phase 3: Update full_entities and full_relations storage with final results
 
+    Entity and relation vectors are collected in a write-behind buffer and written
+    in full embedding batches at the end of phases 1 and 2 (or when the buffer fills).
+
     Args:
         chunk_results: List of tuples (maybe_nodes, maybe_edges) containing extracted entities and relationships
         knowledge_graph_inst: Knowledge graph storage
@@ -2482,6 +2814,35 @@ async def merge_nodes_and_edges(
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
 
+    # Coalesce per-record vector upserts; one flush fills every embedding worker with a full batch
+    vdb_buffer = VdbUpsertBuffer(
+        flush_size=global_config.get("embedding_batch_num", 10)
+        * global_config.get("embedding_func_max_async", 8)
+    )
+
+    # Share summary LLM calls between entities/relations that cross the fragment threshold
+    summary_batcher = None
+    if global_config.get("summary_batch_size", 1) > 1:
+        summary_batcher = _SummaryBatcher(
+            global_config,
+            llm_response_cache,
+            pipeline_status,
+            pipeline_status_lock,
+        )
+
+    async def _flush_vdb_buffer(raise_errors: bool = True):
+        try:
+            await vdb_buffer.flush()
+        except Exception as e:
+            error_msg = f"Error flushing buffered vector upserts: {e}"
+            logger.error(error_msg)
+            if pipeline_status is not None and pipeline_status_lock is not None:
+                async with pipeline_status_lock:
+                    pipeline_status["latest_message"] = error_msg
+                    pipeline_status["history_messages"].append(error_msg)
+            if raise_errors:
+                raise
+
     # ===== Phase 1: Process all entities concurrently =====
     log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
     logger.info(log_message)
@@ -2516,6 +2877,8 @@ async def merge_nodes_and_edges(
                         pipeline_status_lock,
                         llm_response_cache,
                         entity_chunks_storage,
+                        vdb_buffer,
+                        summary_batcher,
                     )
 
                     return entity_data
@@ -2581,8 +2944,13 @@ async def merge_nodes_and_edges(
                     processed_entities.append(result)
 
         if first_exception is not None:
+            # Keep vectors for the entities that did merge before surfacing the failure
+            await _flush_vdb_buffer(raise_errors=False)
             raise first_exception
 
+    # Phase boundary: relations may re-upsert these entities, so write them out first
+    await _flush_vdb_buffer()
+
     # ===== Phase 2: Process all relationships concurrently =====
     log_message = f"Phase 2: Processing {total_relations_count} relations from {doc_id} (async: {graph_max_async})"
     logger.info(log_message)
@@ -2627,6 +2995,8 @@ async def merge_nodes_and_edges(
                         added_entities,  # Pass list to collect added entities
                         relation_chunks_storage,
                         entity_chunks_storage,  # Add entity_chunks_storage parameter
+                        vdb_buffer,
+                        summary_batcher,
                     )
 
                     if edge_data is None:
@@ -2701,8 +3071,11 @@ async def merge_nodes_and_edges(
                     all_added_entities.extend(added_entities)
 
         if first_exception is not None:
+            await _flush_vdb_buffer(raise_errors=False)
             raise first_exception
 
+    await _flush_vdb_buffer()
+
     # ===== Phase 3: Update full_entities and full_relations storage =====
     if full_entities_storage and full_relations_storage and doc_id:
         try:
@@ -2769,12 +3142,121 @@ async def merge_nodes_and_edges(
             # Don't raise exception to avoid affecting main flow
 
     log_message = f"Completed merging: {len(processed_entities)} entities, {len(all_added_entities)} extra entities, {len(processed_edges)} relations"
+    if summary_batcher is not None and summary_batcher.llm_calls:
+        log_message += f", {summary_batcher.batched_summaries} batched summaries in {summary_batcher.llm_calls} LLM calls"
     logger.info(log_message)
     async with pipeline_status_lock:
         pipeline_status["latest_message"] = log_message
         pipeline_status["history_messages"].append(log_message)
 
 
+_HEADING_PATTERN = re.compile(r"^[ \t]*#{1,6}[ \t]*(.+?)[ \t#]*$", re.MULTILINE)
+
+
+def _normalize_entity_label(label: str) -> str:
+    return " ".join(label.strip().strip("\"'").lower().split())
+
+
+def _heading_covered(heading: str, entity_names: list[str]) -> bool:
+    """Whether an extracted entity names the heading: equal labels, or word sets
+    sharing more than half of their union, so a short name like "pc" does not cover
+    "halo - pc" while "super mario odyssey" covers "super mario odyssey - switch".
+    """
+    heading_tokens = set(re.findall(r"\w+", heading))
+    for name in entity_names:
+        if name == heading:
+            return True
+        name_tokens = set(re.findall(r"\w+", name))
+        union = heading_tokens | name_tokens
+        if union and len(heading_tokens & name_tokens) / len(union) > 0.5:
+            return True
+    return False
+
+
+def _chunk_headings(content: str) -> list[str]:
+    """Titles of the headings in a chunk ("### Item Title: X" -> "x").
+
+    Chunks are split on ``"\\n\\n###"``, which consumes the heading marker, so the first
+    line of a chunk is always taken as its heading.
+    """
+    lines = content.strip().splitlines()[:1]
+    lines += [m.group(1) for m in _HEADING_PATTERN.finditer(content)]
+    headings = []
+    for line in lines:
+        heading = line.strip("# \t")
+        label, sep, value = heading.partition(":")
+        # Drop short field labels such as "Item Title:" but keep titles containing a colon
+        if sep and value.strip() and len(label.split()) <= 3:
+            heading = value
+        heading = _normalize_entity_label(heading)
+        if heading and heading not in headings:
+            headings.append(heading)
+    return headings
+
+
+def _gleaning_needed(
+    result: str,
+    content: str,
+    chunk_tokens: int,
+    maybe_nodes: dict,
+    maybe_edges: dict,
+    completion_delimiter: str,
+    tokens_per_record: int = DEFAULT_GLEANING_TOKENS_PER_RECORD,
+) -> str | None:
+    """Cheap completeness check of a first extraction pass for adaptive gleaning.
+
+    Returns the reason the chunk still needs a gleaning pass, or None when the first
+    pass looks complete: the LLM emitted the completion delimiter, every heading of the
+    chunk was extracted as an entity, and the record count is in line with the chunk
+    length.
+    """
+    if completion_delimiter.lower() not in result.lower():
+        return "missing completion delimiter"
+
+    entity_names = [_normalize_entity_label(name) for name in maybe_nodes]
+    for heading in _chunk_headings(content):
+        if not _heading_covered(heading, entity_names):
+            return f"heading not extracted: {heading}"
+
+    expected_records = chunk_tokens // max(tokens_per_record, 1)
+    records = len(maybe_nodes) + len(maybe_edges)
+    if records < expected_records:
+        return f"{records} records for {chunk_tokens} tokens"
+    return None
+
+
+def _merge_structured_extraction(
+    maybe_nodes: dict,
+    maybe_edges: dict,
+    structured: StructuredExtraction,
+    chunk_key: str,
+) -> None:
+    """Add rule-based records to the LLM results of the same chunk.
+
+    Records found by both are kept side by side, so the item keeps its LLM description
+    next to the structured field summary.
+    """
+    for entity_name, entities in structured.nodes.items():
+        entity_name = _truncate_entity_identifier(
+            entity_name, DEFAULT_ENTITY_NAME_MAX_LENGTH, chunk_key, "Entity name"
+        )
+        for dp in entities:
+            dp["entity_name"] = entity_name
+        maybe_nodes.setdefault(entity_name, []).extend(entities)
+
+    for (src_id, tgt_id), edges in structured.edges.items():
+        src_id = _truncate_entity_identifier(
+            src_id, DEFAULT_ENTITY_NAME_MAX_LENGTH, chunk_key, "Relation entity"
+        )
+        tgt_id = _truncate_entity_identifier(
+            tgt_id, DEFAULT_ENTITY_NAME_MAX_LENGTH, chunk_key, "Relation entity"
+        )
+        for dp in edges:
+            dp["src_id"], dp["tgt_id"] = src_id, tgt_id
+        edge_key = (tgt_id, src_id) if (tgt_id, src_id) in maybe_edges else None
+        maybe_edges.setdefault(edge_key or (src_id, tgt_id), []).extend(edges)
+
+
 async def extract_entities(
     chunks: dict[str, TextChunkSchema],
     global_config: dict[str, str],
@@ -2782,7 +3264,13 @@ async def extract_entities(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     text_chunks_storage: BaseKVStorage | None = None,
+    gleaning_stats: dict[str, int] | None = None,
 ) -> list:
+    """Extract entities and relations from every chunk.
+
+    When ``gleaning_stats`` is given it is filled with per-call counters on how often
+    gleaning ran and how many entities/relations it added or improved.
+    """
     # Check for cancellation at the start of entity extraction
     if pipeline_status is not None and pipeline_status_lock is not None:
         async with pipeline_status_lock:
@@ -2792,7 +3280,25 @@ async def extract_entities(
                 )
 
     use_llm_func: callable = global_config["llm_model_func"]
+    structured_extractor = global_config.get("structured_extractor")
     entity_extract_max_gleaning = global_config["entity_extract_max_gleaning"]
+    adaptive_gleaning = (
+        global_config.get("entity_extract_gleaning_policy", "always") == "adaptive"
+    )
+    gleaning_tokens_per_record = global_config.get(
+        "gleaning_tokens_per_record", DEFAULT_GLEANING_TOKENS_PER_RECORD
+    )
+    if gleaning_stats is None:
+        gleaning_stats = {}
+    for stat in (
+        "chunks",
+        "gleaning_calls",
+        "gleaning_skipped",
+        "gleaned_entities",
+        "gleaned_relations",
+        "gleaned_updates",
+    ):
+        gleaning_stats.setdefault(stat, 0)
 
     ordered_chunks = list(chunks.items())
     # add language and example number params to prompt
@@ -2844,96 +3350,140 @@ async def extract_entities(
         # Create cache keys collector for batch processing
         cache_keys_collector = []
 
-        # Get initial extraction
-        entity_extraction_system_prompt = PROMPTS[
-            "entity_extraction_system_prompt"
-        ].format(**{**context_base, "input_text": content})
-        # entity_extraction_prompt = PROMPTS[
-        #     "entity_extraction_prompt"
-        # ].format(**{**context_base, "input_text": content})
-        entity_extraction_user_prompt = PROMPTS["entity_extraction_user_prompt"].format(
-            **{**context_base, "input_text": content}
-        )
-        entity_continue_extraction_user_prompt = PROMPTS[
-            "entity_continue_extraction_user_prompt"
-        ].format(**{**context_base, "input_text": content})
-
-        final_result, timestamp = await use_llm_func_with_cache(
-            entity_extraction_user_prompt,
-            use_llm_func,
-            system_prompt=entity_extraction_system_prompt,
-            llm_response_cache=llm_response_cache,
-            cache_type="extract",
-            chunk_id=chunk_key,
-            cache_keys_collector=cache_keys_collector,
-        )
-
-        history = pack_user_ass_to_openai_messages(
-            entity_extraction_user_prompt, final_result
-        )
-
-        # Process initial extraction with file path
-        maybe_nodes, maybe_edges = await _process_extraction_result(
-            final_result,
-            chunk_key,
-            timestamp,
-            file_path,
-            tuple_delimiter=context_base["tuple_delimiter"],
-            completion_delimiter=context_base["completion_delimiter"],
-        )
-        # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
-        if entity_extract_max_gleaning > 0:
-            glean_result, timestamp = await use_llm_func_with_cache(
-                entity_continue_extraction_user_prompt,
+        # Rule-based fast path: fields the structured extractor understands never reach the LLM
+        structured = None
+        if structured_extractor is not None:
+            structured = structured_extractor.extract(
+                chunk_key, content, file_path, int(time.time())
+            )
+            content = structured.free_text
+
+        maybe_nodes, maybe_edges = defaultdict(list), defaultdict(list)
+        if content:
+            # Get initial extraction
+            entity_extraction_system_prompt = PROMPTS[
+                "entity_extraction_system_prompt"
+            ].format(**{**context_base, "input_text": content})
+            # entity_extraction_prompt = PROMPTS[
+            #     "entity_extraction_prompt"
+            # ].format(**{**context_base, "input_text": content})
+            entity_extraction_user_prompt = PROMPTS[
+                "entity_extraction_user_prompt"
+            ].format(**{**context_base, "input_text": content})
+            entity_continue_extraction_user_prompt = PROMPTS[
+                "entity_continue_extraction_user_prompt"
+            ].format(**{**context_base, "input_text": content})
+
+            final_result, timestamp = await use_llm_func_with_cache(
+                entity_extraction_user_prompt,
                 use_llm_func,
                 system_prompt=entity_extraction_system_prompt,
                 llm_response_cache=llm_response_cache,
-                history_messages=history,
                 cache_type="extract",
                 chunk_id=chunk_key,
                 cache_keys_collector=cache_keys_collector,
             )
 
-            # Process gleaning result separately with file path
-            glean_nodes, glean_edges = await _process_extraction_result(
-                glean_result,
+            history = pack_user_ass_to_openai_messages(
+                entity_extraction_user_prompt, final_result
+            )
+
+            # Process initial extraction with file path
+            maybe_nodes, maybe_edges = await _process_extraction_result(
+                final_result,
                 chunk_key,
                 timestamp,
                 file_path,
                 tuple_delimiter=context_base["tuple_delimiter"],
                 completion_delimiter=context_base["completion_delimiter"],
             )
+            gleaning_stats["chunks"] += 1
+            # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
+            run_gleaning = entity_extract_max_gleaning > 0
+            if run_gleaning and adaptive_gleaning:
+                reason = _gleaning_needed(
+                    final_result,
+                    content,
+                    # Tokens of the part sent to the LLM
+                    chunk_dp.get("tokens", 0)
+                    * len(content)
+                    // max(len(chunk_dp["content"]), 1),
+                    maybe_nodes,
+                    maybe_edges,
+                    context_base["completion_delimiter"],
+                    gleaning_tokens_per_record,
+                )
+                if reason is None:
+                    run_gleaning = False
+                    gleaning_stats["gleaning_skipped"] += 1
+                else:
+                    logger.debug(f"{chunk_key}: gleaning ({reason})")
+            if run_gleaning:
+                gleaning_stats["gleaning_calls"] += 1
+                glean_result, timestamp = await use_llm_func_with_cache(
+                    entity_continue_extraction_user_prompt,
+                    use_llm_func,
+                    system_prompt=entity_extraction_system_prompt,
+                    llm_response_cache=llm_response_cache,
+                    history_messages=history,
+                    cache_type="extract",
+                    chunk_id=chunk_key,
+                    cache_keys_collector=cache_keys_collector,
+                )
 
-            # Merge results - compare description lengths to choose better version
-            for entity_name, glean_entities in glean_nodes.items():
-                if entity_name in maybe_nodes:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_nodes[entity_name][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_entities[0].get("description", "") or "")
+                # Process gleaning result separately with file path
+                glean_nodes, glean_edges = await _process_extraction_result(
+                    glean_result,
+                    chunk_key,
+                    timestamp,
+                    file_path,
+                    tuple_delimiter=context_base["tuple_delimiter"],
+                    completion_delimiter=context_base["completion_delimiter"],
+                )
+
+                # Merge results - compare description lengths to choose better version
+                for entity_name, glean_entities in glean_nodes.items():
+                    if entity_name in maybe_nodes:
+                        # Compare description lengths and keep the better one
+                        original_desc_len = len(
+                            maybe_nodes[entity_name][0].get("description", "") or ""
+                        )
+                        glean_desc_len = len(
+                            glean_entities[0].get("description", "") or ""
+                        )
 
-                    if glean_desc_len > original_desc_len:
+                        if glean_desc_len > original_desc_len:
+                            maybe_nodes[entity_name] = list(glean_entities)
+                            gleaning_stats["gleaned_updates"] += 1
+                        # Otherwise keep original version
+                    else:
+                        # New entity from gleaning stage
                         maybe_nodes[entity_name] = list(glean_entities)
-                    # Otherwise keep original version
-                else:
-                    # New entity from gleaning stage
-                    maybe_nodes[entity_name] = list(glean_entities)
-
-            for edge_key, glean_edges in glean_edges.items():
-                if edge_key in maybe_edges:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_edges[edge_key][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_edges[0].get("description", "") or "")
+                        gleaning_stats["gleaned_entities"] += 1
 
-                    if glean_desc_len > original_desc_len:
+                for edge_key, glean_edges in glean_edges.items():
+                    if edge_key in maybe_edges:
+                        # Compare description lengths and keep the better one
+                        original_desc_len = len(
+                            maybe_edges[edge_key][0].get("description", "") or ""
+                        )
+                        glean_desc_len = len(
+                            glean_edges[0].get("description", "") or ""
+                        )
+
+                        if glean_desc_len > original_desc_len:
+                            maybe_edges[edge_key] = list(glean_edges)
+                            gleaning_stats["gleaned_updates"] += 1
+                        # Otherwise keep original version
+                    else:
+                        # New edge from gleaning stage
                         maybe_edges[edge_key] = list(glean_edges)
-                    # Otherwise keep original version
-                else:
-                    # New edge from gleaning stage
-                    maybe_edges[edge_key] = list(glean_edges)
+                        gleaning_stats["gleaned_relations"] += 1
+
+        if structured is not None:
+            _merge_structured_extraction(
+                maybe_nodes, maybe_edges, structured, chunk_key
+            )
 
         # Batch update chunk's llm_cache_list with all collected cache keys
         if cache_keys_collector and text_chunks_storage:
@@ -2948,6 +3498,8 @@ async def extract_entities(
         entities_count = len(maybe_nodes)
         relations_count = len(maybe_edges)
         log_message = f"Chunk {processed_chunks} of {total_chunks} extracted {entities_count} Ent + {relations_count} Rel {chunk_key}"
+        if not content:
+            log_message += " (rule-based)"
         logger.info(log_message)
         if pipeline_status is not None:
             async with pipeline_status_lock:
@@ -3101,6 +3653,16 @@ async def kg_query(
 
     ###
     if query_param.mode in ["coldrag"]:
+        if query_param.model_func:
+            reasoning_func = query_param.model_func
+        else:
+            # Edge scoring shares the LLM queue: below the final ranking (5), and
+            # served round-robin across concurrent queries
+            reasoning_func = partial(
+                global_config["llm_model_func"],
+                _priority=6,
+                _fair_key=compute_mdhash_id(query, prefix="query-"),
+            )
         # Build context
         candidate_items, context_result = await _build_query_context(
             query,
@@ -3112,16 +3674,19 @@ async def kg_query(
             text_chunks_db,
             query_param,
             chunks_vdb,
+            llm_func=reasoning_func,
+            hashing_kv=hashing_kv,
         )
         context = context_result.context
         raw_data = context_result.raw_data
 
-        insertion = f"Now there are {len(candidate_items)} candidate products that I can consider purchasing next:\n{candidate_items}\n\n"
-
         split_marker = "Please carefully recommend"
         if split_marker not in query:
             raise ValueError("Query format unexpected: split marker not found.")
         before, after = query.split(split_marker, 1)
+        insertion = PROMPTS["coldrag_ranking_candidates"].format(
+            num_candidates=len(candidate_items), candidates=candidate_items
+        )
         query = before + insertion + split_marker + after
     else:
         # Build query context (unified interface)
@@ -3161,6 +3726,10 @@ async def kg_query(
         user_prompt=user_prompt,
         context_data=context_result.context,
     )
+    if query_param.mode == "coldrag":
+        # Query-independent ranking instructions lead, so every ranking call shares a
+        # cacheable prefix; the retrieved context and the query follow
+        sys_prompt = PROMPTS["coldrag_ranking_system"] + sys_prompt
     user_query = query
 
     if query_param.only_need_prompt:
@@ -3302,6 +3871,7 @@ async def extract_keywords_only(
     This method does NOT build the final RAG context or provide a final answer.
     It ONLY extracts keywords (hl_keywords, ll_keywords).
     """
+    import json_repair
 
     # 1. Handle cache if needed - add cache type for keywords
     args_hash = compute_args_hash(
@@ -3467,10 +4037,13 @@ async def _perform_kg_search(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    llm_func=None,
+    hashing_kv: BaseKVStorage | None = None,
 ) -> dict[str, Any]:
     """
     Pure search logic that retrieves raw entities, relations, and vector chunks.
     No token truncation or formatting - just raw search results.
+    `llm_func` / `hashing_kv` are used by the coldrag reasoning.
     """
 
     # Initialize result containers
@@ -3498,7 +4071,12 @@ async def _perform_kg_search(
         if embedding_func_config and (callable(embedding_func_config) or hasattr(embedding_func_config, "func")): ###
             try:
                 # query_embedding = await embedding_func_config.func([query]) ###
-                if callable(embedding_func_config):
+                derived_cache = getattr(hashing_kv, "derived_cache", None)
+                if derived_cache is not None and callable(embedding_func_config):
+                    query_embedding = await cached_embeddings(
+                        derived_cache, embedding_func_config, [query]
+                    )
+                elif callable(embedding_func_config):
                     query_embedding = await embedding_func_config([query])
                 elif hasattr(embedding_func_config, "func"):
                     query_embedding = await embedding_func_config.func([query])
@@ -3529,7 +4107,15 @@ async def _perform_kg_search(
         )
 
     elif query_param.mode == "coldrag":
-        candidate_items_scored = await coldrag_llm_reasoning(ll_keywords, knowledge_graph_inst, entities_vdb, text_chunks_db, query_param)
+        candidate_items_scored = await coldrag_llm_reasoning(
+            ll_keywords,
+            knowledge_graph_inst,
+            entities_vdb,
+            text_chunks_db,
+            query_param,
+            llm_func=llm_func,
+            hashing_kv=hashing_kv,
+        )
 
         # Step 1: Retrieve metadata and enrich with score
         candidate_entity_names = [n["entity_name"] for n in candidate_items_scored]
@@ -3537,14 +4123,29 @@ async def _perform_kg_search(
         node_degrees = await asyncio.gather(*[knowledge_graph_inst.node_degree(n) for n in candidate_entity_names])
    
         score_lookup = {n["entity_name"]: n["score"] for n in candidate_items_scored}
+        index_weight_lookup = {
+            n["entity_name"]: n["index_weight"]
+            for n in candidate_items_scored
+            if "index_weight" in n
+        }
         node_datas = [
-            {**n, "entity_name": name, "rank": deg, "score": score_lookup.get(name, 0)}
+            {
+                **n,
+                "entity_name": name,
+                "rank": deg,
+                "score": score_lookup.get(name, 0),
+                "index_weight": index_weight_lookup.get(name, 0.0),
+            }
             for name, n, deg in zip(candidate_entity_names, raw_node_data, node_degrees)
             if n is not None
         ]
 
         # Step 2: Sort by score 
-        top_items = sorted(node_datas, key=lambda x: x["score"], reverse=True)[:100]
+        top_items = sorted(
+            node_datas,
+            key=lambda x: (x["score"], x.get("index_weight", 0.0)),
+            reverse=True,
+        )[:100]
         # top_items = sorted(node_datas, key=lambda x: x["score"], reverse=True)
         top_item_names = [item['entity_name'] for item in top_items]
 
@@ -4228,6 +4829,8 @@ async def _build_query_context(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    llm_func=None,
+    hashing_kv: BaseKVStorage | None = None,
 ) -> QueryContextResult | None:
     """
     Main query context building function using the new 4-stage architecture:
@@ -4251,6 +4854,8 @@ async def _build_query_context(
         text_chunks_db,
         query_param,
         chunks_vdb,
+        llm_func=llm_func,
+        hashing_kv=hashing_kv,
     )
     
     if not search_result["final_entities"] and not search_result["final_relations"]:
@@ -4344,19 +4949,384 @@ async def _build_query_context(
         return QueryContextResult(context=context, raw_data=raw_data)
 
 ###
+async def _resolve_coldrag_titles(
+    titles: list[str],
+    knowledge_graph_inst: BaseGraphStorage,
+    entities_vdb: BaseVectorStorage,
+    derived_cache: DerivedCache | None = None,
+) -> list[str]:
+    """Map item titles to entity names in the graph.
+
+    Titles that exist verbatim (or with surrounding quotes stripped) are resolved with one
+    batch lookup; the rest fall back to a top-1 entity vector search, with their
+    embeddings taken from ``derived_cache`` when given.
+    """
+    cleaned = [t.strip().strip('"') for t in titles if t and t.strip().strip('"')]
+    if not cleaned:
+        return []
+
+    found = await knowledge_graph_inst.get_nodes_batch(cleaned)
+    resolved = [t for t in cleaned if t in found]
+    missing = [t for t in cleaned if t not in found]
+
+    if missing:
+        embeddings = await cached_embeddings(
+            derived_cache, entities_vdb.embedding_func, missing
+        )
+        results = await asyncio.gather(
+            *[
+                entities_vdb.query(t, top_k=1, query_embedding=embedding)
+                for t, embedding in zip(missing, embeddings)
+            ]
+        )
+        for partial_result in results:
+            resolved.extend(r["entity_name"] for r in partial_result)
+
+    return list(dict.fromkeys(resolved))
+
+
+async def _coldrag_candidate_distances(
+    knowledge_graph_inst: BaseGraphStorage,
+    seed_nodes: list[str],
+    candidate_nodes: list[str],
+    max_hops: int,
+) -> tuple[dict[str, int], set[str]]:
+    """Bidirectional bounded search between history seeds and candidate items.
+
+    The forward ball (around the seeds) and the backward ball (around the candidates) are
+    grown alternately, always expanding the smaller frontier, until their radii add up to
+    ``max_hops``. Every seed→candidate path of length <= ``max_hops`` lies inside the union
+    of the two balls, so the adjacency fetched while growing them is enough to compute:
+
+    - the distance from each node on such a path to its nearest candidate, and
+    - the set of candidates that are actually reachable from the seeds.
+
+    Returns:
+        tuple: (node -> hops to the nearest candidate, reachable candidate names)
+    """
+    adjacency: dict[str, set[str]] = defaultdict(set)
+    dist_f = {n: 0 for n in seed_nodes}
+    dist_b = {n: 0 for n in candidate_nodes}
+    frontier_f, frontier_b = list(dist_f), list(dist_b)
+    depth_f = depth_b = 0
+
+    async def expand(frontier: list[str], dist: dict[str, int], depth: int) -> list[str]:
+        edges_by_node = await knowledge_graph_inst.get_nodes_edges_batch(frontier)
+        next_frontier = []
+        for node in frontier:
+            for src, tgt in edges_by_node.get(node) or []:
+                neighbor = tgt if src == node else src
+                adjacency[node].add(neighbor)
+                adjacency[neighbor].add(node)
+                if neighbor not in dist:
+                    dist[neighbor] = depth + 1
+                    next_frontier.append(neighbor)
+        return next_frontier
+
+    while depth_f + depth_b < max_hops and frontier_f and frontier_b:
+        if len(frontier_f) <= len(frontier_b):
+            frontier_f = await expand(frontier_f, dist_f, depth_f)
+            depth_f += 1
+        else:
+            frontier_b = await expand(frontier_b, dist_b, depth_b)
+            depth_b += 1
+
+    # Distance to the nearest candidate over the cached subgraph (unit-weight BFS
+    # seeded with the backward-ball distances)
+    dist_to_candidate = dict(dist_b)
+    buckets: dict[int, list[str]] = defaultdict(list)
+    for node, d in dist_b.items():
+        buckets[d].append(node)
+    for d in range(max_hops + 1):
+        for node in buckets.get(d, []):
+            if dist_to_candidate[node] != d or d == max_hops:
+                continue
+            for neighbor in adjacency.get(node, ()):
+                if d + 1 < dist_to_candidate.get(neighbor, max_hops + 1):
+                    dist_to_candidate[neighbor] = d + 1
+                    buckets[d + 1].append(neighbor)
+
+    # Forward sweep restricted to nodes that still fit in the hop budget
+    candidate_set = set(candidate_nodes)
+    reachable: set[str] = set()
+    seen = {n for n in seed_nodes if n in dist_to_candidate}
+    frontier = list(seen)
+    for step in range(max_hops + 1):
+        next_frontier = []
+        for node in frontier:
+            if node in candidate_set:
+                reachable.add(node)
+            for neighbor in adjacency.get(node, ()):
+                if (
+                    neighbor not in seen
+                    and step + 1 + dist_to_candidate.get(neighbor, max_hops + 1)
+                    <= max_hops
+                ):
+                    seen.add(neighbor)
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    return dist_to_candidate, reachable
+
+
+async def _coldrag_pipelined_expansion(
+    knowledge_graph_inst: BaseGraphStorage,
+    seed_nodes: list[dict],
+    visited_nodes: set[str],
+    candidate_items: dict[str, dict],
+    score_edge_batch: Callable[[list], Awaitable[list[tuple[str, str, float]]]],
+    edge_context: Callable[[str, str, dict], str],
+    sanitize_entity_name: Callable[[str], str],
+    is_target_item: Callable[[str, dict], bool],
+    leads_to_candidate: Callable[[str, str, int], bool] | None,
+    hop_budget: int,
+    batch_size: int,
+    max_item_nodes: int | None,
+    max_inflight_batches: int,
+    all_hops_data: list[dict],
+) -> None:
+    """Pipelined variant of the coldrag hop loop without a per-hop barrier.
+
+    Pending frontier edges live in one global priority queue ordered by hop depth and
+    then by the score of the edge that reached the expanding node. Up to
+    ``max_inflight_batches`` scoring batches run concurrently; every finished batch
+    immediately expands its newly reached nodes and enqueues their edges.
+
+    Node depths are label-corrected: if a node is later reached through a shorter
+    selected path, it is re-expanded at the shallower depth and already scored edges
+    are re-applied instead of re-scored. Each edge is scored once, so with unlimited
+    budgets the collected items and scores closely follow the hop-synchronous loop;
+    they can differ slightly because selections the LLM returns for edges outside a
+    batch are applied at the batch's minimum depth.
+
+    ``visited_nodes`` and ``candidate_items`` are updated in place.
+    """
+    depth: dict[str, int] = {}
+    edge_depth: dict[tuple[str, str], int] = {}
+    edge_priority: dict[tuple[str, str], float] = {}
+    edge_contexts: dict[tuple[str, str], str] = {}
+    dispatched: set[tuple[str, str]] = set()
+    edge_results: dict[tuple[str, str], list[tuple[str, str, float]]] = {}
+    # Node data and degree of neighbors returned by frontier expansions
+    neighbor_data: dict[str, tuple[dict, int]] = {}
+    queue: list[tuple[int, float, int, tuple[str, str]]] = []
+    inflight: dict[asyncio.Task, list[tuple[str, str]]] = {}
+    seq = 0
+    batches_done = 0
+
+    def budget_reached() -> bool:
+        return max_item_nodes is not None and len(candidate_items) >= max_item_nodes
+
+    async def expand(names: list[str], priority: dict[str, float]) -> None:
+        nonlocal seq
+        names = [n for n in names if depth[n] < hop_budget]
+        if not names:
+            return
+        expansion = await knowledge_graph_inst.expand_frontier(
+            names,
+            exclude=set(depth) | set(neighbor_data),
+            edge_fields=["description", "keywords"],
+        )
+        for neighbor, node in expansion.nodes.items():
+            neighbor_data[neighbor] = (node, expansion.degrees.get(neighbor, 0))
+        edges_by_node: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        for e in expansion.edges:
+            edges_by_node[e[0]].append(e)
+        for name in names:
+            d = depth[name]
+            for e in edges_by_node.get(name, ()):
+                key = tuple(sorted(e))
+                if leads_to_candidate is not None and not leads_to_candidate(
+                    key[0], key[1], hop_budget - d - 1
+                ):
+                    continue
+                if key in edge_results:
+                    # Already scored: re-apply the selection at the (shallower) depth
+                    if d < edge_depth[key]:
+                        edge_depth[key] = d
+                        await apply_selection(edge_results[key], d)
+                    continue
+                if key in edge_depth and edge_depth[key] <= d:
+                    continue
+                if key not in edge_contexts:
+                    edge_contexts[key] = edge_context(
+                        key[0], key[1], expansion.edges[e]
+                    )
+                edge_depth[key] = d
+                edge_priority[key] = priority.get(name, 0.0)
+                seq += 1
+                heapq.heappush(queue, (d, -edge_priority[key], seq, key))
+
+    async def apply_selection(selected: list[tuple[str, str, float]], d: int) -> None:
+        reached: dict[str, float] = {}
+        for src, tgt, score in selected:
+            for n in (src, tgt):
+                name = sanitize_entity_name(n)
+                if name in depth:
+                    if depth[name] > d + 1:
+                        reached[name] = max(reached.get(name, 0.0), score)
+                elif n not in visited_nodes or name in reached:
+                    reached[name] = max(reached.get(name, 0.0), score)
+                visited_nodes.add(n)
+
+        if reached:
+            names = list(reached)
+            missing = [n for n in names if n not in neighbor_data]
+            if missing:
+                nodes, degrees = await asyncio.gather(
+                    knowledge_graph_inst.get_nodes_batch(missing),
+                    knowledge_graph_inst.node_degrees_batch(missing),
+                )
+                for name in missing:
+                    if nodes.get(name) is not None:
+                        neighbor_data[name] = (nodes[name], degrees.get(name, 0))
+            to_expand = []
+            for name in names:
+                if name not in neighbor_data:
+                    continue
+                node, degree = neighbor_data[name]
+                depth[name] = d + 1
+                to_expand.append(name)
+                if is_target_item(name, node) and name not in candidate_items:
+                    candidate_items[name] = {
+                        **node,
+                        "entity_name": name,
+                        "rank": degree,
+                        "score": 0.0,
+                    }
+            await expand(to_expand, reached)
+
+        for src, tgt, score in selected:
+            for n in (src, tgt):
+                name = sanitize_entity_name(n)
+                if name in candidate_items:
+                    candidate_items[name]["score"] = max(
+                        candidate_items[name].get("score", 0.0), score
+                    )
+
+    for n in seed_nodes:
+        depth[n["entity_name"]] = 0
+    await expand(
+        [n["entity_name"] for n in seed_nodes],
+        {n["entity_name"]: 10.0 for n in seed_nodes},
+    )
+
+    try:
+        while queue or inflight:
+            while queue and len(inflight) < max_inflight_batches and not budget_reached():
+                batch: list[tuple[str, str]] = []
+                while queue and len(batch) < batch_size:
+                    d, _, _, key = heapq.heappop(queue)
+                    if key in dispatched or d != edge_depth.get(key):
+                        continue  # stale entry superseded by a shallower one
+                    dispatched.add(key)
+                    batch.append(key)
+                if not batch:
+                    break
+                task = asyncio.create_task(
+                    score_edge_batch([(key, edge_contexts[key]) for key in batch])
+                )
+                inflight[task] = batch
+
+            if not inflight:
+                break
+
+            done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                batch = inflight.pop(task)
+                selected = task.result()
+                batches_done += 1
+
+                # Attribute LLM-selected edges back to the batch edges they refer to
+                by_key: dict[tuple[str, str], list[tuple[str, str, float]]] = defaultdict(list)
+                unmatched = []
+                batch_keys = set(batch)
+                for src, tgt, score in selected:
+                    key = tuple(sorted((sanitize_entity_name(src), sanitize_entity_name(tgt))))
+                    if key in batch_keys:
+                        by_key[key].append((src, tgt, score))
+                    else:
+                        unmatched.append((src, tgt, score))
+                for key in batch:
+                    edge_results[key] = by_key.get(key, [])
+                    if edge_results[key]:
+                        await apply_selection(edge_results[key], edge_depth[key])
+                if unmatched:
+                    await apply_selection(unmatched, min(edge_depth[k] for k in batch))
+
+                all_hops_data.append(
+                    {
+                        "batch_number": batches_done,
+                        "inflight_batches": len(inflight),
+                        "queued_edges": len(queue),
+                        "visited_nodes_count": len(visited_nodes),
+                        "candidate_items_count": len(candidate_items),
+                    }
+                )
+
+            if budget_reached() and not inflight:
+                logger.info("Stopping: reached max item nodes.")
+                break
+    finally:
+        # A failed batch or expansion must not leave scoring tasks running unowned
+        for task in inflight:
+            task.cancel()
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+
+    logger.info(
+        f"Pipelined reasoning finished: {batches_done} batches, {len(edge_results)} edges scored, "
+        f"{len(candidate_items)} ITEM nodes"
+    )
+
+
 async def coldrag_llm_reasoning(
     query: str,
     knowledge_graph_inst: BaseGraphStorage,
     entities_vdb: BaseVectorStorage,
     text_chunks_db: BaseKVStorage[TextChunkSchema],
     query_param: QueryParam,
-    llm_func=vllm_qwen_complete,
+    llm_func=None,
     max_item_nodes: int = 300, # 500
     max_hops: int = 5, # 5
     llm_threshold: float = 6.0, # 7.0
     batch_size: int = 10,
+    hashing_kv: BaseKVStorage | None = None,
 ):
-    """LLM-guided multi-hop reasoning to gather relevant ITEM nodes."""
+    """LLM-guided multi-hop reasoning to gather relevant ITEM nodes.
+
+    kg_query passes the priority-scheduled LLM function; edge-scoring responses are
+    cached in ``hashing_kv`` (cache type "reasoning") when the LLM cache is enabled.
+    With a derived cache on ``hashing_kv`` the title embeddings and the final result
+    (for the current graph, entity index and item index versions) are shared between
+    workers.
+    """
+    if llm_func is None:
+        # Resolved here so importing coldrag does not pull in the vLLM client
+        from vllm_preset import vllm_qwen_complete as llm_func
+
+    derived_cache = getattr(hashing_kv, "derived_cache", None)
+    result_key = None
+    if derived_cache is not None and hashing_kv.global_config.get("enable_llm_cache"):
+        result_key = compute_args_hash(
+            query,
+            query_param.candidate_items,
+            query_param.use_item_index,
+            query_param.item_index_seed_ratio,
+            query_param.pipelined_reasoning,
+            query_param.max_inflight_batches,
+            max_item_nodes,
+            max_hops,
+            llm_threshold,
+            batch_size,
+        )
+        cached_result = await derived_cache.get("coldrag", result_key)
+        if cached_result is not None:
+            logger.info("Reusing cached coldrag reasoning result")
+            return cached_result
+
     logger.info("Starting LLM-guided reasoning from initial query.")
     
     ###
@@ -4375,12 +5345,17 @@ async def coldrag_llm_reasoning(
 
     # results = await entities_vdb.query(query, top_k=query_param.top_k)
     # get titles in ll keywords
-    user_titles = query.split(",")  # Assuming titles are comma-separated
+    user_titles = [title.strip() for title in query.split(",")]  # Assuming titles are comma-separated
 
     # get top-k entities using titles
+    title_embeddings = await cached_embeddings(
+        derived_cache, entities_vdb.embedding_func, user_titles
+    )
     all_results = []
-    for title in user_titles:
-        partial = await entities_vdb.query(title.strip(), top_k=1)
+    for title, title_embedding in zip(user_titles, title_embeddings):
+        partial = await entities_vdb.query(
+            title, top_k=1, query_embedding=title_embedding
+        )
         all_results.extend(partial)
 
     # deduplicate
@@ -4400,150 +5375,291 @@ async def coldrag_llm_reasoning(
     ]
     
     visited_nodes = set([n["entity_name"] for n in node_datas])
-    candidate_items = {n["entity_name"]: {**n, "score": 10.0} for n in node_datas if n.get("entity_type") == 'item'}
+
+    # Optional candidate restriction: only expand towards nodes that can still reach a candidate
+    candidate_set = None
+    dist_to_candidate: dict[str, int] = {}
+    if query_param.candidate_items:
+        candidate_nodes = await _resolve_coldrag_titles(
+            query_param.candidate_items,
+            knowledge_graph_inst,
+            entities_vdb,
+            derived_cache=derived_cache,
+        )
+        candidate_set = set(candidate_nodes)
+        dist_to_candidate, reachable = await _coldrag_candidate_distances(
+            knowledge_graph_inst, list(visited_nodes), candidate_nodes, max_hops
+        )
+        logger.info(
+            f"Candidate restriction: {len(candidate_set)}/{len(query_param.candidate_items)} candidates resolved, "
+            f"{len(reachable)} reachable within {max_hops} hops, {len(dist_to_candidate)} nodes on candidate paths"
+        )
+
+    def is_target_item(name: str, node: dict) -> bool:
+        if node.get("entity_type") != "item":
+            return False
+        return candidate_set is None or name in candidate_set
+
+    def leads_to_candidate(src: str, tgt: str, remaining_hops: int) -> bool:
+        # Only the endpoint the edge reaches counts; the expanding endpoint is visited
+        for n in (src, tgt):
+            if n in visited_nodes:
+                continue
+            if n in candidate_set or dist_to_candidate.get(n, max_hops + 1) <= remaining_hops:
+                return True
+        return False
+
+    candidate_items = {n["entity_name"]: {**n, "score": 10.0} for n in node_datas if is_target_item(n["entity_name"], n)}
     current_nodes = node_datas.copy()
+
+    # Seed candidate items and the frontier from the precomputed item neighbourhood index
+    hop_budget = max_hops
+    seed_edges: list[tuple[str, str]] = []
+    if query_param.use_item_index:
+        from coldrag.item_index import get_item_index_path, load_item_index
+
+        global_config = text_chunks_db.global_config
+        item_index = load_item_index(
+            get_item_index_path(global_config["working_dir"], global_config.get("workspace"))
+        )
+        if item_index is None:
+            logger.warning("use_item_index is set but no item neighbourhood index was found; expanding hop by hop")
+        else:
+            # Part of the budget stays free so the remaining hops still reach the LLM
+            seed_limit = max(1, int(max_item_nodes * query_param.item_index_seed_ratio))
+            neighbors = item_index.gather(
+                list(visited_nodes), top_n=None if candidate_set is not None else seed_limit
+            )
+            if candidate_set is not None:
+                neighbors = [nb for nb in neighbors if nb["entity_name"] in candidate_set]
+            neighbors = neighbors[:seed_limit]
+            neighbor_names = [nb["entity_name"] for nb in neighbors]
+            neighbor_nodes, neighbor_degrees = await asyncio.gather(
+                knowledge_graph_inst.get_nodes_batch(neighbor_names),
+                knowledge_graph_inst.node_degrees_batch(neighbor_names),
+            )
+            for nb in neighbors:
+                name = nb["entity_name"]
+                node = neighbor_nodes.get(name)
+                if node is None:
+                    continue
+                node_data = {**node, "entity_name": name, "rank": neighbor_degrees.get(name, 0)}
+                current_nodes.append(node_data)
+                visited_nodes.add(name)
+                # Paths through the connecting attributes are already covered by the index
+                visited_nodes.update(nb["via"])
+                if name not in candidate_items:
+                    candidate_items[name] = {**node_data, "score": 0.0, "index_weight": nb["weight"]}
+                    seed_edges.extend((attr, name) for attr in nb["via"])
+            hop_budget = max(1, max_hops - item_index.max_hops)
+            logger.info(
+                f"Item index seeded {len(neighbors)} ITEM nodes; {hop_budget} reasoning hops remain"
+            )
     
     def chunk_list(input_list, chunk_size):
         for i in range(0, len(input_list), chunk_size):
             yield input_list[i:i + chunk_size]
     
-    for hop in range(max_hops):
-        logger.info(f"Hop {hop+1}/{max_hops} — current candidate ITEM nodes: {len(candidate_items)}")
-        print(f"Hop {hop+1}/{max_hops} — current candidate ITEM nodes: {len(candidate_items)}")
-
-        hop_data = {
-            "hop_number": hop,
-            "visited_nodes_count": len(visited_nodes),
-            "candidate_items_count": len(candidate_items),
-            "visited_nodes": list(visited_nodes),
-            "candidate_items": list(candidate_items.keys()),
-        }
-        
-        all_hops_data.append(hop_data)
-        # --- END MODIFICATION ---
+    def sanitize_entity_name(name):
+        return name.strip().strip('"')  # Just remove leading/trailing quotes
 
-        if len(candidate_items) >= max_item_nodes:
-            logger.info("Stopping: reached max item nodes.")
-            break
-        
-        # get current_nodes' edges
-        edges = await asyncio.gather(*[knowledge_graph_inst.get_node_edges(n["entity_name"]) for n in current_nodes])
-        all_edges = [e for edge_list in edges if edge_list for e in edge_list]
-        all_edges = list({tuple(sorted(e)) for e in all_edges})
-        # get current_nodes' edges' information
-        edge_details = await asyncio.gather(*[knowledge_graph_inst.get_edge(e[0], e[1]) for e in all_edges])
-        edge_map = {}
-        edge_contexts = []
-        for (src, tgt), meta in zip(all_edges, edge_details):
-            if not meta:
-                continue
-            context = f"Edge from {src} to {tgt}: {meta.get('description', '')}\nKeywords: {meta.get('keywords', '')}"
-            edge_contexts.append(((src, tgt), context))
-            edge_map[(src, tgt)] = meta
+    def edge_context(src, tgt, meta):
+        return f"Edge from {src} to {tgt}: {meta.get('description', '')}\nKeywords: {meta.get('keywords', '')}"
 
-        if not edge_contexts:
-            break
+    async def score_edge_batch(edge_batch):
+        batch_edges, batch_contexts = zip(*edge_batch)
 
-        async def score_edge_batch(edge_batch):
-            batch_edges, batch_contexts = zip(*edge_batch)
-
-            prompt = (
-                f"You are helping with multi-hop reasoning over a knowledge graph.\n"
-                f"The following is the user's past interaction history (items they engaged with):\n\"{query}\"\n\n"
-                f"Below are edges from the current reasoning frontier, each connecting two entities.\n"
-                f"For each edge, assess how strongly it relates to the user's past interests.\n"
-                f"Score each edge from 0 (completely irrelevant) to 10 (highly relevant) **based on semantic similarity to the user's interaction history**.\n"
-                f"Only consider the user's past interactions for scoring.\n\n"
-                f"Format your output exactly as:\n1. (src -> tgt): score\n2. (src -> tgt): score\n...\n\n"
-                f"Here are the edges:\n{chr(10).join([f'{i+1}. {ctx}' for i, ctx in enumerate(batch_contexts)])}"
+        # Instructions + history form a prefix shared by every batch of this user
+        prompt = render_prompt_layout(
+            "coldrag_edge_scoring",
+            history=query,
+            edges="\n".join(f"{i+1}. {ctx}" for i, ctx in enumerate(batch_contexts)),
+        )
+        
+        try:
+            args_hash = compute_args_hash(prompt)
+            cached_result = await handle_cache(
+                hashing_kv, args_hash, prompt, query_param.mode, cache_type="reasoning"
             )
-            
-            try:
-                max_retry_llm_response = 3
-                for attempt in range(max_retry_llm_response):
-                    import asyncio
-
-                    # Safe async-compatible LLM call
-                    if asyncio.iscoroutinefunction(llm_func):
-                        llm_response = await llm_func(prompt)
-                    else:
-                        # run sync llm_func safely in a thread executor
-                        loop = asyncio.get_running_loop()
-                        llm_response = await loop.run_in_executor(None, lambda: llm_func(prompt))
-                    
-                    if llm_response and isinstance(llm_response, str) and llm_response.strip():
-                        break
-                    logger.warning(f"Empty or None LLM response on attempt {attempt + 1}/{max_retry_llm_response}")
-                    await asyncio.sleep(2)
+            max_retry_llm_response = 3
+            for attempt in range(max_retry_llm_response):
+                if cached_result is not None:
+                    llm_response, _ = cached_result
+                    break
+
+                # Safe async-compatible LLM call
+                if asyncio.iscoroutinefunction(llm_func):
+                    llm_response = await llm_func(prompt)
                 else:
-                    raise ValueError("LLM function returned None or empty response after 3 attempts.")
+                    # run sync llm_func safely in a thread executor
+                    loop = asyncio.get_running_loop()
+                    llm_response = await loop.run_in_executor(None, lambda: llm_func(prompt))
+                
+                if llm_response and isinstance(llm_response, str) and llm_response.strip():
+                    if hashing_kv and hashing_kv.global_config.get("enable_llm_cache"):
+                        await save_to_cache(
+                            hashing_kv,
+                            CacheData(
+                                args_hash=args_hash,
+                                content=llm_response,
+                                prompt=prompt,
+                                mode=query_param.mode,
+                                cache_type="reasoning",
+                            ),
+                        )
+                    break
+                logger.warning(f"Empty or None LLM response on attempt {attempt + 1}/{max_retry_llm_response}")
+                await asyncio.sleep(2)
+            else:
+                raise ValueError("LLM function returned None or empty response after 3 attempts.")
 
-                selected = []
-                for line in llm_response.strip().split('\n'):
-                    match = re.search(r'\((.*?) -> (.*?)\):\s*(\d+(\.\d+)?)', line)
-                    if match:
-                        src, tgt, score, _ = match.groups()
-                        if float(score) >= llm_threshold:
-                            selected.append((src.strip(), tgt.strip(), float(score)))
-                return selected
+            selected = []
+            for line in llm_response.strip().split('\n'):
+                match = re.search(r'\((.*?) -> (.*?)\):\s*(\d+(\.\d+)?)', line)
+                if match:
+                    src, tgt, score, _ = match.groups()
+                    if float(score) >= llm_threshold:
+                        selected.append((src.strip(), tgt.strip(), float(score)))
+            return selected
 
-            except Exception as e:
-                logger.error(f"LLM error on edge scoring batch: {e}")
-                return []
+        except Exception as e:
+            logger.error(f"LLM error on edge scoring batch: {e}")
+            return []
 
-        
-        # Parallel batch scoring
+    if seed_edges:
+        # Seeded items reach the LLM through the edges to their connecting attributes,
+        # which the hop loop never scores (both endpoints are already visited)
+        seed_edge_data = await knowledge_graph_inst.get_edges_batch(
+            [{"src": src, "tgt": tgt} for src, tgt in seed_edges]
+        )
+        seed_contexts = [
+            ((src, tgt), edge_context(src, tgt, meta))
+            for (src, tgt), meta in seed_edge_data.items()
+        ]
         selected_batches = await asyncio.gather(
-            *[score_edge_batch(edge_batch) for edge_batch in chunk_list(edge_contexts, batch_size)]
+            *[score_edge_batch(edge_batch) for edge_batch in chunk_list(seed_contexts, batch_size)]
         )
-
-        selected_edges_with_scores = [e for batch in selected_batches for e in batch]
-        selected_edges = [(src, tgt) for src, tgt, _ in selected_edges_with_scores]
-        # all_edges_selected.extend(selected_edges)
-
-        next_nodes = set()
-        for src, tgt in selected_edges:
-            for n in [src, tgt]:
-                if n not in visited_nodes:
-                    next_nodes.add(n)
-                    visited_nodes.add(n)
-
-        if not next_nodes:
-            break
-
-        def sanitize_entity_name(name):
-            return name.strip().strip('"')  # Just remove leading/trailing quotes
-       
-        sanitized_next_nodes = [sanitize_entity_name(n) for n in next_nodes]
-
-        next_node_data = await asyncio.gather(*[knowledge_graph_inst.get_node(n) for n in sanitized_next_nodes])
-        next_node_degrees = await asyncio.gather(*[knowledge_graph_inst.node_degree(n) for n in sanitized_next_nodes])
-        
-        current_nodes = []
-        new_items = []
-        hop_new_items = 0
-        for entity_name, node, deg in zip(sanitized_next_nodes, next_node_data, next_node_degrees):
-            if node is None:
-                continue
-            node["rank"] = deg
-            node["entity_name"] = entity_name
-            # all_nodes_collected[entity_name] = node
-            current_nodes.append(node)
-            if node.get("entity_type") == 'item':
-                if entity_name not in candidate_items:
-                    hop_new_items += 1
-                    candidate_items[entity_name] = {**node, "score": 0.0}
-                    new_items.append(node['entity_name'])
-
-        # Update scores from LLM for ITEMs
-        for src, tgt, score in selected_edges_with_scores:
-            for n in [src, tgt]:
+        for src, tgt, score in (e for batch in selected_batches for e in batch):
+            for n in (src, tgt):
                 n_sanitized = sanitize_entity_name(n)
                 if n_sanitized in candidate_items:
                     candidate_items[n_sanitized]["score"] = max(candidate_items[n_sanitized].get("score", 0.0), score)
+        logger.info(f"Scored {len(seed_contexts)} edges of item-index seeded ITEM nodes")
+
+    if query_param.pipelined_reasoning:
+        await _coldrag_pipelined_expansion(
+            knowledge_graph_inst,
+            current_nodes,
+            visited_nodes,
+            candidate_items,
+            score_edge_batch,
+            edge_context,
+            sanitize_entity_name,
+            is_target_item,
+            leads_to_candidate if candidate_set is not None else None,
+            hop_budget=hop_budget,
+            batch_size=batch_size,
+            max_item_nodes=max_item_nodes,
+            max_inflight_batches=query_param.max_inflight_batches,
+            all_hops_data=all_hops_data,
+        )
+    else:
+        for hop in range(hop_budget):
+            logger.info(f"Hop {hop+1}/{hop_budget} — current candidate ITEM nodes: {len(candidate_items)}")
+            print(f"Hop {hop+1}/{hop_budget} — current candidate ITEM nodes: {len(candidate_items)}")
+
+            hop_data = {
+                "hop_number": hop,
+                "visited_nodes_count": len(visited_nodes),
+                "candidate_items_count": len(candidate_items),
+                "visited_nodes": list(visited_nodes),
+                "candidate_items": list(candidate_items.keys()),
+            }
+        
+            all_hops_data.append(hop_data)
+            # --- END MODIFICATION ---
+
+            if len(candidate_items) >= max_item_nodes:
+                logger.info("Stopping: reached max item nodes.")
+                break
+        
+            # current_nodes' edges with their scoring fields, plus data and degree of
+            # the neighbours not visited yet, in one storage call
+            expansion = await knowledge_graph_inst.expand_frontier(
+                [n["entity_name"] for n in current_nodes],
+                exclude=visited_nodes,
+                edge_fields=["description", "keywords"],
+            )
+            edge_map = {tuple(sorted(e)): meta for e, meta in expansion.edges.items()}
+            all_edges = list(edge_map)
+            if candidate_set is not None:
+                # Nodes reached at this hop can still expand (max_hops - hop - 1) more times
+                remaining_hops = hop_budget - hop - 1
+                all_edges = [e for e in all_edges if leads_to_candidate(e[0], e[1], remaining_hops)]
+            edge_contexts = [((src, tgt), edge_context(src, tgt, edge_map[(src, tgt)])) for src, tgt in all_edges]
+
+            if not edge_contexts:
+                break
+
+            # Parallel batch scoring
+            selected_batches = await asyncio.gather(
+                *[score_edge_batch(edge_batch) for edge_batch in chunk_list(edge_contexts, batch_size)]
+            )
 
-        logger.info(f"→ Found {hop_new_items} new ITEM nodes this hop (Total: {len(candidate_items)})") 
-        print(f"→ Found {hop_new_items} new ITEM nodes this hop (Total: {len(candidate_items)})")
+            selected_edges_with_scores = [e for batch in selected_batches for e in batch]
+            selected_edges = [(src, tgt) for src, tgt, _ in selected_edges_with_scores]
+            # all_edges_selected.extend(selected_edges)
+
+            next_nodes = set()
+            for src, tgt in selected_edges:
+                for n in [src, tgt]:
+                    if n not in visited_nodes:
+                        next_nodes.add(n)
+                        visited_nodes.add(n)
+
+            if not next_nodes:
+                break
+
+            sanitized_next_nodes = [sanitize_entity_name(n) for n in next_nodes]
+
+            # Names the expansion did not cover (e.g. changed by sanitizing) are looked up
+            missing = [n for n in sanitized_next_nodes if n not in expansion.nodes]
+            missing_data, missing_degrees = {}, {}
+            if missing:
+                missing_data, missing_degrees = await asyncio.gather(
+                    knowledge_graph_inst.get_nodes_batch(missing),
+                    knowledge_graph_inst.node_degrees_batch(missing),
+                )
+        
+            current_nodes = []
+            new_items = []
+            hop_new_items = 0
+            for entity_name in sanitized_next_nodes:
+                if entity_name in expansion.nodes:
+                    node, deg = expansion.nodes[entity_name], expansion.degrees[entity_name]
+                elif missing_data.get(entity_name) is not None:
+                    node, deg = dict(missing_data[entity_name]), missing_degrees.get(entity_name, 0)
+                else:
+                    continue
+                node["rank"] = deg
+                node["entity_name"] = entity_name
+                # all_nodes_collected[entity_name] = node
+                current_nodes.append(node)
+                if is_target_item(entity_name, node):
+                    if entity_name not in candidate_items:
+                        hop_new_items += 1
+                        candidate_items[entity_name] = {**node, "score": 0.0}
+                        new_items.append(node['entity_name'])
+
+            # Update scores from LLM for ITEMs
+            for src, tgt, score in selected_edges_with_scores:
+                for n in [src, tgt]:
+                    n_sanitized = sanitize_entity_name(n)
+                    if n_sanitized in candidate_items:
+                        candidate_items[n_sanitized]["score"] = max(candidate_items[n_sanitized].get("score", 0.0), score)
+
+            logger.info(f"→ Found {hop_new_items} new ITEM nodes this hop (Total: {len(candidate_items)})") 
+            print(f"→ Found {hop_new_items} new ITEM nodes this hop (Total: {len(candidate_items)})")
 
     # After the loop finishes, write the collected data from all hops to the single JSON file.
     try:
@@ -4558,7 +5674,20 @@ async def coldrag_llm_reasoning(
 
     logger.info(f"Finished reasoning. Total unique ITEM nodes collected: {len(candidate_items)}")
     print(f"Finished reasoning. Total unique ITEM nodes collected: {len(candidate_items)}")
-    return list(candidate_items.values())
+    get_queue_stats = getattr(getattr(llm_func, "func", llm_func), "get_queue_stats", None)
+    if get_queue_stats is not None:
+        queue_stats = get_queue_stats()
+        waits = ", ".join(
+            f"p{priority}: mean {s['mean_wait']:.2f}s / max {s['max_wait']:.2f}s over {s['started']}"
+            for priority, s in queue_stats["priorities"].items()
+        )
+        logger.info(
+            f"LLM queue: depth {queue_stats['queue_depth']}, running {queue_stats['running']}; waits {waits}"
+        )
+    result = list(candidate_items.values())
+    if result_key is not None:
+        await derived_cache.set("coldrag", result_key, result)
+    return result
 ###
 
 
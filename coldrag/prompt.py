@@ -1,4 +1,5 @@
 from __future__ import annotations
+import re
 from typing import Any
 
 GRAPH_FIELD_SEP = "<SEP>"
@@ -275,6 +276,28 @@ Description List:
 ---Output---
 """
 
+PROMPTS["summarize_entity_descriptions_batch"] = """---Role---
+You are a Knowledge Graph Specialist, proficient in data curation and synthesis.
+
+---Task---
+You are given several entities or relations, each with its own list of descriptions. For *each* item, synthesize its descriptions into a single, comprehensive, and cohesive summary. Items are independent: never mix information between items.
+
+---Instructions---
+1. Input Format: Each item starts with a line `### Item <id>`, followed by its type, its name and its description list. Each JSON object in a description list is one description.
+2. Comprehensiveness: Each summary must integrate all key information from *every* description of that item.
+3. Context & Objectivity: Write each summary from an objective, third-person perspective and mention the full name of the entity or relation at the beginning.
+4. Conflict Handling: If an item's descriptions conflict because they describe distinct entities sharing a name, summarize each one separately within that item's summary; otherwise reconcile them or present both viewpoints with noted uncertainty.
+5. Length Constraint: Each summary must not exceed {summary_length} tokens.
+6. Language: All summaries must be written in {language}. Proper nouns may be retained in their original language if a proper, widely accepted translation is not available.
+7. Output Format: Return ONLY a JSON object with this schema, with exactly one entry per input item and no text before or after it:
+{{"summaries": [{{"id": <item id>, "summary": "<summary text>"}}]}}
+
+---Input---
+{items}
+
+---Output---
+"""
+
 
 
 # PROMPTS["entity_if_loop_extraction"] = """
@@ -563,3 +586,112 @@ what are the top 10 games the user would most likely interact with next?"
 # - List up to 5 most important reference sources at the end under "References" section. Clearly indicating whether each source is from Knowledge Graph (KG) or Vector Data (DC), and include the file path if available, in the following format: [KG/DC] file_path
 # - If you don't know the answer, just say so. Do not make anything up.
 # - Do not include information not provided by the Data Sources."""
+
+
+# ColdRAG edge-scoring prompts are laid out as ordered sections: static instructions
+# first, then the per-user history, then the per-batch edges. Keeping the variable data
+# last lets vLLM automatic prefix caching reuse the KV blocks of the instructions +
+# history across all scoring batches and retries of the same user. The final ranking
+# call leads with the query-independent "coldrag_ranking_system" message instead, so
+# every ranking call shares it and only the retrieved context onwards differs.
+PROMPTS["coldrag_edge_scoring_instructions"] = """You are helping with multi-hop reasoning over a knowledge graph.
+You will be given the user's past interaction history (items they engaged with), followed by edges from the current reasoning frontier, each connecting two entities.
+For each edge, assess how strongly it relates to the user's past interests.
+Score each edge from 0 (completely irrelevant) to 10 (highly relevant) **based on semantic similarity to the user's interaction history**.
+Only consider the user's past interactions for scoring.
+
+Format your output exactly as:
+1. (src -> tgt): score
+2. (src -> tgt): score
+...
+
+"""
+
+PROMPTS["coldrag_edge_scoring_history"] = """The following is the user's past interaction history (items they engaged with):
+"{history}"
+
+"""
+
+PROMPTS["coldrag_edge_scoring_edges"] = """Here are the edges:
+{edges}"""
+
+PROMPTS["coldrag_ranking_system"] = """---Ranking Task---
+
+You are a recommender that ranks candidate products for a user.
+The user message lists the products the user purchased in the past, the candidate products and how many of them to recommend.
+Rank the candidates by how likely the user is to purchase them next, using the purchasing history and the knowledge graph context below.
+Only include items from the given candidate list, and follow the output format requested in the user message; it takes precedence over the general answer guidelines below.
+
+"""
+
+PROMPTS["coldrag_ranking_candidates"] = """Now there are {num_candidates} candidate products that I can consider purchasing next:
+{candidates}
+
+"""
+
+PROMPTS["coldrag_prompt_layouts"] = {
+    "coldrag_edge_scoring": [
+        "coldrag_edge_scoring_instructions",
+        "coldrag_edge_scoring_history",
+        "coldrag_edge_scoring_edges",
+    ],
+}
+
+
+def render_prompt_layout(name: str, **kwargs: Any) -> str:
+    """Render a registered prompt layout by concatenating its sections in order."""
+    return "".join(PROMPTS[key].format(**kwargs) for key in PROMPTS["coldrag_prompt_layouts"][name])
+
+
+def render_prompt_prefix(name: str, **kwargs: Any) -> str:
+    """Render the cacheable prefix of a layout (every section except the last, variable one)."""
+    return "".join(
+        PROMPTS[key].format(**kwargs) for key in PROMPTS["coldrag_prompt_layouts"][name][:-1]
+    )
+
+
+# User query of a top-k recommendation request. "coldrag" mode finds the candidates in
+# the knowledge graph; the other modes list them in the query.
+PROMPTS["coldrag_recommend_history"] = """I've purchased the following products in the past in order:
+{history}
+
+"""
+
+PROMPTS["coldrag_recommend_candidates"] = """Now there are {num_candidates} candidate products that I can consider purchasing next:
+{candidates}
+
+"""
+
+PROMPTS["coldrag_recommend_instructions"] = """Please carefully recommend top-{k} products among the candidate products by how likely I am to purchase them next, based on my past purchasing history.
+Think step by step, but only output the final ranking in the following format:
+
+1. <product name>
+2. <product name>
+...
+
+Only include items from the given candidate list. Do not add explanations or any other text."""
+
+
+def render_recommend_query(
+    history: list[str], k: int, candidates: list[str] | None = None
+) -> str:
+    """Recommendation query for a purchase history; ``candidates`` are listed unless None."""
+    query = PROMPTS["coldrag_recommend_history"].format(history=history)
+    if candidates is not None:
+        query += PROMPTS["coldrag_recommend_candidates"].format(
+            num_candidates=len(candidates),
+            candidates="\n".join(f"{i + 1}. {t}" for i, t in enumerate(candidates)),
+        )
+    return query + PROMPTS["coldrag_recommend_instructions"].format(k=k)
+
+
+def parse_ranked_items(text: str, k: int) -> list[str]:
+    """First ``k`` entries of a "1. <product name>" ranking."""
+    items: list[str] = []
+    for line in (text or "").strip().splitlines():
+        match = re.match(r"^\s*\d+\.\s*(.+)$", line.strip())
+        if match:
+            items.append(match.group(1).strip())
+            if len(items) >= k:
+                break
+    return items
@@ -0,0 +1,211 @@
+"""Warm-start snapshot of the file-backed storages of a workspace.
+
+``LightRAG.acompile_snapshot`` flushes every storage and asks each one to add itself
+to a ``WorkspaceSnapshot`` stored in ``<working_dir>/<workspace>/snapshot/``:
+
+- KV / doc-status records and the NetworkX graph are pickled (no JSON or GraphML
+  parsing on load);
+- NanoVectorDB matrices are written as raw ``.npy`` files and memory-mapped
+  copy-on-write on load, so pages are only read when a query touches them.
+
+Every entry records the size and mtime of the source file it was built from. A
+storage started with ``use_snapshot=True`` only takes its entry while the source
+file is unchanged, and otherwise falls back to the normal JSON / GraphML load, so a
+stale snapshot can never shadow newer data.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+from hashlib import md5
+from typing import Any
+
+from coldrag.utils import logger
+
+SNAPSHOT_DIRNAME = "snapshot"
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def get_snapshot_dir(working_dir: str, workspace: str | None = None) -> str:
+    """Return the on-disk location of the warm-start snapshot."""
+    if workspace:
+        return os.path.join(working_dir, workspace, SNAPSHOT_DIRNAME)
+    return os.path.join(working_dir, SNAPSHOT_DIRNAME)
+
+
+def _source_signature(source_file: str) -> dict[str, int] | None:
+    try:
+        stat = os.stat(source_file)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class WorkspaceSnapshot:
+    """Manifest plus payload files of one snapshot directory."""
+
+    def __init__(self, snapshot_dir: str, entries: dict[str, dict] | None = None):
+        self.snapshot_dir = snapshot_dir
+        self.entries: dict[str, dict] = entries or {}
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> "WorkspaceSnapshot | None":
+        manifest_path = os.path.join(snapshot_dir, SNAPSHOT_MANIFEST)
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+            logger.warning(
+                f"Ignoring snapshot {snapshot_dir}: format version {manifest.get('version')}"
+            )
+            return None
+        return cls(snapshot_dir, manifest.get("entries", {}))
+
+    def _key(self, source_file: str) -> str:
+        return os.path.relpath(
+            os.path.abspath(source_file), os.path.dirname(self.snapshot_dir)
+        )
+
+    def _payload_name(self, key: str, suffix: str) -> str:
+        stem = os.path.splitext(os.path.basename(key))[0]
+        return f"{stem}-{md5(key.encode('utf-8')).hexdigest()[:8]}{suffix}"
+
+    def _fresh_entry(self, source_file: str, kind: str) -> dict | None:
+        entry = self.entries.get(self._key(source_file))
+        if not entry or entry.get("kind") != kind:
+            return None
+        if entry.get("source") != _source_signature(source_file):
+            logger.info(f"Snapshot entry for {source_file} is stale, loading source")
+            return None
+        return entry
+
+    # --- writing -------------------------------------------------------------
+
+    def add_object(self, source_file: str, obj: Any) -> bool:
+        """Pickle ``obj`` as the snapshot of ``source_file`` (which must be flushed)."""
+        signature = _source_signature(source_file)
+        if signature is None:
+            return False
+        key = self._key(source_file)
+        payload = self._payload_name(key, ".pkl")
+        self._write(payload, lambda f: pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL))
+        self.entries[key] = {"kind": "object", "source": signature, "file": payload}
+        return True
+
+    def add_vectors(self, source_file: str, storage: dict[str, Any]) -> bool:
+        """Snapshot a NanoVectorDB storage dict: matrix as ``.npy``, rest pickled."""
+        import numpy as np
+
+        signature = _source_signature(source_file)
+        if signature is None:
+            return False
+        key = self._key(source_file)
+        matrix_file = self._payload_name(key, ".npy")
+        meta_file = self._payload_name(key, ".meta.pkl")
+        matrix = np.ascontiguousarray(storage["matrix"])
+        meta = {k: v for k, v in storage.items() if k != "matrix"}
+        self._write(matrix_file, lambda f: np.save(f, matrix, allow_pickle=False))
+        self._write(meta_file, lambda f: pickle.dump(meta, f, pickle.HIGHEST_PROTOCOL))
+        self.entries[key] = {
+            "kind": "vectors",
+            "source": signature,
+            "file": meta_file,
+            "matrix_file": matrix_file,
+        }
+        return True
+
+    def _write(self, name: str, dump) -> None:
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            dump(f)
+        os.replace(tmp_path, path)
+
+    def save(self) -> None:
+        """Write the manifest (last, so readers never see half-written payloads)."""
+        manifest = {"version": SNAPSHOT_FORMAT_VERSION, "entries": self.entries}
+        self._write(
+            SNAPSHOT_MANIFEST,
+            lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")),
+        )
+        referenced = {SNAPSHOT_MANIFEST}
+        for entry in self.entries.values():
+            referenced.add(entry["file"])
+            if "matrix_file" in entry:
+                referenced.add(entry["matrix_file"])
+        for name in os.listdir(self.snapshot_dir):
+            if name not in referenced:
+                os.remove(os.path.join(self.snapshot_dir, name))
+
+    # --- reading -------------------------------------------------------------
+
+    def load_object(self, source_file: str) -> Any | None:
+        entry = self._fresh_entry(source_file, "object")
+        if entry is None:
+            return None
+        with open(os.path.join(self.snapshot_dir, entry["file"]), "rb") as f:
+            return pickle.load(f)
+
+    def load_vectors(self, source_file: str) -> dict[str, Any] | None:
+        entry = self._fresh_entry(source_file, "vectors")
+        if entry is None:
+            return None
+        import numpy as np
+
+        with open(os.path.join(self.snapshot_dir, entry["file"]), "rb") as f:
+            storage = pickle.load(f)
+        # Copy-on-write mapping: pages load on first touch, in-place updates stay private
+        storage["matrix"] = np.load(
+            os.path.join(self.snapshot_dir, entry["matrix_file"]), mmap_mode="c"
+        )
+        return storage
+
+
+_snapshot_cache: dict[str, tuple[int, WorkspaceSnapshot | None]] = {}
+
+
+def open_snapshot_for(source_file: str) -> WorkspaceSnapshot | None:
+    """Snapshot of the workspace directory holding ``source_file``, if one exists."""
+    snapshot_dir = os.path.join(
+        os.path.dirname(os.path.abspath(source_file)), SNAPSHOT_DIRNAME
+    )
+    manifest_path = os.path.join(snapshot_dir, SNAPSHOT_MANIFEST)
+    try:
+        manifest_mtime = os.stat(manifest_path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _snapshot_cache.get(snapshot_dir)
+    if cached is None or cached[0] != manifest_mtime:
+        cached = (manifest_mtime, WorkspaceSnapshot.load(snapshot_dir))
+        _snapshot_cache[snapshot_dir] = cached
+    return cached[1]
+
+
+def load_snapshot_object(source_file: str) -> Any | None:
+    """Pickled snapshot of ``source_file``, or None if absent or stale."""
+    snapshot = open_snapshot_for(source_file)
+    if snapshot is None:
+        return None
+    try:
+        return snapshot.load_object(source_file)
+    except Exception as e:
+        logger.warning(f"Failed to load snapshot for {source_file}: {e}")
+        return None
+
+
+def load_snapshot_vectors(source_file: str) -> dict[str, Any] | None:
+    """Memory-mapped NanoVectorDB storage for ``source_file``, or None if absent or stale."""
+    snapshot = open_snapshot_for(source_file)
+    if snapshot is None:
+        return None
+    try:
+        return snapshot.load_vectors(source_file)
+    except Exception as e:
+        logger.warning(f"Failed to load snapshot for {source_file}: {e}")
+        return None
@@ -0,0 +1,182 @@
+"""
+Rule-based extraction fast path for templated chunks.
+
+A ``StructuredExtractor`` runs on every chunk before the LLM entity extraction. It
+turns the fields it recognises into entities and relations, in the same
+``(maybe_nodes, maybe_edges)`` format produced by the LLM extraction and consumed by
+``merge_nodes_and_edges``, and hands back the free text it could not interpret. The
+LLM only runs on that remainder, and not at all when nothing is left.
+
+``ItemRecordExtractor`` handles ColdRAG item records such as::
+
+    ### Item Title: Super Mario 64 ###
+    Brand: Nintendo
+    Category: Video Games, Platformer
+    Super Mario 64 is a 3D platformer ...
+
+Here ``Brand`` and ``Category`` become ``item -> brand`` / ``item -> category``
+relations, while the description line still goes to the LLM.
+
+Set ``LightRAG(structured_extractor=ItemRecordExtractor())`` to enable it.
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from coldrag.utils import sanitize_and_normalize_extracted_text
+
+ITEM_ENTITY_TYPE = "item"
+
+# field label (lowercase) -> (entity type of the value, relation keywords)
+DEFAULT_ITEM_FIELDS: dict[str, tuple[str, str]] = {
+    "brand": ("brand", "made_by"),
+    "manufacturer": ("brand", "made_by"),
+    "publisher": ("brand", "published_by"),
+    "developer": ("brand", "developed_by"),
+    "category": ("category", "belongs_to_category"),
+    "categories": ("category", "belongs_to_category"),
+    "genre": ("genre", "belongs_to_genre"),
+    "genres": ("genre", "belongs_to_genre"),
+    "platform": ("platform", "runs_on_platform"),
+    "platforms": ("platform", "runs_on_platform"),
+}
+
+_FIELD_LINE = re.compile(r"^\s*[-*]?\s*([A-Za-z][A-Za-z _/]{0,40}?)\s*:\s*(.*?)\s*$")
+_TITLE_LABELS = ("item title", "title")
+
+
+@dataclass
+class StructuredExtraction:
+    """Entities/relations of one chunk plus the text left for the LLM ("" = none)."""
+
+    nodes: dict[str, list[dict]] = field(default_factory=lambda: defaultdict(list))
+    edges: dict[tuple[str, str], list[dict]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    free_text: str = ""
+
+
+class StructuredExtractor(ABC):
+    """Deterministic extractor run on each chunk before the LLM extraction."""
+
+    @abstractmethod
+    def extract(
+        self, chunk_key: str, content: str, file_path: str, timestamp: int
+    ) -> StructuredExtraction:
+        """Extract the structured part of ``content``.
+
+        Chunks the extractor does not understand must be returned untouched as
+        ``free_text`` so that the LLM extraction still sees them.
+        """
+
+
+class ItemRecordExtractor(StructuredExtractor):
+    """Schema-driven extractor for ``### Item Title: X ###`` item records.
+
+    Args:
+        fields: Field label (case-insensitive) -> (entity type, relation keywords).
+        drop_fields: Field labels to discard instead of sending them to the LLM
+            (prices, ratings, ids, ...).
+        value_separators: Characters separating multiple values of one field.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, tuple[str, str]] | None = None,
+        drop_fields: tuple[str, ...] = (),
+        value_separators: str = ",;|",
+    ):
+        self.fields = {k.lower(): v for k, v in (fields or DEFAULT_ITEM_FIELDS).items()}
+        self.drop_fields = {f.lower() for f in drop_fields}
+        self.value_separators = value_separators
+
+    def _split_values(self, value: str) -> list[str]:
+        pattern = "[" + re.escape(self.value_separators) + "]"
+        values = []
+        for part in re.split(pattern, value) if self.value_separators else [value]:
+            part = sanitize_and_normalize_extracted_text(part, remove_inner_quotes=True)
+            if part and part not in values:
+                values.append(part)
+        return values
+
+    def _parse_title(self, heading: str) -> str | None:
+        heading = heading.strip().strip("#").strip()
+        match = _FIELD_LINE.match(heading)
+        if not match or match.group(1).strip().lower() not in _TITLE_LABELS:
+            return None
+        title = match.group(2).strip().strip("#").strip()
+        return sanitize_and_normalize_extracted_text(title, remove_inner_quotes=True)
+
+    def extract(
+        self, chunk_key: str, content: str, file_path: str, timestamp: int
+    ) -> StructuredExtraction:
+        result = StructuredExtraction()
+        lines = content.strip().splitlines()
+        title = self._parse_title(lines[0]) if lines else None
+        if not title:
+            result.free_text = content
+            return result
+
+        record = {
+            "source_id": chunk_key,
+            "file_path": file_path,
+            "timestamp": timestamp,
+            # Lets the merge skip field descriptions that are already stored
+            "structured": True,
+        }
+        facts = []
+        free_lines = []
+        for line in lines[1:]:
+            match = _FIELD_LINE.match(line)
+            label = match.group(1).strip().lower() if match else None
+            if label in self.drop_fields:
+                continue
+            if label not in self.fields or not match.group(2):
+                free_lines.append(line)
+                continue
+
+            entity_type, keywords = self.fields[label]
+            label_text = match.group(1).strip()
+            for value in self._split_values(match.group(2)):
+                if value == title:
+                    continue
+                facts.append(f"{label_text}: {value}")
+                result.nodes[value].append(
+                    dict(
+                        entity_name=value,
+                        entity_type=entity_type,
+                        description=f"{label_text} {value}.",
+                        **record,
+                    )
+                )
+                result.edges[(title, value)].append(
+                    dict(
+                        src_id=title,
+                        tgt_id=value,
+                        weight=1.0,
+                        description=f"{title} has {label_text.lower()} {value}.",
+                        keywords=keywords,
+                        **record,
+                    )
+                )
+
+        if facts:
+            result.nodes[title].append(
+                dict(
+                    entity_name=title,
+                    entity_type=ITEM_ENTITY_TYPE,
+                    description=f"{title} ({'; '.join(facts)}).",
+                    **record,
+                )
+            )
+
+        if any(line.strip() for line in free_lines):
+            # Keep the heading so the LLM names the item exactly like the structured part
+            result.free_text = "\n".join([lines[0], *free_lines]).strip()
+        elif not facts:
+            result.free_text = content
+        return result
@@ -3,7 +3,6 @@ import weakref
 
 import asyncio
 import html
-import csv
 import json
 import logging
 import logging.handlers
@@ -17,6 +16,7 @@ from functools import wraps
 from hashlib import md5
 from typing import (
     Any,
+    AsyncIterator,
     Protocol,
     Callable,
     TYPE_CHECKING,
@@ -26,7 +26,6 @@ from typing import (
     Sequence,
     Collection,
 )
-import numpy as np
 from dotenv import load_dotenv
 
 from coldrag.constants import (
@@ -114,6 +113,139 @@ async def safe_vdb_operation_with_exception(
                     await asyncio.sleep(retry_delay)
 
 
+# Latest buffered write per (storage, vector id) across all VdbUpsertBuffer instances,
+# so a buffer never flushes a record that a later merge has already superseded.
+_vdb_write_seq = 0
+_vdb_latest_write: dict[tuple[str, str, str], int] = {}
+_vdb_flush_locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+
+def _vdb_storage_key(storage) -> tuple[str, str]:
+    return (getattr(storage, "workspace", "") or "", getattr(storage, "namespace", ""))
+
+
+class VdbUpsertBuffer:
+    """Write-behind buffer that coalesces single-record vector upserts.
+
+    Records are collected per storage and keyed by vector id; a later write for the
+    same id replaces the earlier one. A storage is flushed as a single upsert once it
+    holds ``flush_size`` records, and on every ``flush()`` call, so the storage can
+    split the payload into full ``embedding_batch_num`` embedding calls.
+
+    A failing flush is bisected and retried; a single record that still fails is
+    retried with the ``max_retries``/``retry_delay`` it was added with, and the
+    raised error names the entity or relation it belongs to.
+    """
+
+    def __init__(self, flush_size: int = 64):
+        self.flush_size = max(1, int(flush_size))
+        self._pending: dict[
+            tuple[str, str], tuple[Any, dict[str, dict], dict[str, tuple]]
+        ] = {}
+
+    def __len__(self) -> int:
+        return sum(len(records) for _, records, _ in self._pending.values())
+
+    async def add(
+        self,
+        storage,
+        payload: dict[str, dict],
+        operation_name: str,
+        entity_name: str = "",
+        max_retries: int = 3,
+        retry_delay: float = 0.2,
+    ) -> None:
+        """Buffer ``payload`` for ``storage``; flushes that storage when it is full."""
+        global _vdb_write_seq
+        skey = _vdb_storage_key(storage)
+        _, records, meta = self._pending.setdefault(skey, (storage, {}, {}))
+        for vdb_id, record in payload.items():
+            _vdb_write_seq += 1
+            _vdb_latest_write[(*skey, vdb_id)] = _vdb_write_seq
+            records.pop(vdb_id, None)
+            records[vdb_id] = record
+            meta[vdb_id] = (
+                _vdb_write_seq,
+                operation_name,
+                entity_name,
+                max_retries,
+                retry_delay,
+            )
+        if len(records) >= self.flush_size:
+            await self._flush_storage(skey)
+
+    async def flush(self) -> None:
+        """Write every buffered record; raises the first failure after all storages are tried."""
+        first_error = None
+        for skey in list(self._pending):
+            try:
+                await self._flush_storage(skey)
+            except Exception as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
+    async def _flush_storage(self, skey: tuple[str, str]) -> None:
+        entry = self._pending.pop(skey, None)
+        if entry is None:
+            return
+        storage, records, meta = entry
+        lock = _vdb_flush_locks.setdefault(skey, asyncio.Lock())
+        async with lock:
+            # Drop records superseded by a newer buffered write from another merge
+            live_ids = []
+            for vdb_id in records:
+                seq = meta[vdb_id][0]
+                if _vdb_latest_write.get((*skey, vdb_id)) == seq:
+                    live_ids.append(vdb_id)
+            if not live_ids:
+                return
+            try:
+                await self._upsert_bisect(storage, records, meta, live_ids)
+            finally:
+                for vdb_id in live_ids:
+                    if _vdb_latest_write.get((*skey, vdb_id)) == meta[vdb_id][0]:
+                        del _vdb_latest_write[(*skey, vdb_id)]
+
+    async def _upsert_bisect(self, storage, records, meta, ids: list[str]) -> None:
+        if len(ids) == 1:
+            vdb_id = ids[0]
+            _, operation_name, entity_name, max_retries, retry_delay = meta[vdb_id]
+            try:
+                await safe_vdb_operation_with_exception(
+                    operation=lambda payload={vdb_id: records[vdb_id]}: storage.upsert(
+                        payload
+                    ),
+                    operation_name=operation_name,
+                    entity_name=entity_name,
+                    max_retries=max_retries,
+                    retry_delay=retry_delay,
+                )
+            except Exception as e:
+                raise create_prefixed_exception(e, f"`{entity_name}`") from e
+            return
+
+        try:
+            await storage.upsert({vdb_id: records[vdb_id] for vdb_id in ids})
+            return
+        except Exception as e:
+            logger.warning(
+                f"VDB batched upsert of {len(ids)} records failed: {e}, splitting batch"
+            )
+
+        mid = len(ids) // 2
+        first_error = None
+        for part in (ids[:mid], ids[mid:]):
+            try:
+                await self._upsert_bisect(storage, records, meta, part)
+            except Exception as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
+
 def get_env_value(
     env_key: str, default: any, value_type: type = str, special_none: bool = False
 ) -> any:
@@ -168,6 +300,8 @@ def get_env_value(
 
 # Use TYPE_CHECKING to avoid circular imports
 if TYPE_CHECKING:
+    import numpy as np
+
     from coldrag.base import BaseKVStorage, BaseVectorStorage, QueryParam
 
 # use the .env that is inside the current folder
@@ -461,6 +595,9 @@ def priority_limit_async_func_call(
     - Task state tracking to prevent race conditions
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
+    - Fair sharing between flows (``_fair_key``) within one priority class
+    - Queue depth and wait time statistics (``get_queue_stats()``) and a wait
+      estimate for admission control (``estimate_wait(priority)``)
 
     Args:
         max_size: Maximum number of concurrent calls
@@ -506,8 +643,18 @@ def priority_limit_async_func_call(
         active_futures = weakref.WeakSet()
         reinit_count = 0
 
+        # Start-time fair queueing: the n-th queued call of a flow gets rank n, offset
+        # to the rank of the last dequeued call, so flows are served round-robin
+        virtual_time = 0
+        flow_ranks: dict[Any, int] = {}
+        # priority -> submitted / queued / started counts and queue wait times
+        queue_stats: dict[int, dict[str, float]] = {}
+        # Moving average of the execution time of one call (seconds)
+        service_time = 0.0
+
         async def worker():
             """Enhanced worker that processes tasks with proper timeout and state management"""
+            nonlocal virtual_time, service_time
             try:
                 while not shutdown_event.is_set():
                     try:
@@ -515,6 +662,7 @@ def priority_limit_async_func_call(
                         try:
                             (
                                 priority,
+                                rank,
                                 count,
                                 task_id,
                                 args,
@@ -522,6 +670,8 @@ def priority_limit_async_func_call(
                             ) = await asyncio.wait_for(queue.get(), timeout=1.0)
                         except asyncio.TimeoutError:
                             continue
+                        virtual_time = max(virtual_time, rank)
+                        queue_stats[priority]["queued"] -= 1
 
                         # Get task state and mark worker as started
                         async with task_states_lock:
@@ -534,6 +684,14 @@ def priority_limit_async_func_call(
                             task_state.execution_start_time = (
                                 asyncio.get_event_loop().time()
                             )
+                            wait = (
+                                task_state.execution_start_time - task_state.start_time
+                            )
+                            stats = queue_stats[priority]
+                            stats["started"] += 1
+                            stats["wait_total"] += wait
+                            stats["wait_max"] = max(stats["wait_max"], wait)
+                            stats["wait_recent"] += 0.2 * (wait - stats["wait_recent"])
 
                         # Check if task was cancelled before worker started
                         if (
@@ -584,6 +742,15 @@ def priority_limit_async_func_call(
                             if not task_state.future.done():
                                 task_state.future.set_exception(e)
                         finally:
+                            duration = (
+                                asyncio.get_event_loop().time()
+                                - task_state.execution_start_time
+                            )
+                            service_time = (
+                                duration
+                                if service_time == 0.0
+                                else service_time + 0.2 * (duration - service_time)
+                            )
                             # Clean up task state
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
@@ -770,9 +937,54 @@ def priority_limit_async_func_call(
 
             logger.info(f"{queue_name}: Priority queue workers shutdown complete")
 
+        def get_queue_stats() -> dict[str, Any]:
+            """Current queue depth and per-priority queue wait times (seconds)"""
+            priorities = {}
+            for priority, stats in sorted(queue_stats.items()):
+                started = stats["started"]
+                priorities[priority] = {
+                    "submitted": int(stats["submitted"]),
+                    "queued": max(0, int(stats["queued"])),
+                    "started": int(started),
+                    "mean_wait": stats["wait_total"] / started if started else 0.0,
+                    "recent_wait": stats["wait_recent"],
+                    "max_wait": stats["wait_max"],
+                }
+            running = sum(1 for t in task_states.values() if t.worker_started)
+            return {
+                "queue_depth": queue.qsize(),
+                "max_queue_size": max_queue_size,
+                "running": running,
+                "in_flight": len(task_states),
+                "max_concurrency": max_size,
+                "service_time": service_time,
+                "priorities": priorities,
+            }
+
+        def estimate_wait(priority: int = 10) -> float:
+            """Expected queue wait (seconds) of a call submitted now at ``priority``.
+
+            Calls already queued at the same or a more urgent priority are served
+            first, ``max_size`` at a time, each taking the recent mean service time.
+            """
+            ahead = sum(
+                max(0, stats["queued"])
+                for p, stats in queue_stats.items()
+                if p <= priority
+            )
+            running = sum(1 for t in task_states.values() if t.worker_started)
+            if running < max_size and ahead == 0:
+                return 0.0
+            return (ahead // max_size + 1) * service_time
+
         @wraps(func)
         async def wait_func(
-            *args, _priority=10, _timeout=None, _queue_timeout=None, **kwargs
+            *args,
+            _priority=10,
+            _timeout=None,
+            _queue_timeout=None,
+            _fair_key=None,
+            **kwargs,
         ):
             """
             Execute function with enhanced priority-based concurrency control and timeout handling
@@ -782,6 +994,8 @@ def priority_limit_async_func_call(
                 _priority: Call priority (lower values have higher priority)
                 _timeout: Maximum time to wait for completion (in seconds, none means determinded by max_execution_timeout of the queue)
                 _queue_timeout: Maximum time to wait for entering the queue (in seconds)
+                _fair_key: Flow the call belongs to (e.g. one query); calls of the same
+                    priority are served round-robin across flows instead of FIFO
                 **kwargs: Keyword arguments passed to the function
 
             Returns:
@@ -810,25 +1024,49 @@ def priority_limit_async_func_call(
 
                 active_futures.add(future)
 
-                # Get counter for FIFO ordering
+                # Get counter for FIFO ordering and the fair-share rank of the flow
                 nonlocal counter
                 async with initialization_lock:
                     current_count = counter
                     counter += 1
+                    rank = virtual_time
+                    if _fair_key is not None:
+                        rank = max(flow_ranks.get(_fair_key, -1) + 1, virtual_time)
+                        flow_ranks[_fair_key] = rank
+                        if len(flow_ranks) > 4096:
+                            # Forget flows that have caught up with the virtual time
+                            for key in [
+                                k for k, r in flow_ranks.items() if r < virtual_time
+                            ]:
+                                del flow_ranks[key]
+
+                stats = queue_stats.setdefault(
+                    _priority,
+                    {
+                        "submitted": 0,
+                        "queued": 0,
+                        "started": 0,
+                        "wait_total": 0.0,
+                        "wait_recent": 0.0,
+                        "wait_max": 0.0,
+                    },
+                )
 
                 # Queue the task with timeout handling
                 try:
                     if _queue_timeout is not None:
                         await asyncio.wait_for(
                             queue.put(
-                                (_priority, current_count, task_id, args, kwargs)
+                                (_priority, rank, current_count, task_id, args, kwargs)
                             ),
                             timeout=_queue_timeout,
                         )
                     else:
                         await queue.put(
-                            (_priority, current_count, task_id, args, kwargs)
+                            (_priority, rank, current_count, task_id, args, kwargs)
                         )
+                    stats["submitted"] += 1
+                    stats["queued"] += 1
                 except asyncio.TimeoutError:
                     raise QueueFullError(
                         f"{queue_name}: Queue full, timeout after {_queue_timeout} seconds"
@@ -883,12 +1121,106 @@ def priority_limit_async_func_call(
 
         # Add shutdown method to decorated function
         wait_func.shutdown = shutdown
+        wait_func.get_queue_stats = get_queue_stats
+        wait_func.estimate_wait = estimate_wait
 
         return wait_func
 
     return final_decro
 
 
+class SingleFlight:
+    """Coalesce concurrent identical async calls into one in-flight call.
+
+    The first caller for a key runs the call; callers arriving while it is in flight
+    await the same result instead of repeating the work. Every caller (the first one
+    included) receives ``share(result)``, which lets results that must not be shared
+    as-is (mutable dicts, streams) be copied or fanned out per caller. Nothing is
+    kept once the call finishes, so this never changes caching semantics.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Any],
+        share: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        share = share or (lambda result: result)
+        while key in self._inflight:
+            future = self._inflight[key]
+            self.coalesced += 1
+            logger.debug(f"Coalesced with in-flight call {key}")
+            try:
+                return share(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leading call was cancelled: run it again ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers observe failures; avoid "exception never retrieved" without them
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+        return share(result)
+
+
+class BroadcastStream:
+    """Replay one async iterator to any number of independent consumers.
+
+    Chunks are pulled from the source once, buffered, and yielded to every iterator
+    returned by ``subscribe()`` from the beginning, at each consumer's own pace.
+    """
+
+    def __init__(self, source: AsyncIterator[Any]):
+        self._source = source
+        self._chunks: list[Any] = []
+        self._done = False
+        self._error: BaseException | None = None
+        self._lock = asyncio.Lock()
+
+    async def _fill(self, index: int) -> None:
+        async with self._lock:
+            # Another consumer may have pulled the chunk while we waited
+            if index < len(self._chunks) or self._done:
+                return
+            try:
+                self._chunks.append(await self._source.__anext__())
+            except StopAsyncIteration:
+                self._done = True
+            except Exception as e:
+                self._done = True
+                self._error = e
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            if index < len(self._chunks):
+                yield self._chunks[index]
+                index += 1
+            elif self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            else:
+                await self._fill(index)
+
+
 def wrap_embedding_func_with_attrs(**kwargs):
     """Wrap a function with attributes"""
 
@@ -978,22 +1310,34 @@ class TiktokenTokenizer(Tokenizer):
         Args:
             model_name: The model name for the tiktoken tokenizer to use.  Defaults to "gpt-4o-mini".
 
+        The BPE ranks (which tiktoken may have to download) are loaded on first
+        encode/decode rather than here.
+
         Raises:
             ImportError: If tiktoken is not installed.
             ValueError: If the model_name is invalid.
         """
         try:
-            import tiktoken
+            import tiktoken.model
         except ImportError:
             raise ImportError(
                 "tiktoken is not installed. Please install it with `pip install tiktoken` or define custom `tokenizer_func`."
             )
 
         try:
-            tokenizer = tiktoken.encoding_for_model(model_name)
-            super().__init__(model_name=model_name, tokenizer=tokenizer)
+            self._encoding_name = tiktoken.model.encoding_name_for_model(model_name)
         except KeyError:
             raise ValueError(f"Invalid model_name: {model_name}.")
+        self.model_name = model_name
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self) -> TokenizerInterface:
+        if self._tokenizer is None:
+            import tiktoken
+
+            self._tokenizer = tiktoken.get_encoding(self._encoding_name)
+        return self._tokenizer
 
 
 def pack_user_ass_to_openai_messages(*args: str):
@@ -1035,6 +1379,8 @@ def truncate_list_by_token_size(
 
 def cosine_similarity(v1, v2):
     """Calculate cosine similarity between two vectors"""
+    import numpy as np
+
     dot_product = np.dot(v1, v2)
     norm1 = np.linalg.norm(v1)
     norm2 = np.linalg.norm(v2)
@@ -1196,300 +1542,42 @@ async def aexport_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = 1000,
 ) -> None:
     """
     Asynchronously exports all entities, relations, and relationships to various formats.
 
+    Data is paged through the batch graph and vector-store APIs and written
+    incrementally, so memory stays bounded by ``batch_size``.
+
     Args:
         chunk_entity_relation_graph: Graph storage instance for entities and relations
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "excel", "md", "txt", "parquet", "arrow".
             - csv: Comma-separated values file
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
+            - parquet: One Parquet file per section (``<output>_entities.parquet`` ...)
+            - arrow: One Arrow IPC file per section (``<output>_entities.arrow`` ...)
         include_vector_data: Whether to include data from the vector database.
+            For parquet/arrow this adds the embeddings as a fixed-size-list column.
+        batch_size: Number of entities / relations fetched and written per page.
     """
-    # Collect data
-    entities_data = []
-    relations_data = []
-    relationships_data = []
-
-    # --- Entities ---
-    all_entities = await chunk_entity_relation_graph.get_all_labels()
-    for entity_name in all_entities:
-        # Get entity information from graph
-        node_data = await chunk_entity_relation_graph.get_node(entity_name)
-        source_id = node_data.get("source_id") if node_data else None
-
-        entity_info = {
-            "graph_data": node_data,
-            "source_id": source_id,
-        }
-
-        # Optional: Get vector database information
-        if include_vector_data:
-            entity_id = compute_mdhash_id(entity_name, prefix="ent-")
-            vector_data = await entities_vdb.get_by_id(entity_id)
-            entity_info["vector_data"] = vector_data
-
-        entity_row = {
-            "entity_name": entity_name,
-            "source_id": source_id,
-            "graph_data": str(
-                entity_info["graph_data"]
-            ),  # Convert to string to ensure compatibility
-        }
-        if include_vector_data and "vector_data" in entity_info:
-            entity_row["vector_data"] = str(entity_info["vector_data"])
-        entities_data.append(entity_row)
-
-    # --- Relations ---
-    for src_entity in all_entities:
-        for tgt_entity in all_entities:
-            if src_entity == tgt_entity:
-                continue
-
-            edge_exists = await chunk_entity_relation_graph.has_edge(
-                src_entity, tgt_entity
-            )
-            if edge_exists:
-                # Get edge information from graph
-                edge_data = await chunk_entity_relation_graph.get_edge(
-                    src_entity, tgt_entity
-                )
-                source_id = edge_data.get("source_id") if edge_data else None
-
-                relation_info = {
-                    "graph_data": edge_data,
-                    "source_id": source_id,
-                }
-
-                # Optional: Get vector database information
-                if include_vector_data:
-                    rel_id = compute_mdhash_id(src_entity + tgt_entity, prefix="rel-")
-                    vector_data = await relationships_vdb.get_by_id(rel_id)
-                    relation_info["vector_data"] = vector_data
-
-                relation_row = {
-                    "src_entity": src_entity,
-                    "tgt_entity": tgt_entity,
-                    "source_id": relation_info["source_id"],
-                    "graph_data": str(relation_info["graph_data"]),  # Convert to string
-                }
-                if include_vector_data and "vector_data" in relation_info:
-                    relation_row["vector_data"] = str(relation_info["vector_data"])
-                relations_data.append(relation_row)
-
-    # --- Relationships (from VectorDB) ---
-    all_relationships = await relationships_vdb.client_storage
-    for rel in all_relationships["data"]:
-        relationships_data.append(
-            {
-                "relationship_id": rel["__id__"],
-                "data": str(rel),  # Convert to string for compatibility
-            }
-        )
-
-    # Export based on format
-    if file_format == "csv":
-        # CSV export
-        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-            # Entities
-            if entities_data:
-                csvfile.write("# ENTITIES\n")
-                writer = csv.DictWriter(csvfile, fieldnames=entities_data[0].keys())
-                writer.writeheader()
-                writer.writerows(entities_data)
-                csvfile.write("\n\n")
-
-            # Relations
-            if relations_data:
-                csvfile.write("# RELATIONS\n")
-                writer = csv.DictWriter(csvfile, fieldnames=relations_data[0].keys())
-                writer.writeheader()
-                writer.writerows(relations_data)
-                csvfile.write("\n\n")
-
-            # Relationships
-            if relationships_data:
-                csvfile.write("# RELATIONSHIPS\n")
-                writer = csv.DictWriter(
-                    csvfile, fieldnames=relationships_data[0].keys()
-                )
-                writer.writeheader()
-                writer.writerows(relationships_data)
-
-    elif file_format == "excel":
-        # Excel export
-        import pandas as pd
-
-        entities_df = pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
-        relations_df = (
-            pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
-        )
-        relationships_df = (
-            pd.DataFrame(relationships_data) if relationships_data else pd.DataFrame()
-        )
-
-        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-            if not entities_df.empty:
-                entities_df.to_excel(writer, sheet_name="Entities", index=False)
-            if not relations_df.empty:
-                relations_df.to_excel(writer, sheet_name="Relations", index=False)
-            if not relationships_df.empty:
-                relationships_df.to_excel(
-                    writer, sheet_name="Relationships", index=False
-                )
-
-    elif file_format == "md":
-        # Markdown export
-        with open(output_path, "w", encoding="utf-8") as mdfile:
-            mdfile.write("# LightRAG Data Export\n\n")
-
-            # Entities
-            mdfile.write("## Entities\n\n")
-            if entities_data:
-                # Write header
-                mdfile.write("| " + " | ".join(entities_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(entities_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for entity in entities_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in entity.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No entity data available*\n\n")
-
-            # Relations
-            mdfile.write("## Relations\n\n")
-            if relations_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relations_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(relations_data[0].keys())) + " |\n"
-                )
-
-                # Write rows
-                for relation in relations_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in relation.values()) + " |\n"
-                    )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No relation data available*\n\n")
-
-            # Relationships
-            mdfile.write("## Relationships\n\n")
-            if relationships_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relationships_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| "
-                    + " | ".join(["---"] * len(relationships_data[0].keys()))
-                    + " |\n"
-                )
-
-                # Write rows
-                for relationship in relationships_data:
-                    mdfile.write(
-                        "| "
-                        + " | ".join(str(v) for v in relationship.values())
-                        + " |\n"
-                    )
-            else:
-                mdfile.write("*No relationship data available*\n\n")
-
-    elif file_format == "txt":
-        # Plain text export
-        with open(output_path, "w", encoding="utf-8") as txtfile:
-            txtfile.write("LIGHTRAG DATA EXPORT\n")
-            txtfile.write("=" * 80 + "\n\n")
-
-            # Entities
-            txtfile.write("ENTITIES\n")
-            txtfile.write("-" * 80 + "\n")
-            if entities_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(e[k])) for e in entities_data))
-                    for k in entities_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for entity in entities_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in entity.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No entity data available\n\n")
-
-            # Relations
-            txtfile.write("RELATIONS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relations_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relations_data))
-                    for k in relations_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in relations_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relation in relations_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relation.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No relation data available\n\n")
-
-            # Relationships
-            txtfile.write("RELATIONSHIPS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relationships_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relationships_data))
-                    for k in relationships_data[0]
-                }
-                header = "  ".join(
-                    k.ljust(col_widths[k]) for k in relationships_data[0]
-                )
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relationship in relationships_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relationship.items()
-                    )
-                    txtfile.write(row + "\n")
-            else:
-                txtfile.write("No relationship data available\n\n")
-
-    else:
-        raise ValueError(
-            f"Unsupported file format: {file_format}. Choose from: csv, excel, md, txt"
-        )
-    if file_format is not None:
-        print(f"Data exported to: {output_path} with format: {file_format}")
-    else:
-        print("Data displayed as table format")
+    from coldrag.export import astream_export
+
+    paths = await astream_export(
+        chunk_entity_relation_graph,
+        entities_vdb,
+        relationships_vdb,
+        output_path,
+        file_format,
+        include_vector_data,
+        batch_size,
+    )
+    print(f"Data exported to: {', '.join(paths)} with format: {file_format}")
 
 
 def export_data(
@@ -1499,6 +1587,7 @@ def export_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = 1000,
 ) -> None:
     """
     Synchronously exports all entities, relations, and relationships to various formats.
@@ -1508,12 +1597,10 @@ def export_data(
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
-            - csv: Comma-separated values file
-            - excel: Microsoft Excel file with multiple sheets
-            - md: Markdown tables
-            - txt: Plain text formatted output
+        file_format: Output format - "csv", "excel", "md", "txt", "parquet", "arrow".
+            See ``aexport_data`` for details.
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Number of entities / relations fetched and written per page.
     """
     try:
         loop = asyncio.get_event_loop()
@@ -1529,6 +1616,7 @@ def export_data(
             output_path,
             file_format,
             include_vector_data,
+            batch_size,
         )
     )
 
@@ -21,7 +21,8 @@ async def _persist_graph_updates(
     """Unified callback to persist updates after graph operations.
 
     Ensures all relevant storage instances are properly persisted after
-    operations like delete, edit, create, or merge.
+    operations like delete, edit, create, or merge. The item neighbourhood index
+    built from the previous graph is removed.
 
     Args:
         entities_vdb: Entity vector database storage (optional)
@@ -53,6 +54,11 @@ async def _persist_graph_updates(
             ]
         )
 
+    if chunk_entity_relation_graph is not None:
+        from .item_index import invalidate_item_index
+
+        invalidate_item_index(chunk_entity_relation_graph)
+
 
 async def adelete_by_entity(
     chunk_entity_relation_graph,
@@ -17,7 +17,15 @@ def parse_args():
     ap.add_argument("--batch_size", type=int, default=20)
     ap.add_argument("--concurrency", type=int, default=10)
     ap.add_argument("--index_limit", type=int, default=None, help="Limit #txt docs to index (debug)")
+    ap.add_argument("--restrict_candidates", action="store_true", help="coldrag mode: only expand graph paths that reach the candidate list")
+    ap.add_argument("--item_index", action="store_true", help="coldrag mode: build (if missing) and use the item neighbourhood index")
+    ap.add_argument("--pipelined", action="store_true", help="coldrag mode: overlap hop-expansion LLM batches instead of waiting hop by hop")
+    ap.add_argument("--structured_extraction", action="store_true", help="Indexing: extract templated item fields (brand, category, ...) by rules; the LLM only sees free text")
     ap.add_argument("--skip_index", action="store_true", help="Skip indexing step")
+    ap.add_argument("--warm_start", action="store_true", help="Load storages and eval data from the compiled snapshot (falls back to JSON/GraphML for changed files)")
+    ap.add_argument("--compile_snapshot", action="store_true", help="Compile a warm-start snapshot after indexing")
+    ap.add_argument("--eval_ks", type=int, nargs="+", default=None, help="Extra K values to evaluate (default: only --k)")
+    ap.add_argument("--fuzzy_threshold", type=float, default=None, help="Trigram similarity for fuzzy title matching (default: off)")
     ap.add_argument("--out", default="./outputs/preds.json", help="Output predictions JSON")
     return ap.parse_args()
 
@@ -36,11 +44,20 @@ async def main():
         core=args.core,
         candidate_list_size=args.cand_size,
         mode=args.mode,
+        restrict_to_candidates=args.restrict_candidates,
+        use_item_index=args.item_index,
+        pipelined_reasoning=args.pipelined,
+        warm_start=args.warm_start,
+        structured_extraction=args.structured_extraction,
     )
     await coldrag.initialize()
     # import pdb; pdb.set_trace()
     if not args.skip_index:
         await coldrag.run_indexing(limit=args.index_limit)
+    if args.item_index:
+        await coldrag.build_item_index(rebuild=not args.skip_index)
+    if args.compile_snapshot:
+        await coldrag.compile_snapshot()
 
     if not os.path.exists(args.out):
         preds = await coldrag.run_coldrag(
@@ -50,20 +67,21 @@ async def main():
         )
     else:
         print(f"Skipping run_coldrag, loading existing results from {args.out}")
-        with open(args.out, 'r') as file:
-            preds = json.load(file)
+        preds = args.out  # streamed by the evaluator
 
-    r, n, m = coldrag.evaluate_coldrag(preds, k=args.k)
+    ks = sorted(set([args.k] + (args.eval_ks or [])))
+    eval_metrics = coldrag.evaluate_many(preds, ks, fuzzy_threshold=args.fuzzy_threshold)
     output_path = args.out
 
-    print(f"[EVAL] Recall@{args.k}={r:.4f}  NDCG@{args.k}={n:.4f}  MRR={m:.4f}")
-    eval_metrics = {f"Recall@{args.k}":r, f"NDCG@{args.k}":n, f"MRR@{args.k}":m}
+    for k in ks:
+        print(f"[EVAL] Recall@{k}={eval_metrics[f'Recall@{k}']:.4f}  NDCG@{k}={eval_metrics[f'NDCG@{k}']:.4f}  MRR@{k}={eval_metrics[f'MRR@{k}']:.4f}")
 
-    eval_output_path = output_path.replace(".json", "_eval.json")
+    eval_output_path = os.path.splitext(output_path)[0] + "_eval.json"
     eval_data = {
         "model": args.model,
         "dataset": args.dataset,
         "k": args.k,
+        "ks": ks,
         "metrics": eval_metrics
     }
     with open(eval_output_path, 'w') as file:
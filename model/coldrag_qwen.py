@@ -1,8 +1,7 @@
 # model/coldrag_qwen.py
-import os, json, re, asyncio
+import os, json, asyncio
 from typing import Any, List
 import pandas as pd
-import numpy as np
 from tqdm import tqdm
 
 # from lightrag import LightRAG, QueryParam
@@ -10,6 +9,8 @@ from tqdm import tqdm
 
 from coldrag import LightRAG, QueryParam
 from coldrag.kg.shared_storage import initialize_pipeline_status
+from coldrag.prompt import parse_ranked_items, render_recommend_query
+from model.evaluation import TitleMatcher, evaluate, iter_predictions
 
 # keep your current vllm_preset exactly as-is
 from vllm_preset import vllm_qwen_complete, VLLMEmbedWrapper
@@ -26,23 +27,22 @@ def _ensure_async(fn):
         return await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
     return _aw
 
-def _extract_topk_lines(text: str, k: int) -> List[str]:
-    lines = (text or "").strip().splitlines()
-    out: List[str] = []
-    for ln in lines:
-        m = re.match(r"^\s*\d+\.\s*(.+)$", ln.strip())
-        if m:
-            out.append(m.group(1).strip())
-            if len(out) >= k:
-                break
-    return out
-
 class ColdRAG_qwen:
-    def __init__(self, dataset, core, candidate_list_size, mode):
+    def __init__(self, dataset, core, candidate_list_size, mode, restrict_to_candidates=False, use_item_index=False, pipelined_reasoning=False, warm_start=False, structured_extraction=False):
         self.dataset = dataset
         self.core = core
         self.candidate_list_size = candidate_list_size
         self.mode = mode
+        # coldrag mode only: restrict graph expansion to paths reaching the user's candidates
+        self.restrict_to_candidates = restrict_to_candidates
+        # coldrag mode only: seed expansion from the precomputed item neighbourhood index
+        self.use_item_index = use_item_index
+        # coldrag mode only: score hop batches as a pipelined priority queue instead of hop by hop
+        self.pipelined_reasoning = pipelined_reasoning
+        # load storages and eval data from the compiled snapshot when it is still current
+        self.warm_start = warm_start
+        # indexing: turn templated item fields into entities/relations without the LLM
+        self.structured_extraction = structured_extraction
 
         self.processed_dir = f"./dataset/{dataset}/processed"
         self.data_path = f"{self.processed_dir}/data_eval_{core}.json"
@@ -62,17 +62,26 @@ class ColdRAG_qwen:
         self.candidate_lists: dict[str, list[str]] = {}
         self.sampled_sequences: list[dict[str, Any]] = []
         self.metadata = pd.DataFrame()
+        self._matchers: dict[float | None, TitleMatcher] = {}
 
     async def initialize(self):
         if self.rag is not None:
             return
 
+        structured_extractor = None
+        if self.structured_extraction:
+            from coldrag.structured_extract import ItemRecordExtractor
+
+            structured_extractor = ItemRecordExtractor()
+
         # Construct LightRAG with async-able funcs
         self.rag = LightRAG(
             working_dir=f"./rag_output_qwen/{self.dataset}",
             embedding_func=self.embedding_func,
             llm_model_func=self.llm_func,
             enable_llm_cache=False,
+            use_snapshot=self.warm_start,
+            structured_extractor=structured_extractor,
         )
 
         # REQUIRED for async pipeline (indexing + KG building)
@@ -80,9 +89,18 @@ class ColdRAG_qwen:
         await initialize_pipeline_status()
 
         # load data
-        with open(self.data_path, "r", encoding="utf-8") as f:
-            self.sampled_sequences = json.load(f)
-        self.metadata = pd.read_csv(self.metadata_path)
+        snapshot = None
+        if self.warm_start:
+            from coldrag.snapshot import WorkspaceSnapshot, get_snapshot_dir
+
+            snapshot = WorkspaceSnapshot.load(get_snapshot_dir(self.rag.working_dir, self.rag.workspace))
+        sampled_sequences = snapshot.load_object(self.data_path) if snapshot else None
+        if sampled_sequences is None:
+            with open(self.data_path, "r", encoding="utf-8") as f:
+                sampled_sequences = json.load(f)
+        self.sampled_sequences = sampled_sequences
+        metadata = snapshot.load_object(self.metadata_path) if snapshot else None
+        self.metadata = metadata if metadata is not None else pd.read_csv(self.metadata_path)
 
         cand_path = f"{self.processed_dir}/candidate_list_{self.candidate_list_size}_{self.core}.json"
         if os.path.exists(cand_path) and os.path.getsize(cand_path) > 0:
@@ -116,12 +134,44 @@ class ColdRAG_qwen:
             except Exception as e:
                 print(f"[ColdRAG_qwen] insert error {os.path.basename(fp)}: {e}")
 
-    async def _aquery_once(self, prompt: str, k: int, max_retry: int = 5) -> List[str]:
+    async def build_item_index(self, rebuild: bool = False, max_hops: int = 2):
+        """Offline stage after indexing: build the item-to-item neighbourhood index."""
+        assert self.rag is not None
+        from coldrag.item_index import get_item_index_path
+
+        index_path = get_item_index_path(self.rag.working_dir, self.rag.workspace)
+        if os.path.exists(index_path) and not rebuild:
+            print(f"[ColdRAG_qwen] Item index exists: {index_path}")
+            return index_path
+        print("[ColdRAG_qwen] Building item neighbourhood index...")
+        return await self.rag.abuild_item_index(max_hops=max_hops)
+
+    async def compile_snapshot(self):
+        """Freeze the indexed workspace plus the eval data into a warm-start snapshot."""
+        assert self.rag is not None
+        from coldrag.snapshot import WorkspaceSnapshot
+
+        snapshot_dir = await self.rag.acompile_snapshot()
+        snapshot = WorkspaceSnapshot.load(snapshot_dir)
+        snapshot.add_object(self.data_path, self.sampled_sequences)
+        snapshot.add_object(self.metadata_path, self.metadata)
+        snapshot.save()
+        print(f"[ColdRAG_qwen] Snapshot compiled: {snapshot_dir}")
+        return snapshot_dir
+
+    async def _aquery_once(self, prompt: str, k: int, max_retry: int = 5, candidates: List[str] | None = None) -> List[str]:
         assert self.rag is not None
         for t in range(max_retry):
             try:
-                resp = await self.rag.aquery(prompt, param=QueryParam(mode=self.mode, enable_rerank=False))
-                recs = _extract_topk_lines(resp, k)
+                param = QueryParam(
+                    mode=self.mode,
+                    enable_rerank=False,
+                    candidate_items=candidates,
+                    use_item_index=self.use_item_index,
+                    pipelined_reasoning=self.pipelined_reasoning,
+                )
+                resp = await self.rag.aquery(prompt, param=param)
+                recs = parse_ranked_items(resp, k)
                 if len(recs) >= k:
                     return recs
                 print(f"[ColdRAG_qwen] retry {t+1}: got {len(recs)}")
@@ -133,40 +183,34 @@ class ColdRAG_qwen:
     async def run_coldrag(self, output_path: str, k: int, batch_size: int = 20):
         assert self.rag is not None
         prompts: List[str] = []
+        restricts: List[List[str] | None] = []
         for entry in self.sampled_sequences:
             hist = entry.get("input", [])[-20:]
             uid = str(entry.get("user_id", ""))
             cand = self.candidate_lists.get(uid, [])
-            cand_text = "\n".join(f"{i+1}. {t}" for i, t in enumerate(cand))
-            if self.mode == "coldrag":
-                prompt = (
-                    f"I've purchased the following products in the past in order:\n{hist}\n\n"
-                    f"Please carefully recommend top-{k} products among the candidate products by how likely I am to purchase them next, "
-                    f"based on my past purchasing history.\n"
-                    f"Think step by step, but only output the final ranking in the following format:\n\n"
-                    f"1. <product name>\n2. <product name>\n...\n\n"
-                    f"Only include items from the given candidate list. Do not add explanations or any other text."
-                )
-            else:
-                prompt = (
-                    f"I've purchased the following products in the past in order:\n{hist}\n\n"
-                    f"Now there are {len(cand)} candidate products that I can consider purchasing next:\n{cand_text}\n\n"
-                    f"Please carefully recommend top-{k} products among the candidate products by how likely I am to purchase them next, "
-                    f"based on my past purchasing history.\n"
-                    f"Think step by step, but only output the final ranking in the following format:\n\n"
-                    f"1. <product name>\n2. <product name>\n...\n\n"
-                    f"Only include items from the given candidate list. Do not add explanations or any other text."
-                )
+            # coldrag mode finds the candidates in the graph; the others list them in the query
+            prompt = render_recommend_query(hist, k, None if self.mode == "coldrag" else cand)
             prompts.append(prompt)
+            restrict = self.mode == "coldrag" and self.restrict_to_candidates
+            restricts.append(cand if restrict and cand else None)
 
         print(f"[ColdRAG_qwen] Querying {len(prompts)} users (mode={self.mode})...")
         results_all: List[List[str]] = []
         for i in tqdm(range(0, len(prompts), batch_size), desc="Query Batches"):
             batch = prompts[i : i + batch_size]
-            tasks = [self._aquery_once(p, k) for p in batch]
+            batch_cands = restricts[i : i + batch_size]
+            tasks = [self._aquery_once(p, k, candidates=c) for p, c in zip(batch, batch_cands)]
             results = await asyncio.gather(*tasks)
             results_all.extend(results)
 
+        # Scheduler view of the run: queue wait per priority (5 = final ranking, 6 = edge scoring)
+        queue_stats = self.rag.llm_model_func.get_queue_stats()
+        for priority, s in queue_stats["priorities"].items():
+            print(
+                f"[ColdRAG_qwen] LLM queue p{priority}: {s['started']} calls, "
+                f"mean wait {s['mean_wait']:.2f}s, max wait {s['max_wait']:.2f}s"
+            )
+
         out = []
         for entry, preds in zip(self.sampled_sequences, results_all):
             e = dict(entry)
@@ -174,25 +218,29 @@ class ColdRAG_qwen:
             out.append(e)
 
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2)
+            if output_path.endswith(".jsonl"):
+                for e in out:
+                    f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            else:
+                json.dump(out, f, indent=2)
         return out
 
+    def title_matcher(self, fuzzy_threshold: float | None = None) -> TitleMatcher:
+        """Canonical title id table over the item catalog (metadata CSV), built once per threshold."""
+        key = fuzzy_threshold
+        if key not in self._matchers:
+            if os.path.exists(self.metadata_path):
+                self._matchers[key] = TitleMatcher.from_metadata_csv(self.metadata_path, fuzzy_threshold=fuzzy_threshold)
+            else:
+                self._matchers[key] = TitleMatcher(fuzzy_threshold=fuzzy_threshold)
+        return self._matchers[key]
+
+    def evaluate_many(self, data_or_path, ks: List[int], fuzzy_threshold: float | None = None) -> dict[str, float]:
+        """Recall/NDCG/MRR for every K in one pass; accepts records or a JSON/JSONL predictions path."""
+        records = iter_predictions(data_or_path) if isinstance(data_or_path, str) else data_or_path
+        return evaluate(records, ks, self.title_matcher(fuzzy_threshold))
+
     @staticmethod
-    def evaluate_coldrag(data: list[dict[str, Any]], k: int):
-        recall_cnt = 0
-        ndcg_sum = 0.0
-        mrr_sum = 0.0
-        for e in data:
-            true_item = e.get("true_title", "")
-            preds = (e.get("predicted_items", []) or [])[:k]
-            if true_item in preds:
-                r = preds.index(true_item)
-                recall_cnt += 1
-                ndcg_sum += 1 / np.log2(r + 2)
-                mrr_sum += 1 / (r + 1)
-        n = len(data) if data else 0
-        return (
-            (recall_cnt / n) if n else 0.0,
-            float(ndcg_sum / n) if n else 0.0,
-            (mrr_sum / n) if n else 0.0,
-        )
+    def evaluate_coldrag(data: list[dict[str, Any]], k: int, matcher: TitleMatcher | None = None):
+        metrics = evaluate(data, [k], matcher)
+        return metrics[f"Recall@{k}"], metrics[f"NDCG@{k}"], metrics[f"MRR@{k}"]
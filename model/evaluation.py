@@ -0,0 +1,160 @@
+# model/evaluation.py
+"""Vectorised Recall/NDCG/MRR evaluation with canonical title matching.
+
+Titles are normalised once into an integer id table; predictions become a
+(users x K) id matrix, and every metric for every K is computed in one NumPy pass.
+"""
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+_NUMBERING_RE = re.compile(r"^\s*(?:\(?\d{1,3}[\.\)\]]|[-*•])\s+")
+_QUOTES_RE = re.compile(r"[\"'`“”‘’«»]")
+_SPACE_RE = re.compile(r"\s+")
+
+UNMATCHED_ID = -1
+
+
+def normalize_title(title: Any) -> str:
+    """Canonical form of an item title: casefolded, no list numbering, quotes or extra spaces."""
+    text = unicodedata.normalize("NFKC", str(title or ""))
+    text = _NUMBERING_RE.sub("", text.strip())
+    text = _QUOTES_RE.sub("", text)
+    text = _SPACE_RE.sub(" ", text).strip().strip(".,;:").strip()
+    return text.casefold()
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleMatcher:
+    """Maps raw titles to stable integer ids.
+
+    Exact matches are resolved on the normalised title. When ``fuzzy_threshold`` is
+    set, unknown titles fall back to the catalog title with the highest trigram Dice
+    similarity, if it reaches the threshold. Titles that still do not match get a
+    fresh id, so they only ever match an identical normalised title.
+    """
+
+    def __init__(self, catalog_titles: Iterable[str] = (), fuzzy_threshold: Optional[float] = None):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._ids: Dict[str, int] = {}
+        for title in catalog_titles:
+            self._ids.setdefault(normalize_title(title), len(self._ids))
+        self._num_catalog = len(self._ids)
+        self._resolved: Dict[str, int] = {}
+
+        self._postings: Dict[str, np.ndarray] = {}
+        self._gram_counts = np.zeros(0, dtype=np.int32)
+        if fuzzy_threshold is not None and self._ids:
+            postings = defaultdict(list)
+            self._gram_counts = np.zeros(self._num_catalog, dtype=np.int32)
+            for norm, idx in self._ids.items():
+                grams = _trigrams(norm)
+                self._gram_counts[idx] = len(grams)
+                for g in grams:
+                    postings[g].append(idx)
+            self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    @classmethod
+    def from_metadata_csv(cls, path: str, title_column: str = "title", fuzzy_threshold: Optional[float] = None):
+        import pandas as pd
+
+        titles = pd.read_csv(path, usecols=[title_column])[title_column].dropna().astype(str)
+        return cls(titles.tolist(), fuzzy_threshold=fuzzy_threshold)
+
+    def _fuzzy_lookup(self, norm: str) -> Optional[int]:
+        grams = _trigrams(norm)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return None
+        shared = np.bincount(np.concatenate(lists), minlength=self._num_catalog)
+        dice = 2.0 * shared / (len(grams) + self._gram_counts)
+        best = int(np.argmax(dice))
+        return best if dice[best] >= self.fuzzy_threshold else None
+
+    def id_for(self, title: Any) -> int:
+        norm = normalize_title(title)
+        if not norm:
+            return UNMATCHED_ID
+        cached = self._resolved.get(norm)
+        if cached is not None:
+            return cached
+        idx = self._ids.get(norm)
+        if idx is None and self._postings:
+            idx = self._fuzzy_lookup(norm)
+        if idx is None:
+            idx = self._ids.setdefault(norm, len(self._ids))
+        self._resolved[norm] = idx
+        return idx
+
+
+def iter_predictions(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream prediction records from a JSONL file (one user per line) or a JSON list."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def build_rank_vector(records: Iterable[Dict[str, Any]], matcher: TitleMatcher, max_k: int) -> np.ndarray:
+    """Zero-based rank of the true item within the top ``max_k`` predictions per user (-1 = miss)."""
+    true_ids: List[int] = []
+    pred_rows: List[List[int]] = []
+    for e in records:
+        true_ids.append(matcher.id_for(e.get("true_title", "")))
+        preds = (e.get("predicted_items", []) or [])[:max_k]
+        row = [matcher.id_for(p) for p in preds]
+        pred_rows.append(row + [UNMATCHED_ID] * (max_k - len(row)))
+
+    if not true_ids:
+        return np.zeros(0, dtype=np.int64)
+    pred_matrix = np.asarray(pred_rows, dtype=np.int64).reshape(len(true_ids), max_k)
+    true_vec = np.asarray(true_ids, dtype=np.int64)
+    hits = (pred_matrix == true_vec[:, None]) & (true_vec[:, None] != UNMATCHED_ID)
+    return np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+
+def metrics_from_ranks(ranks: np.ndarray, ks: Sequence[int]) -> Dict[str, float]:
+    """Recall@K, NDCG@K and MRR@K for every K in ``ks`` from a rank vector."""
+    ks = sorted(set(int(k) for k in ks))
+    n = len(ranks)
+    if n == 0:
+        return {f"{m}@{k}": 0.0 for k in ks for m in ("Recall", "NDCG", "MRR")}
+
+    hit = ranks >= 0
+    ks_arr = np.asarray(ks)[:, None]
+    within = hit[None, :] & (ranks[None, :] < ks_arr)  # (len(ks), users)
+    safe_rank = np.where(hit, ranks, 0)
+    gains = np.where(within, 1.0 / np.log2(safe_rank + 2.0), 0.0)
+    rr = np.where(within, 1.0 / (safe_rank + 1.0), 0.0)
+
+    recall, ndcg, mrr = within.mean(axis=1), gains.mean(axis=1), rr.mean(axis=1)
+    out: Dict[str, float] = {}
+    for i, k in enumerate(ks):
+        out[f"Recall@{k}"] = float(recall[i])
+        out[f"NDCG@{k}"] = float(ndcg[i])
+        out[f"MRR@{k}"] = float(mrr[i])
+    return out
+
+
+def evaluate(records: Iterable[Dict[str, Any]], ks: Sequence[int], matcher: Optional[TitleMatcher] = None) -> Dict[str, float]:
+    """Evaluate prediction records for all ``ks`` in a single pass."""
+    matcher = matcher or TitleMatcher()
+    ranks = build_rank_vector(records, matcher, max(ks))
+    return metrics_from_ranks(ranks, ks)
+
+
+def evaluate_file(path: str, ks: Sequence[int], matcher: Optional[TitleMatcher] = None) -> Dict[str, float]:
+    """Stream a predictions file (JSON or JSONL) and evaluate it for all ``ks``."""
+    return evaluate(iter_predictions(path), ks, matcher)
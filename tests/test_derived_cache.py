@@ -0,0 +1,234 @@
+"""
+Tests for the two-level derived cache, with fakeredis standing in for the shared tier.
+
+Run with:
+    python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coldrag.derived_cache import (  # noqa: E402
+    BaseCacheTier,
+    DerivedCache,
+    DerivedCacheKVStorage,
+    LRUCache,
+    cached_embeddings,
+    decode_value,
+    encode_value,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@dataclass
+class FakeRedisCacheTier(BaseCacheTier):
+    """Cache tier on an in-process fakeredis server, shared like a real Redis."""
+
+    server: object = None
+
+    def __post_init__(self):
+        self._redis = fakeredis.FakeAsyncRedis(server=self.server)
+        self.fail = False
+
+    def _key(self, key: str) -> str:
+        return f"{self.workspace}_{self.namespace}:{key}"
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        if self.fail:
+            raise ConnectionError("tier down")
+        return await self._redis.mget([self._key(key) for key in keys])
+
+    async def set_many(self, items: dict[str, bytes], ttl: int | None = None) -> None:
+        if self.fail:
+            raise ConnectionError("tier down")
+        for key, value in items.items():
+            await self._redis.set(self._key(key), value, ex=ttl)
+
+    async def drop(self) -> dict[str, str]:
+        keys = await self._redis.keys(f"{self.workspace}_{self.namespace}:*")
+        if keys:
+            await self._redis.delete(*keys)
+        return {"status": "success", "message": "data dropped"}
+
+
+class Versions:
+    def __init__(self):
+        self.values = {
+            "embedding_model": "model:8",
+            "graph": "1",
+            "entities": "1",
+            "item_index": "none",
+        }
+
+    def sources(self):
+        def source(name):
+            async def version():
+                return self.values[name]
+
+            return version
+
+        return {name: source(name) for name in self.values}
+
+
+class MemoryKV:
+    """Minimal stand-in for the wrapped ``llm_response_cache`` storage."""
+
+    def __init__(self):
+        self.data = {}
+        self.global_config = {}
+
+    async def get_by_id(self, id):
+        return self.data.get(id)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+    async def delete(self, ids):
+        for id in ids:
+            self.data.pop(id, None)
+
+    async def drop(self):
+        self.data.clear()
+        return {"status": "success", "message": "data dropped"}
+
+
+def make_workers(n=2, ttl=None):
+    server = fakeredis.FakeServer()
+    versions = Versions()
+    caches = []
+    for _ in range(n):
+        tier = FakeRedisCacheTier(
+            namespace="derived_cache", workspace="w", global_config={}, server=server
+        )
+        caches.append(DerivedCache(tier, versions.sources(), 1 << 20, ttl=ttl))
+    return versions, caches
+
+
+def test_encode_decode_roundtrip():
+    vector = np.arange(5, dtype=np.float32)
+    assert len(encode_value(vector)) == 1 + 5 * 4
+    assert np.array_equal(decode_value(encode_value(vector)), vector)
+    assert decode_value(encode_value("héllo")) == "héllo"
+    assert decode_value(encode_value({"items": ["a", 1]})) == {"items": ["a", 1]}
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(30)
+    lru.put("a", b"x" * 10)
+    lru.put("b", b"y" * 10)
+    lru.get("a")
+    lru.put("c", b"z" * 10)
+    assert lru.get("b") is None
+    assert lru.get("a") == b"x" * 10
+    assert lru.size <= 30
+
+
+def test_values_are_shared_between_workers():
+    async def run():
+        _, (first, second) = make_workers()
+        await first.set("coldrag", "q", ["item-1", "item-2"])
+        assert await second.get("coldrag", "q") == ["item-1", "item-2"]
+        assert second.hits == {"l1": 0, "l2": 1}
+        # Promoted to the second worker's L1
+        assert await second.get("coldrag", "q") == ["item-1", "item-2"]
+        assert second.hits == {"l1": 1, "l2": 1}
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("dependency", ["graph", "entities", "item_index"])
+def test_version_change_invalidates_dependent_kinds(dependency):
+    async def run():
+        versions, (first, second) = make_workers()
+        await first.set("coldrag", "q", ["item-1"])
+        await first.set("keywords", "k", {"return": "x", "create_time": 0})
+        versions.values[dependency] = "2"
+        assert await first.get("coldrag", "q") is None
+        assert await second.get("coldrag", "q") is None
+        # Kinds that do not depend on the version are still served
+        assert await second.get("keywords", "k") == {"return": "x", "create_time": 0}
+
+    asyncio.run(run())
+
+
+def test_missing_version_disables_caching():
+    async def run():
+        versions, (cache,) = make_workers(n=1)
+        versions.values["graph"] = None
+        await cache.set("coldrag", "q", ["item-1"])
+        assert await cache.get("coldrag", "q") is None
+        assert len(cache.l1) == 0
+
+    asyncio.run(run())
+
+
+def test_tier_failures_fall_back_to_l1():
+    async def run():
+        _, (first, second) = make_workers()
+        first.tier.fail = second.tier.fail = True
+        await first.set("coldrag", "q", ["item-1"])
+        assert await first.get("coldrag", "q") == ["item-1"]
+        assert await second.get("coldrag", "q") is None
+
+    asyncio.run(run())
+
+
+def test_ttl_is_applied_to_tier_entries():
+    async def run():
+        _, (cache,) = make_workers(n=1, ttl=60)
+        await cache.set("coldrag", "q", ["item-1"])
+        keys = await cache.tier._redis.keys("*")
+        assert len(keys) == 1
+        assert 0 < await cache.tier._redis.ttl(keys[0]) <= 60
+
+    asyncio.run(run())
+
+
+def test_cached_embeddings_embeds_only_missing_texts():
+    calls = []
+
+    async def embed(texts, _priority=None):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    async def run():
+        _, (first, second) = make_workers()
+        vectors = await cached_embeddings(first, embed, ["a", "bb", "a"])
+        assert vectors.shape == (3, 2)
+        assert calls == [["a", "bb"]]
+        again = await cached_embeddings(second, embed, ["bb", "ccc"])
+        assert calls == [["a", "bb"], ["ccc"]]
+        assert np.array_equal(again[0], vectors[1])
+
+    asyncio.run(run())
+
+
+def test_kv_proxy_serves_query_time_cache_types():
+    async def run():
+        _, (first, second) = make_workers()
+        kv1 = DerivedCacheKVStorage(MemoryKV(), first)
+        kv2 = DerivedCacheKVStorage(MemoryKV(), second)
+        record = {"return": "low, level", "create_time": 1, "cache_type": "keywords"}
+        await kv1.upsert(
+            {"coldrag:keywords:abc": record, "default:extract:abc": record}
+        )
+        # Query-time types reach the other worker; extraction stays in its storage
+        assert await kv2.get_by_id("coldrag:keywords:abc") == {
+            "return": "low, level",
+            "create_time": 1,
+        }
+        assert await kv2.get_by_id("default:extract:abc") is None
+        await kv1.drop()
+        assert len(first.l1) == 0
+        assert await second.tier.get_many(["x"]) == [None]
+        assert await second.tier._redis.keys("*") == []
+
+    asyncio.run(run())
@@ -4,7 +4,6 @@ import os
 import threading
 from typing import Any, List, Optional
 import asyncio
-import aiohttp
 
 # -----------------------------
 # Config (exported constants)
@@ -28,6 +27,8 @@ _DEF_REP_PEN = float(os.environ.get("VLLM_REP_PENALTY", "1.1"))
 # -----------------------------
 async def _vllm_complete_async(prompt: str, **kwargs: Any) -> str:
     """Async call to the running vLLM server (OpenAI-compatible API)."""
+    import aiohttp  # deferred: only the query path needs the HTTP client
+
     max_tokens = int(kwargs.get("max_tokens", _DEF_MAX_TOKENS))
     temperature = float(kwargs.get("temperature", _DEF_TEMP))
     top_p = float(kwargs.get("top_p", _DEF_TOP_P))